@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Benchmark dialogue segment throughput: per-request sessions vs the shared ElevenLabs client."""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import aiohttp
+from aiohttp import web
+
+from listen_in.generators.dialogue_audio_generator import DialogueAudioGenerator
+from listen_in.utils.elevenlabs_client import close_session
+
+# Fake MP3 payload returned for every segment
+AUDIO_BYTES = b"\xff\xfb\x90\x00" * 4096
+
+
+async def start_mock_server(latency_ms: float) -> web.AppRunner:
+    """Start a local server that mimics the ElevenLabs text-to-speech endpoint."""
+    async def text_to_speech(request: web.Request) -> web.Response:
+        await request.json()
+        await asyncio.sleep(latency_ms / 1000)
+        return web.Response(body=AUDIO_BYTES, content_type="audio/mpeg")
+
+    app = web.Application()
+    app.router.add_post("/v1/text-to-speech/{voice_id}", text_to_speech)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    return runner
+
+
+async def fresh_session_segment(base_url: str, output_path: str) -> None:
+    """Generate one segment the old way, with a new session per request."""
+    async with aiohttp.ClientSession() as session:
+        async with session.post(
+            f"{base_url}/text-to-speech/voice",
+            headers={"xi-api-key": "benchmark"},
+            json={"text": "Hello there", "model_id": "eleven_monolingual_v1"}
+        ) as response:
+            with open(output_path, 'wb') as f:
+                async for chunk in response.content.iter_chunked(8192):
+                    f.write(chunk)
+
+
+async def shared_client_segment(generator: DialogueAudioGenerator, index: int, segments: int, output_path: str) -> None:
+    """Generate one segment through the generator's shared client and save it."""
+    audio, _ = await generator._generate_segment(
+        text="Hello there",
+        voice_id="voice",
+        model_id="eleven_monolingual_v1",
+        voice_settings={},
+        segment_index=index,
+        total_segments=segments
+    )
+    with open(output_path, 'wb') as f:
+        f.write(audio)
+
+
+async def run_batches(make_task, segments: int, batch_size: int) -> float:
+    """Run segment tasks in concurrent batches and return segments per second."""
+    started_at = time.perf_counter()
+    for i in range(0, segments, batch_size):
+        await asyncio.gather(*(make_task(i + j) for j in range(min(batch_size, segments - i))))
+    return segments / (time.perf_counter() - started_at)
+
+
+async def benchmark(segments: int, batch_size: int, latency_ms: float) -> None:
+    """Compare segment throughput of both approaches against the mock server."""
+    runner = await start_mock_server(latency_ms)
+    port = runner.addresses[0][1]
+    base_url = f"http://127.0.0.1:{port}/v1"
+
+    # Limits high enough and no segment cache so only the HTTP client is measured
+    generator = DialogueAudioGenerator(
+        api_key="benchmark",
+        max_concurrency=batch_size,
+        requests_per_second=100000,
+        use_cache=False
+    )
+    generator.base_url = base_url
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = os.path.join(temp_dir, "segment.mp3")
+
+        fresh = await run_batches(
+            lambda i: fresh_session_segment(base_url, output_path),
+            segments, batch_size
+        )
+        shared = await run_batches(
+            lambda i: shared_client_segment(generator, i, segments, output_path),
+            segments, batch_size
+        )
+
+    await close_session()
+    await runner.cleanup()
+
+    print("=" * 50)
+    print(f"Segments: {segments}, batch size: {batch_size}, server latency: {latency_ms}ms")
+    print(f"Fresh session per segment: {fresh:8.1f} segments/s")
+    print(f"Shared client:             {shared:8.1f} segments/s ({shared / fresh:.2f}x)")
+    print("Note: the mock server is plain HTTP; against the real API the shared")
+    print("client also saves a DNS lookup and TLS handshake per segment.")
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--segments", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.segments, args.batch_size, args.latency_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -35,4 +35,46 @@ PODCAST_VOICES = {
 }
 
 # Model configuration
-ELEVENLABS_MODEL_ID = "eleven_monolingual_v1"  # Good for English podcasts</ELEVENLABS_TURBO_MODEL = "eleven_turbo_v2_5"  # Faster generation
\ No newline at end of file
+ELEVENLABS_MODEL_ID = "eleven_monolingual_v1"  # Good for English podcasts</ELEVENLABS_TURBO_MODEL = "eleven_turbo_v2_5"  # Faster generation
+
+# Hedged script generation
+HEDGE_MODEL = "gpt-4.1-mini"  # Faster model raced against a slow primary
+HEDGE_PERCENTILE = 0.9  # Hedge once the primary is slower than this latency percentile
+
+# ElevenLabs rate limits (defaults fit the Creator tier; raise them for larger plans)
+ELEVENLABS_MAX_CONCURRENCY = int(os.environ.get("ELEVENLABS_MAX_CONCURRENCY", "5"))
+ELEVENLABS_REQUESTS_PER_SECOND = float(os.environ.get("ELEVENLABS_REQUESTS_PER_SECOND", "10"))
+
+# Optional per-voice concurrency caps, e.g. ELEVENLABS_VOICE_CONCURRENCY="pNInz6obpgDQGcFmaJgB=2"
+ELEVENLABS_VOICE_CONCURRENCY = {
+    voice_id.strip(): int(limit)
+    for voice_id, _, limit in (
+        item.partition("=") for item in os.environ.get("ELEVENLABS_VOICE_CONCURRENCY", "").split(",")
+    )
+    if voice_id.strip() and limit.strip().isdigit()
+}
+
+# On-disk cache of rendered dialogue lines, reused when a script is re-rendered
+TTS_CACHE_DIR = Path(os.environ.get("TTS_CACHE_DIR", str(Path.home() / ".cache" / "listen-in" / "tts")))
+TTS_CACHE_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_MB", "500")) * 1024 * 1024
+
+# Durable state of multi-voice audio renders, so a render interrupted by a restart resumes
+RENDER_JOBS_DIR = Path(os.environ.get("RENDER_JOBS_DIR", str(Path.home() / ".cache" / "listen-in" / "jobs")))
+
+# Rendered segment audio kept in memory per render; beyond it segments are read back from the job's spool
+SEGMENT_MEMORY_MAX_BYTES = int(os.environ.get("SEGMENT_MEMORY_MAX_MB", "64")) * 1024 * 1024
+
+# Worker processes for CPU-bound audio assembly and encoding, keeping the event loop free
+AUDIO_WORKERS = int(os.environ.get("AUDIO_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Cached ElevenLabs model and voice lists are refreshed in the background once this old
+ELEVENLABS_METADATA_TTL_SECONDS = int(os.environ.get("ELEVENLABS_METADATA_TTL_SECONDS", "3600"))
+
+# Local receiver for ElevenLabs project callbacks (disabled when the port is 0).
+# PROJECT_WEBHOOK_PUBLIC_URL is the address ElevenLabs can reach that forwards to it.
+PROJECT_WEBHOOK_HOST = os.environ.get("PROJECT_WEBHOOK_HOST", "127.0.0.1")
+PROJECT_WEBHOOK_PORT = int(os.environ.get("PROJECT_WEBHOOK_PORT", "0"))
+PROJECT_WEBHOOK_PUBLIC_URL = os.environ.get("PROJECT_WEBHOOK_PUBLIC_URL", "")
+
+# Longest text sent in one text-to-speech request; longer scripts are split and rendered concurrently
+TTS_CHUNK_MAX_CHARS = int(os.environ.get("TTS_CHUNK_MAX_CHARS", "2500"))
@@ -1,11 +1,18 @@
 """Podcast script generator using OpenAI Agents SDK."""
 
 import os
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from agents import Agent, Runner
+from agents.exceptions import ModelBehaviorError
 from pydantic import BaseModel
 
+from .schema_repair import changed_sections_guidance, regenerate_fields, repair_structured_output
+from ..utils.llm_usage import summarize_usage
+from ..utils.resilience import call_with_retries, use_agents_client
+from ..utils.retrieval import select_relevant_content, source_word_budget
+
 
 class PodcastScript(BaseModel):
     """Output schema for podcast script generation."""
@@ -28,16 +35,20 @@ class PodcastScript(BaseModel):
 class AgentGenerator:
     """Generator for podcast scripts using OpenAI's Agents SDK."""
     
-    def __init__(self, api_key: str):
-        """Initialize with OpenAI API key."""
+    def __init__(self, api_key: str, model: str = "o3-2025-04-16"):
+        """Initialize with OpenAI API key and the model to generate with."""
+        self.model = model
         self.api_key = api_key
+        self.last_usage: Optional[Dict[str, Any]] = None
+        self.last_output: Optional[PodcastScript] = None
     
     async def generate(
         self,
         content: Dict[str, Any],
         tone: str = "conversational",
         audience: str = "general",
-        custom_instructions: Optional[str] = None
+        custom_instructions: Optional[str] = None,
+        duration_minutes: Optional[int] = None
     ) -> str:
         """
         Generate a monologue podcast script from parsed content using Agents SDK.
@@ -47,6 +58,7 @@ class AgentGenerator:
             tone: Tone of the script (conversational, educational, etc.)
             audience: Target audience level
             custom_instructions: Additional generation instructions
+            duration_minutes: Optional target duration in minutes
             
         Returns:
             Generated podcast script in markdown format
@@ -56,37 +68,48 @@ class AgentGenerator:
         metadata = content["metadata"]
         structure = content["structure"]
         
-        # Build the system prompt
-        system_prompt = self._build_system_prompt(tone, audience)
+        # Build the system prompt (fixed instructions only)
+        system_prompt = self._build_system_prompt()
         
-        # Build the user prompt
+        # Build the user prompt (document first, variant settings last)
         user_prompt = self._build_user_prompt(
             doc_content, 
             metadata, 
             structure,
-            custom_instructions
+            tone,
+            audience,
+            custom_instructions,
+            duration_minutes
         )
         
         # Create the agent with gpt-4.1-mini model
-        agent = Agent(
-            name="PodcastScriptWriter",
-            instructions=system_prompt,
-            model="o3-2025-04-16",
-            output_type=PodcastScript
-        )
+        agent = self._create_agent(system_prompt)
         
         # Generate the script using Runner
         try:
             # Set API key as environment variable
             os.environ['OPENAI_API_KEY'] = self.api_key
+            use_agents_client(self.api_key)
             
-            result = await Runner.run(
-                agent,
-                user_prompt
-            )
-            
-            # Extract the structured output
-            script_data = result.final_output
+            try:
+                started_at = time.perf_counter()
+                result = await call_with_retries(
+                    "openai-agents",
+                    lambda: Runner.run(
+                        agent,
+                        user_prompt
+                    )
+                )
+                self.last_usage = summarize_usage(result.context_wrapper.usage, started_at)
+                
+                # Extract the structured output
+                script_data = result.final_output
+            except ModelBehaviorError as e:
+                # Keep the valid segments and re-request only the broken ones
+                script_data, self.last_usage = await repair_structured_output(
+                    e, agent, PodcastScript, user_prompt
+                )
+            self.last_output = script_data
             
             # Format the final script
             script = self._format_script_from_structured(
@@ -100,31 +123,94 @@ class AgentGenerator:
                 
         except Exception as e:
             raise RuntimeError(f"Failed to generate podcast script: {str(e)}")
-    
-    def _build_system_prompt(self, tone: str, audience: str) -> str:
-        """Build the system prompt for the LLM."""
-        tone_guides = {
-            "conversational": "friendly, engaging, and natural as if talking to a friend",
-            "educational": "clear, informative, and structured for learning",
-            "professional": "polished, authoritative, and business-appropriate",
-            "casual": "relaxed, informal, and entertaining"
-        }
-        
-        audience_guides = {
-            "general": "accessible to anyone with basic knowledge",
-            "beginner": "simple explanations, avoid jargon, define terms",
-            "expert": "technical depth is welcome, assume domain knowledge",
-            "young": "energetic, relatable examples, shorter sentences"
+
+    async def regenerate_segments(
+        self,
+        content: Dict[str, Any],
+        previous: Dict[str, Any],
+        fields: List[str],
+        changed_sections: List[str],
+        tone: str = "conversational",
+        audience: str = "general",
+        custom_instructions: Optional[str] = None,
+        duration_minutes: Optional[int] = None
+    ) -> str:
+        """
+        Rewrite only some segments of a previously generated script.
+
+        Args:
+            content: Parsed content of the updated document
+            previous: Structured output of the previous generation
+            fields: Segments to rewrite; all others are reused verbatim
+            changed_sections: Text of the new or amended document sections
+            tone: Tone of the script
+            audience: Target audience level
+            custom_instructions: Additional generation instructions
+            duration_minutes: Optional target duration in minutes
+
+        Returns:
+            Updated podcast script in markdown format
+        """
+        previous_data = PodcastScript.model_validate(previous)
+        kept = {
+            name: getattr(previous_data, name)
+            for name in PodcastScript.model_fields
+            if name not in fields
         }
+
+        # Same prompts as the original generation so the cached prefix is reused
+        user_prompt = self._build_user_prompt(
+            content["content"],
+            content["metadata"],
+            content["structure"],
+            tone,
+            audience,
+            custom_instructions,
+            duration_minutes
+        )
+        agent = self._create_agent(self._build_system_prompt())
+
+        try:
+            os.environ['OPENAI_API_KEY'] = self.api_key
+            use_agents_client(self.api_key)
+
+            script_data, self.last_usage = await regenerate_fields(
+                agent, PodcastScript, user_prompt, kept, fields,
+                guidance=changed_sections_guidance(changed_sections)
+            )
+            self.last_output = script_data
+
+            return self._format_script_from_structured(
+                script_data,
+                content["metadata"],
+                tone,
+                audience
+            )
+
+        except Exception as e:
+            raise RuntimeError(f"Failed to update podcast script: {str(e)}")
+
+    def _create_agent(self, system_prompt: str) -> Agent:
+        """Create the script-writing agent."""
+        return Agent(
+            name="PodcastScriptWriter",
+            instructions=system_prompt,
+            model=self.model,
+            output_type=PodcastScript
+        )
+
+    def _build_system_prompt(self) -> str:
+        """
+        Build the system prompt for the LLM.
         
-        tone_guide = tone_guides.get(tone, tone_guides["conversational"])
-        audience_guide = audience_guides.get(audience, audience_guides["general"])
-        
-        return f"""You are a professional podcast script writer. Your task is to transform written documents into engaging monologue podcast scripts.
+        The system prompt holds only fixed instructions so that it, followed by
+        the document, forms a prefix the provider can cache across variants.
+        """
+        return """You are a professional podcast script writer. Your task is to transform written documents into engaging monologue podcast scripts.
 
 Key guidelines:
-1. Write in a {tone_guide} style
-2. Target audience: {audience_guide}
+1. Write in the tone given in the episode settings
+2. Pitch explanations at the target audience given in the episode settings
 3. Create natural speech patterns with:
    - Conversational transitions
    - Rhetorical questions
@@ -140,6 +226,15 @@ Key guidelines:
 7. Include time estimates for sections
 8. Make complex topics accessible through analogies and examples
 
+Requirements:
+1. Create a natural, flowing monologue that sounds great when read aloud
+2. Add an engaging introduction that hooks the listener
+3. Include smooth transitions between topics
+4. Add [PAUSE] markers for natural breathing points
+5. Use [EMPHASIS] for key points that need vocal emphasis
+6. End with a memorable conclusion that summarizes key takeaways
+7. Maintain accuracy to the source material while making it conversational
+
 Output a structured podcast script with clear sections."""
     
     def _build_user_prompt(
@@ -147,14 +242,49 @@ Output a structured podcast script with clear sections."""
         content: str, 
         metadata: Dict[str, Any],
         structure: Dict[str, Any],
-        custom_instructions: Optional[str]
+        tone: str,
+        audience: str,
+        custom_instructions: Optional[str],
+        duration_minutes: Optional[int] = None
     ) -> str:
-        """Build the user prompt with document content."""
+        """
+        Build the user prompt with document content.
+        
+        The document comes first and the per-variant settings (tone, audience,
+        custom instructions) last, so variants of one document share a prefix.
+        """
+        tone_guides = {
+            "conversational": "friendly, engaging, and natural as if talking to a friend",
+            "educational": "clear, informative, and structured for learning",
+            "professional": "polished, authoritative, and business-appropriate",
+            "casual": "relaxed, informal, and entertaining"
+        }
+        
+        audience_guides = {
+            "general": "accessible to anyone with basic knowledge",
+            "beginner": "simple explanations, avoid jargon, define terms",
+            "expert": "technical depth is welcome, assume domain knowledge",
+            "young": "energetic, relatable examples, shorter sentences"
+        }
+        
+        tone_guide = tone_guides.get(tone, tone_guides["conversational"])
+        audience_guide = audience_guides.get(audience, audience_guides["general"])
+        
         # For large documents, create a summary first
         word_count = metadata.get('word_count', 0)
+        word_budget = source_word_budget(duration_minutes)
+        
+        # When the user asks for a focus, send the most relevant sections
+        focused_content = None
+        if custom_instructions and word_count > word_budget:
+            focused_content = select_relevant_content(
+                content, structure, custom_instructions, word_budget
+            )
         
+        if focused_content:
+            content = focused_content
         # If document is very large, truncate intelligently
-        if word_count > 3000:
+        elif word_count > 3000:
             # Take beginning, middle, and end sections
             lines = content.split('\n')
             total_lines = len(lines)
@@ -168,9 +298,7 @@ Output a structured podcast script with clear sections."""
             
             content = f"{first_section}\n\n[... content truncated ...]\n\n{middle_section}\n\n[... content truncated ...]\n\n{last_section}"
             
-        prompt = f"""Transform this document into an engaging podcast monologue script.
-
-Document Title: {metadata.get('title', 'Untitled')}
+        prompt = f"""Document Title: {metadata.get('title', 'Untitled')}
 Word Count: {metadata.get('word_count', 0)}
 Estimated Speaking Time: {metadata.get('word_count', 0) // 150} minutes
 
@@ -179,15 +307,14 @@ Document Content:
 {content}
 ---
 
-Requirements:
-1. Create a natural, flowing monologue that sounds great when read aloud
-2. Add an engaging introduction that hooks the listener
-3. Include smooth transitions between topics
-4. Add [PAUSE] markers for natural breathing points
-5. Use [EMPHASIS] for key points that need vocal emphasis
-6. End with a memorable conclusion that summarizes key takeaways
-7. Maintain accuracy to the source material while making it conversational
-"""
+Transform the document above into an engaging podcast monologue script.
+
+Episode Settings:
+- Tone: write in a {tone_guide} style
+- Target audience: {audience_guide}"""
+        
+        if duration_minutes:
+            prompt += f"\n- Target duration: {duration_minutes} minutes ({duration_minutes * 150} words)"
         
         if custom_instructions:
             prompt += f"\n\nAdditional Instructions:\n{custom_instructions}"
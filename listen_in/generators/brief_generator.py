@@ -0,0 +1,113 @@
+"""Condensed document brief shared by several script generations."""
+
+import time
+from typing import Dict, Any, Optional
+from openai import AsyncOpenAI
+
+from ..utils.llm_usage import summarize_usage
+from ..utils.resilience import call_with_retries
+from ..utils.retrieval import select_relevant_content, source_word_budget
+
+# Documents at or below this size are passed to the generators unchanged
+BRIEF_THRESHOLD_WORDS = 3000
+
+# Target length of the condensed brief
+BRIEF_TARGET_WORDS = 1500
+
+
+class BriefGenerator:
+    """Condenses a parsed document into a brief that several scripts can share."""
+
+    def __init__(self, api_key: str, model: str = "gpt-4.1-mini"):
+        """Initialize with OpenAI API key."""
+        # Retries are handled by call_with_retries so they are counted
+        self.client = AsyncOpenAI(api_key=api_key, max_retries=0)
+        self.model = model
+        self.last_usage: Optional[Dict[str, Any]] = None
+
+    async def generate(
+        self,
+        content: Dict[str, Any],
+        focus: Optional[str] = None,
+        max_duration_minutes: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Build a condensed brief of a parsed document.
+
+        Small documents are returned unchanged. Larger ones are reduced to the
+        relevant excerpt (when a focus is given) and summarized once, and the
+        result is returned in the parser's format so any generator can use it.
+
+        Args:
+            content: Parsed document content with metadata
+            focus: Optional topic to concentrate the brief on
+            max_duration_minutes: Longest script duration the brief must support
+
+        Returns:
+            Parsed-document dictionary whose content is the brief
+        """
+        doc_content = content["content"]
+        metadata = content["metadata"]
+        structure = content["structure"]
+
+        if metadata.get("word_count", 0) <= BRIEF_THRESHOLD_WORDS:
+            return content
+
+        # Pick the source material first so the summary call stays small
+        word_budget = source_word_budget(max_duration_minutes)
+        source = None
+        if focus:
+            source = select_relevant_content(doc_content, structure, focus, word_budget * 2)
+        if not source:
+            source = doc_content
+
+        prompt = f"""Condense the following document into a factual brief of about {BRIEF_TARGET_WORDS} words for podcast script writers.
+
+Keep:
+- The main topics in the order they appear
+- Key facts, figures, dates, names and definitions
+- Anything surprising, counter-intuitive or especially relevant to everyday life
+
+Write plain prose under short topic headings. Do not add opinions or jokes.
+"""
+        if focus:
+            prompt += f"\nConcentrate on: {focus}\n"
+
+        prompt += f"""
+Document Title: {metadata.get('title', 'Untitled')}
+
+Document Content:
+---
+{source}
+---"""
+
+        try:
+            started_at = time.perf_counter()
+            response = await call_with_retries(
+                "openai-responses",
+                lambda: self.client.responses.create(
+                    model=self.model,
+                    input=prompt
+                )
+            )
+            self.last_usage = summarize_usage(response.usage, started_at)
+        except Exception as e:
+            raise RuntimeError(f"Failed to generate document brief: {str(e)}")
+
+        brief = response.output_text
+        brief_word_count = len(brief.split())
+
+        return {
+            "content": brief,
+            "metadata": {
+                **metadata,
+                "source_word_count": metadata.get("word_count", 0),
+                "word_count": brief_word_count,
+                "is_brief": True
+            },
+            "structure": {
+                "sections": [{"content": brief, "word_count": brief_word_count}],
+                "has_headings": True,
+                "estimated_reading_time": brief_word_count // 200
+            }
+        }
@@ -1,23 +1,89 @@
 """Dialogue audio generation with multiple voices using ElevenLabs."""
 
-import os
+import io
+import logging
 import re
-import aiohttp
 import asyncio
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Set, Tuple
 from pathlib import Path
 from datetime import datetime
-import tempfile
+import time
 from pydub import AudioSegment
+from pydub.silence import detect_leading_silence
+
+from ..config import (
+    AUDIO_WORKERS,
+    ELEVENLABS_MAX_CONCURRENCY,
+    ELEVENLABS_REQUESTS_PER_SECOND,
+    ELEVENLABS_VOICE_CONCURRENCY,
+    RENDER_JOBS_DIR,
+    SEGMENT_MEMORY_MAX_BYTES,
+    TTS_CACHE_DIR,
+    TTS_CACHE_MAX_BYTES
+)
+from ..utils.audio_workers import get_audio_worker_pool
+from ..utils.elevenlabs_client import ELEVENLABS_BASE_URL, synthesize_speech
+from ..utils.mp3_concat import MP3FrameWriter, concatenate_mp3
+from ..utils.pcm_mix import SILENCE_THRESHOLD_DBFS, assemble_pcm, pcm_sample_rate
+from ..utils.rate_limit import AdaptiveLimiter, get_limiter
+from ..utils.render_jobs import RenderJobStore, get_render_job_store, render_job_id
+from ..utils.segment_planner import DEFAULT_MAX_SEGMENT_CHARS, DialogueLine, plan_segments
+from ..utils.segment_store import SegmentStore
+from ..utils.tts_cache import TTSCache, get_tts_cache, segment_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Pause inserted between dialogue lines for natural pacing; rendered silence
+# at segment edges is trimmed so this is the whole gap
+PAUSE_MS = 300
+
+# Jobs being rendered in this process, so one job never runs twice at once
+_running_jobs: Set[str] = set()
 
 
 class DialogueAudioGenerator:
     """Generator for dialogue podcast audio with multiple voices."""
     
-    def __init__(self, api_key: str):
-        """Initialize with ElevenLabs API key."""
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: Optional[int] = None,
+        requests_per_second: Optional[float] = None,
+        voice_concurrency: Optional[Dict[str, int]] = None,
+        cache: Optional[TTSCache] = None,
+        use_cache: bool = True,
+        max_segment_chars: int = DEFAULT_MAX_SEGMENT_CHARS,
+        job_store: Optional[RenderJobStore] = None
+    ):
+        """
+        Initialize with ElevenLabs API key, optional rate limits, segment cache and job store.
+        
+        Limits default to the ELEVENLABS_* settings in config. The account
+        limits are shared by every generator using the same API key. Rendered
+        segments are cached in the shared cache of TTS_CACHE_DIR unless
+        another cache is given or use_cache is False. Consecutive lines of
+        one host are rendered as one segment of up to max_segment_chars
+        characters. Render progress is
+        kept in the shared store of RENDER_JOBS_DIR unless another job store
+        is given.
+        """
         self.api_key = api_key
-        self.base_url = "https://api.elevenlabs.io/v1"
+        self.base_url = ELEVENLABS_BASE_URL
+        self.max_segment_chars = max_segment_chars
+        self.account_limiter = get_limiter(
+            "elevenlabs",
+            api_key,
+            max_concurrency or ELEVENLABS_MAX_CONCURRENCY,
+            requests_per_second or ELEVENLABS_REQUESTS_PER_SECOND
+        )
+        self.voice_concurrency = (
+            voice_concurrency if voice_concurrency is not None else ELEVENLABS_VOICE_CONCURRENCY
+        )
+        self.cache: Optional[TTSCache] = None
+        if use_cache:
+            self.cache = cache if cache is not None else get_tts_cache(TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES)
+        self.jobs = job_store if job_store is not None else get_render_job_store(RENDER_JOBS_DIR)
+        self.workers = get_audio_worker_pool(AUDIO_WORKERS)
         
         # Voice mappings for our hosts
         self.voice_mapping = {
@@ -30,26 +96,46 @@ class DialogueAudioGenerator:
         script_content: str,
         output_path: str,
         model_id: str = "eleven_monolingual_v1",
-        voice_settings: Optional[Dict[str, float]] = None
+        voice_settings: Optional[Dict[str, float]] = None,
+        output_format: str = "mp3_44100_128",
+        stream: bool = False
     ) -> Dict[str, Any]:
         """
         Generate dialogue audio from a podcast script.
         
+        The render is recorded as a job keyed by the script, settings and
+        output path. Rendered segments are kept until the output is written,
+        so after a crash or restart the same call (or resume_job) renders
+        only the missing segments. Resumed and uninterrupted renders produce
+        identical files. A job already rendering in this process raises
+        ValueError instead of running twice.
+        
         Args:
             script_content: The dialogue podcast script
             output_path: Path to save the final audio file
             model_id: Model ID for generation
             voice_settings: Optional voice settings override
+            output_format: ElevenLabs audio output format; a "pcm_*" format
+                mixes raw segments with crossfades and loudness normalization
+                before a single MP3 encode
+            stream: Render segments with the streaming endpoint and append
+                each to output_path, in script order, as soon as it and every
+                earlier segment are done, so playback can start early
             
         Returns:
             Dictionary with audio file path and metadata
         """
-        # Parse the dialogue into segments
-        dialogue_segments = self._parse_dialogue(script_content)
+        # Parse the dialogue and merge consecutive lines of the same host into segments
+        dialogue_lines = self._parse_dialogue(script_content)
         
-        if not dialogue_segments:
+        if not dialogue_lines:
             raise ValueError("No dialogue segments found in script")
         
+        dialogue_segments = plan_segments(
+            [DialogueLine(speaker, text) for speaker, text in dialogue_lines],
+            self.max_segment_chars
+        )
+        
         # Default voice settings for more natural conversation
         if not voice_settings:
             voice_settings = {
@@ -59,74 +145,172 @@ class DialogueAudioGenerator:
                 "use_speaker_boost": True
             }
         
-        # Generate audio for each segment
-        temp_files = []
+        sample_rate = pcm_sample_rate(output_format)
+        if stream and sample_rate:
+            raise ValueError("Streaming render needs an MP3 output format")
+        
+        for segment in dialogue_segments:
+            if segment.speaker not in self.voice_mapping:
+                raise ValueError(f"Unknown speaker: {segment.speaker}")
+        
+        # Everything that determines the output, enough to run the job again
+        params = {
+            "script_content": script_content,
+            "model_id": model_id,
+            "voice_settings": voice_settings,
+            "output_format": output_format,
+            "stream": stream,
+            "voices": self.voice_mapping,
+            "max_segment_chars": self.max_segment_chars
+        }
+        job_id = render_job_id(output_path, params)
+        if job_id in _running_jobs:
+            raise ValueError(f"Render job {job_id} is already running")
+        completed = self.jobs.open_job(
+            job_id,
+            output_path,
+            params,
+            [segment._asdict() for segment in dialogue_segments]
+        )
+        
+        # Rendered audio stays in memory and is appended to the job's single spool file
+        segments = SegmentStore(self.jobs.spool_path(job_id), completed, SEGMENT_MEMORY_MAX_BYTES)
+        tasks = []
+        
+        started_at = time.monotonic()
+        _running_jobs.add(job_id)
         
         try:
-            print(f"Generating audio for {len(dialogue_segments)} dialogue segments...")
+            logger.info(f"Generating audio for {len(dialogue_lines)} dialogue lines in {len(dialogue_segments)} segments...")
+            if completed:
+                logger.info(f"Resuming job {job_id}: {len(completed)} segments already rendered")
             
-            # Process segments in batches to avoid rate limits
-            batch_size = 5
-            for i in range(0, len(dialogue_segments), batch_size):
-                batch = dialogue_segments[i:i+batch_size]
-                batch_tasks = []
+            for i, segment in enumerate(dialogue_segments):
+                voice_id = self.voice_mapping[segment.speaker]
                 
-                for j, (speaker, text) in enumerate(batch):
-                    voice_id = self.voice_mapping.get(speaker)
-                    if not voice_id:
-                        raise ValueError(f"Unknown speaker: {speaker}")
-                    
-                    # Create temporary file for this segment
-                    temp_file = tempfile.NamedTemporaryFile(suffix='.mp3', delete=False)
-                    temp_files.append(temp_file.name)
-                    temp_file.close()
-                    
-                    # Add task to generate this segment
-                    task = self._generate_segment(
-                        text=text,
-                        voice_id=voice_id,
-                        output_path=temp_file.name,
-                        model_id=model_id,
-                        voice_settings=voice_settings,
-                        segment_index=i+j,
-                        total_segments=len(dialogue_segments)
-                    )
-                    batch_tasks.append(task)
-                
-                # Generate batch concurrently
-                await asyncio.gather(*batch_tasks)
+                # Segments finished by an earlier attempt are used as they are
+                if i in completed:
+                    done = asyncio.get_running_loop().create_future()
+                    done.set_result(None)
+                    tasks.append(done)
+                    continue
                 
-                # Small delay between batches to avoid rate limits
-                if i + batch_size < len(dialogue_segments):
-                    await asyncio.sleep(1)
+                # Start every segment at once; the rate limiters pace the requests
+                tasks.append(asyncio.ensure_future(self._generate_job_segment(
+                    job_id,
+                    segments,
+                    text=segment.text,
+                    voice_id=voice_id,
+                    model_id=model_id,
+                    voice_settings=voice_settings,
+                    segment_index=i,
+                    total_segments=len(dialogue_segments),
+                    output_format=output_format,
+                    stream=stream
+                )))
+            
+            if stream:
+                combined = await self._write_in_order(job_id, tasks, segments, output_path, started_at)
             
-            # Combine all audio segments
-            print("Combining audio segments...")
-            self._combine_audio_segments(temp_files, output_path)
+            rendered = await asyncio.gather(*tasks)
             
-            # Calculate total duration
-            final_audio = AudioSegment.from_mp3(output_path)
-            duration_seconds = len(final_audio) / 1000
+            # Report how much audio came from the cache
+            cache_stats = {
+                "reused_segments": 0,
+                "synthesized_segments": 0,
+                "reused_characters": 0,
+                "synthesized_characters": 0
+            }
+            for outcome in rendered:
+                if outcome is None:
+                    continue
+                cached, characters = outcome
+                kind = "reused" if cached else "synthesized"
+                cache_stats[f"{kind}_segments"] += 1
+                cache_stats[f"{kind}_characters"] += characters
+            logger.info(
+                f"Reused {cache_stats['reused_segments']} cached segments "
+                f"({cache_stats['reused_characters']} characters), synthesized "
+                f"{cache_stats['synthesized_segments']} ({cache_stats['synthesized_characters']} characters)"
+            )
+            
+            # Combine all audio segments in a worker process, reading them from the spool
+            if not stream:
+                logger.info("Combining audio segments...")
+                combined = await self.workers.run_to_file(
+                    job_id,
+                    assemble_segments,
+                    output_path,
+                    segments.spool_path,
+                    segments.locations,
+                    sample_rate
+                )
+            duration_seconds = combined["duration_seconds"]
+            render_seconds = round(time.monotonic() - started_at, 2)
+            buffer_stats = segments.stats()
+            segments.close()
+            self.jobs.finish(job_id)
             
             return {
                 "audio_path": output_path,
+                "job_id": job_id,
+                "resumed_segments": len(completed),
+                "total_lines": len(dialogue_lines),
                 "total_segments": len(dialogue_segments),
                 "duration_seconds": duration_seconds,
                 "duration_minutes": round(duration_seconds / 60, 1),
                 "speakers": list(self.voice_mapping.keys()),
+                "cache": cache_stats,
+                "segment_buffer": buffer_stats,
+                "concatenation": combined["method"],
+                "trimmed_silence_seconds": combined.get("trimmed_seconds"),
+                "streamed": stream,
+                "time_to_first_audio_seconds": combined.get("time_to_first_audio_seconds", render_seconds),
+                "render_seconds": render_seconds,
                 "status": "completed",
                 "generated_at": datetime.now().isoformat()
             }
             
         except Exception as e:
+            # Rendered segments stay on disk for the next attempt
+            self.jobs.fail(job_id, str(e))
             raise RuntimeError(f"Failed to generate dialogue audio: {str(e)}")
         finally:
-            # Cleanup temporary files
-            for temp_file in temp_files:
-                try:
-                    os.unlink(temp_file)
-                except:
-                    pass
+            # Stop segments and assembly still waiting after a failure or cancellation
+            for task in tasks:
+                task.cancel()
+            stopped = self.workers.cancel_job(job_id)
+            if stopped["running"]:
+                logger.warning(
+                    f"{stopped['running']} audio worker call(s) of job {job_id} could not be stopped; "
+                    "their output is discarded when they finish"
+                )
+            segments.close()
+            _running_jobs.discard(job_id)
+    
+    async def resume_job(self, job_id: str) -> Dict[str, Any]:
+        """
+        Finish an interrupted or failed render, e.g. one listed by
+        self.jobs.unfinished_jobs() after a restart.
+        
+        Returns:
+            The same result generate_audio returns
+        """
+        job = self.jobs.get_job(job_id)
+        if job is None:
+            raise ValueError(f"Unknown render job: {job_id}")
+        
+        params = job["params"]
+        self.voice_mapping = params["voices"]
+        self.max_segment_chars = params["max_segment_chars"]
+        return await self.generate_audio(
+            script_content=params["script_content"],
+            output_path=job["output_path"],
+            model_id=params["model_id"],
+            voice_settings=params["voice_settings"],
+            output_format=params["output_format"],
+            stream=params["stream"]
+        )
     
     def _parse_dialogue(self, script_content: str) -> List[Tuple[str, str]]:
         """Parse dialogue script into (speaker, text) tuples."""
@@ -173,16 +357,28 @@ class DialogueAudioGenerator:
         self,
         text: str,
         voice_id: str,
-        output_path: str,
         model_id: str,
         voice_settings: Dict[str, float],
         segment_index: int,
-        total_segments: int
-    ) -> None:
-        """Generate audio for a single dialogue segment."""
-        # Add subtle pauses for natural conversation flow
-        if segment_index > 0:
-            text = "... " + text
+        total_segments: int,
+        output_format: str = "mp3_44100_128",
+        stream: bool = False
+    ) -> Tuple[bytes, bool]:
+        """
+        Generate audio for a single dialogue segment.
+        
+        With stream set, the streaming endpoint is used, which starts
+        returning audio before the whole segment is synthesized.
+        
+        Returns:
+            Tuple of the segment's audio and whether it came from the cache
+        """
+        # Lines unchanged since an earlier render are read from the cache
+        cache_key = segment_cache_key(text, voice_id, model_id, voice_settings, output_format)
+        cached = self.cache.get(cache_key) if self.cache else None
+        if cached is not None:
+            logger.info(f"✓ Reused segment {segment_index+1}/{total_segments} from cache")
+            return cached, True
         
         payload = {
             "text": text,
@@ -190,48 +386,183 @@ class DialogueAudioGenerator:
             "voice_settings": voice_settings
         }
         
-        headers = {
-            "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": self.api_key
-        }
+        url = f"{self.base_url}/text-to-speech/{voice_id}"
+        if stream:
+            url += "/stream"
         
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{self.base_url}/text-to-speech/{voice_id}",
-                headers=headers,
-                json=payload
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    raise RuntimeError(f"ElevenLabs API error for segment {segment_index+1}: {response.status} - {error_text}")
-                
-                # Write audio data
-                with open(output_path, 'wb') as f:
-                    async for chunk in response.content.iter_chunked(8192):
-                        f.write(chunk)
-                
-                print(f"✓ Generated segment {segment_index+1}/{total_segments}")
+        buffer = io.BytesIO()
+        await synthesize_speech(
+            self.api_key,
+            url,
+            payload,
+            {"output_format": output_format},
+            buffer,
+            self._limiters_for(voice_id),
+            f"segment {segment_index+1}"
+        )
+        audio = buffer.getvalue()
+        
+        if self.cache:
+            self.cache.put(cache_key, audio)
+        logger.info(f"✓ Generated segment {segment_index+1}/{total_segments}")
+        return audio, False
+    
+    async def _generate_job_segment(self, job_id: str, segments: SegmentStore, **kwargs: Any) -> Tuple[bool, int]:
+        """
+        Render a job's segment into the segment store and record it there.
+        
+        Returns:
+            Tuple of whether the audio came from the cache and the number of
+            characters in the segment
+        """
+        audio, cached = await self._generate_segment(**kwargs)
+        index = kwargs["segment_index"]
+        offset, size = segments.add(index, audio)
+        self.jobs.complete_segment(job_id, index, offset, size)
+        return cached, len(kwargs["text"])
     
-    def _combine_audio_segments(self, temp_files: List[str], output_path: str) -> None:
-        """Combine multiple audio segments into one file."""
-        combined = AudioSegment.empty()
+    async def _write_in_order(
+        self,
+        job_id: str,
+        tasks: List[asyncio.Future],
+        segments: SegmentStore,
+        output_path: str,
+        started_at: float
+    ) -> Dict[str, Any]:
+        """
+        Append segments to the output in script order as they finish rendering.
         
-        # Add a short silence between segments for natural pacing
-        silence = AudioSegment.silent(duration=300)  # 300ms pause
+        The output is a playable MP3 after every append. Appends run in a
+        thread so the event loop keeps serving other requests. If a segment's
+        format differs from the first, the remaining segments are awaited and
+        the whole output is re-encoded in a worker process instead.
         
-        for i, temp_file in enumerate(temp_files):
-            segment = AudioSegment.from_mp3(temp_file)
-            
-            if i > 0:
-                # Add natural pause between speakers
-                combined += silence
-            
-            combined += segment
+        Returns:
+            Dictionary with the method used, the output duration and the time
+            from the start of the render until the first audio was written
+        """
+        writer = MP3FrameWriter(output_path, pause_ms=PAUSE_MS, trim_silence=True)
+        first_audio_seconds = None
+        try:
+            for i, task in enumerate(tasks):
+                await task
+                await asyncio.to_thread(writer.append, segments.read(i))
+                if first_audio_seconds is None:
+                    first_audio_seconds = round(time.monotonic() - started_at, 2)
+                    logger.info(f"▶️ {output_path} playable after {first_audio_seconds}s")
+        except ValueError as e:
+            writer.close()
+            logger.warning(f"⚠️ Cannot append segment {i+1} ({e}); re-encoding once all segments finish")
+            await asyncio.gather(*tasks)
+            combined = await self.workers.run_to_file(
+                job_id,
+                assemble_segments,
+                output_path,
+                segments.spool_path,
+                segments.locations,
+                None,
+                True
+            )
+        else:
+            combined = writer.close()
+            combined["time_to_first_audio_seconds"] = first_audio_seconds
+            logger.info(f"✅ Streamed {len(tasks)} segments into {output_path}")
+        
+        return combined
+    
+    def _limiters_for(self, voice_id: str) -> List[AdaptiveLimiter]:
+        """Return the limiters a request for a voice must pass, voice first."""
+        limiters = [self.account_limiter]
+        voice_limit = self.voice_concurrency.get(voice_id)
+        if voice_limit:
+            limiters.insert(0, get_limiter(f"elevenlabs:{voice_id}", self.api_key, voice_limit))
+        return limiters
+
+
+def _trim_silence(segment: AudioSegment) -> AudioSegment:
+    """Drop silence at the start and end of a decoded segment."""
+    start = detect_leading_silence(segment, silence_threshold=SILENCE_THRESHOLD_DBFS)
+    end = len(segment) - detect_leading_silence(segment.reverse(), silence_threshold=SILENCE_THRESHOLD_DBFS)
+    return segment[start:end] if end > start else segment
+
+
+def _reencode_audio_segments(audio: List[memoryview], output_path: str) -> Dict[str, Any]:
+    """Decode segments of differing formats, join their PCM once and encode once."""
+    segments = [_trim_silence(AudioSegment.from_file(io.BytesIO(data))) for data in audio]
+    
+    # Convert everything to the richest format among the segments
+    frame_rate = max(segment.frame_rate for segment in segments)
+    channels = max(segment.channels for segment in segments)
+    sample_width = max(segment.sample_width for segment in segments)
+    segments = [
+        segment.set_frame_rate(frame_rate).set_channels(channels).set_sample_width(sample_width)
+        for segment in segments
+    ]
+    
+    silence = AudioSegment.silent(duration=PAUSE_MS, frame_rate=frame_rate)
+    silence = silence.set_channels(channels).set_sample_width(sample_width)
+    
+    # A single join avoids copying the growing buffer on every append
+    raw_data = silence.raw_data.join(segment.raw_data for segment in segments)
+    combined = segments[0]._spawn(raw_data)
+    
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    combined.export(output_path, format="mp3", bitrate="128k")
+    
+    return {
+        "method": "reencode",
+        "duration_seconds": round(len(combined) / 1000, 3)
+    }
+
+
+def assemble_segments(
+    spool_path: str,
+    locations: Dict[int, Tuple[int, int]],
+    sample_rate: Optional[int] = None,
+    reencode: bool = False,
+    *,
+    output_path: str
+) -> Dict[str, Any]:
+    """
+    Combine a render's segments from its spool into one file.
+    
+    Runs in an audio worker process through run_to_file, so output_path
+    is a temporary file and progress goes to the log, not stdout, which
+    belongs to the MCP protocol. PCM segments are mixed and encoded
+    once. MP3 segments normally share one format, so their frames are
+    copied as-is with silent frames for the pauses; only if formats differ
+    (or reencode is set) are they decoded and re-encoded once.
+    
+    Args:
+        spool_path: The render's spool file
+        locations: Spool offset and size of every segment, by index
+        sample_rate: Sample rate of PCM segments, None for MP3
+        reencode: Skip straight to decoding and re-encoding
+        output_path: Where to write the combined audio
+    
+    Returns:
+        Dictionary with the method used and the output duration
+    """
+    segments = SegmentStore(spool_path, locations, max_memory_bytes=0)
+    try:
+        audio = [segments.read(i) for i in range(len(segments))]
+        if sample_rate:
+            combined = assemble_pcm(audio, output_path, sample_rate, pause_ms=PAUSE_MS, trim_silence=True)
+            logger.info(f"✅ Mixed {len(audio)} segments into {output_path}")
+            return combined
         
-        # Ensure output directory exists
-        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        if not reencode:
+            try:
+                combined = concatenate_mp3(audio, output_path, pause_ms=PAUSE_MS, trim_silence=True)
+            except ValueError as e:
+                logger.warning(f"⚠️ Cannot join MP3 frames directly ({e}); re-encoding")
+                reencode = True
+        if reencode:
+            combined = _reencode_audio_segments(audio, output_path)
         
-        # Export combined audio
-        combined.export(output_path, format="mp3", bitrate="128k")
-        print(f"✅ Combined {len(temp_files)} segments into {output_path}")
\ No newline at end of file
+        logger.info(f"✅ Combined {len(audio)} segments into {output_path}")
+        return combined
+    finally:
+        # Views into the spool's memory map must go before the map is closed
+        audio = None
+        segments.close()
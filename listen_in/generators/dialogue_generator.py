@@ -1,11 +1,23 @@
 """Dialogue-style podcast script generator with two hosts using OpenAI Agents SDK."""
 
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
-from agents import Agent, Runner
+from agents import Agent
+from agents.exceptions import ModelBehaviorError
 from pydantic import BaseModel, Field
 
+from .duration_control import (
+    DIALOGUE_SEGMENT_SHARES,
+    DurationTracker,
+    allocate_budgets,
+    format_budgets,
+    stream_with_duration_control
+)
+from .schema_repair import changed_sections_guidance, regenerate_fields, repair_structured_output
+from ..utils.resilience import use_agents_client
+from ..utils.retrieval import WORDS_PER_MINUTE, select_relevant_content, source_word_budget
+
 
 class DialogueLine(BaseModel):
     """A single line of dialogue in the podcast."""
@@ -41,9 +53,13 @@ class PodcastDialogue(BaseModel):
 class DialogueGenerator:
     """Generator for two-host dialogue podcast scripts using OpenAI's Agents SDK."""
     
-    def __init__(self, api_key: str):
-        """Initialize with OpenAI API key."""
+    def __init__(self, api_key: str, model: str = "o3-2025-04-16"):
+        """Initialize with OpenAI API key and the model to generate with."""
+        self.model = model
         self.api_key = api_key
+        self.last_usage: Optional[Dict[str, Any]] = None
+        self.last_output: Optional[PodcastDialogue] = None
+        self.last_duration: Optional[Dict[str, Any]] = None
     
     async def generate(
         self,
@@ -51,7 +67,8 @@ class DialogueGenerator:
         tone: str = "fun",
         audience: str = "general",
         duration_minutes: int = 5,
-        custom_instructions: Optional[str] = None
+        custom_instructions: Optional[str] = None,
+        focus: Optional[str] = None
     ) -> str:
         """
         Generate a two-host dialogue podcast script from parsed content.
@@ -62,6 +79,8 @@ class DialogueGenerator:
             audience: Target audience level
             duration_minutes: Target duration in minutes (default: 5)
             custom_instructions: Additional generation instructions
+            focus: Query used to pick the most relevant sections of content
+                over the source budget (default: custom_instructions)
             
         Returns:
             Generated podcast script in markdown format
@@ -71,38 +90,44 @@ class DialogueGenerator:
         metadata = content["metadata"]
         structure = content["structure"]
         
-        # Build the system prompt
-        system_prompt = self._build_system_prompt(tone, audience, duration_minutes)
+        # Build the system prompt (fixed instructions only)
+        system_prompt = self._build_system_prompt()
         
-        # Build the user prompt
+        # Build the user prompt (document first, variant settings last)
         user_prompt = self._build_user_prompt(
             doc_content, 
             metadata, 
             structure,
+            tone,
+            audience,
             duration_minutes,
-            custom_instructions
+            custom_instructions,
+            focus
         )
         
         # Create the agent with gpt-4.1-mini model
-        agent = Agent(
-            name="PodcastDialogueWriter",
-            instructions=system_prompt,
-            model="o3-2025-04-16",
-            output_type=PodcastDialogue
-        )
+        agent = self._create_agent(system_prompt)
+        
+        # Track segment lengths while streaming to hit the target duration
+        tracker = DurationTracker(duration_minutes * WORDS_PER_MINUTE, DIALOGUE_SEGMENT_SHARES)
         
-        # Generate the script using Runner
+        # Generate the script, streaming so segment lengths can be corrected
         try:
             # Set API key as environment variable
             os.environ['OPENAI_API_KEY'] = self.api_key
+            use_agents_client(self.api_key)
             
-            result = await Runner.run(
-                agent,
-                user_prompt
-            )
-            
-            # Extract the structured output
-            dialogue_data = result.final_output
+            try:
+                dialogue_data, self.last_usage = await stream_with_duration_control(
+                    agent, PodcastDialogue, user_prompt, tracker
+                )
+            except ModelBehaviorError as e:
+                # Keep the valid segments and re-request only the broken ones
+                dialogue_data, self.last_usage = await repair_structured_output(
+                    e, agent, PodcastDialogue, user_prompt
+                )
+            self._record_duration(dialogue_data, tracker)
+            self.last_output = dialogue_data
             
             # Format the final script
             script = self._format_dialogue_script(
@@ -116,35 +141,108 @@ class DialogueGenerator:
                 
         except Exception as e:
             raise RuntimeError(f"Failed to generate dialogue script: {str(e)}")
-    
-    def _build_system_prompt(self, tone: str, audience: str, duration_minutes: int) -> str:
-        """Build the system prompt for the LLM."""
-        tone_guides = {
-            "fun": "playful, energetic, with jokes and wordplay",
-            "comedy": "hilarious, full of puns and comedic timing",
-            "educational": "informative but entertaining, like edutainment",
-            "casual": "relaxed, like friends chatting over coffee"
-        }
-        
-        audience_guides = {
-            "general": "accessible to anyone, explain complex topics simply",
-            "beginner": "extra simple, lots of analogies and examples",
-            "expert": "can use technical terms but keep it entertaining",
-            "young": "high energy, pop culture references, memes"
+
+    async def regenerate_segments(
+        self,
+        content: Dict[str, Any],
+        previous: Dict[str, Any],
+        fields: List[str],
+        changed_sections: List[str],
+        tone: str = "fun",
+        audience: str = "general",
+        duration_minutes: int = 5,
+        custom_instructions: Optional[str] = None
+    ) -> str:
+        """
+        Rewrite only some segments of a previously generated dialogue.
+
+        Args:
+            content: Parsed content of the updated document
+            previous: Structured output of the previous generation
+            fields: Segments to rewrite; all others are reused verbatim
+            changed_sections: Text of the new or amended document sections
+            tone: Tone of the script
+            audience: Target audience level
+            duration_minutes: Target duration in minutes
+            custom_instructions: Additional generation instructions
+
+        Returns:
+            Updated podcast script in markdown format
+        """
+        previous_data = PodcastDialogue.model_validate(previous)
+        kept = {
+            name: getattr(previous_data, name)
+            for name in PodcastDialogue.model_fields
+            if name not in fields
         }
+
+        # Same prompts as the original generation so the cached prefix is reused
+        user_prompt = self._build_user_prompt(
+            content["content"],
+            content["metadata"],
+            content["structure"],
+            tone,
+            audience,
+            duration_minutes,
+            custom_instructions
+        )
+        agent = self._create_agent(self._build_system_prompt())
+
+        try:
+            os.environ['OPENAI_API_KEY'] = self.api_key
+            use_agents_client(self.api_key)
+
+            dialogue_data, self.last_usage = await regenerate_fields(
+                agent, PodcastDialogue, user_prompt, kept, fields,
+                guidance=changed_sections_guidance(changed_sections)
+            )
+            self._record_duration(
+                dialogue_data,
+                DurationTracker(duration_minutes * WORDS_PER_MINUTE, DIALOGUE_SEGMENT_SHARES)
+            )
+            self.last_output = dialogue_data
+
+            return self._format_dialogue_script(
+                dialogue_data,
+                content["metadata"],
+                tone,
+                audience
+            )
+
+        except Exception as e:
+            raise RuntimeError(f"Failed to update dialogue script: {str(e)}")
+
+    def _record_duration(self, dialogue_data: PodcastDialogue, tracker: DurationTracker) -> None:
+        """Report measured against target length and fix up the duration estimate."""
+        self.last_duration = tracker.report(dialogue_data)
+        # The measured length is more reliable than the model's own estimate
+        dialogue_data.estimated_duration_minutes = max(1, round(self.last_duration["measured_minutes"]))
+
+    def _create_agent(self, system_prompt: str) -> Agent:
+        """Create the dialogue-writing agent."""
+        return Agent(
+            name="PodcastDialogueWriter",
+            instructions=system_prompt,
+            model=self.model,
+            output_type=PodcastDialogue
+        )
+
+    def _build_system_prompt(self) -> str:
+        """
+        Build the system prompt for the LLM.
         
-        tone_guide = tone_guides.get(tone, tone_guides["fun"])
-        audience_guide = audience_guides.get(audience, audience_guides["general"])
-        
-        return f"""You are a professional podcast script writer creating a dialogue between two hosts:
+        The system prompt holds only fixed instructions so that it, followed by
+        the document, forms a prefix the provider can cache across variants.
+        """
+        return """You are a professional podcast script writer creating a dialogue between two hosts:
 
 HOST PERSONALITIES:
 - ALEX: The enthusiastic one. Curious, asks great questions, makes pop culture references, slightly nerdy but charming. Uses phrases like "Wait, wait, wait!" and "Okay, but here's the wild part..."
 - SAM: The witty expert. More knowledgeable but explains things simply, loves analogies, occasionally sarcastic but warm. Uses phrases like "So here's the thing..." and "Picture this..."
 
 STYLE GUIDELINES:
-1. Write in a {tone_guide} style
-2. Target audience: {audience_guide}
+1. Write in the tone given in the episode settings
+2. Pitch explanations at the target audience given in the episode settings
 3. Create natural banter with:
    - Interruptions and reactions ("No way!", "Hold up!")
    - Inside jokes that develop during the episode
@@ -163,22 +261,72 @@ STYLE GUIDELINES:
    - Use creative analogies
    - Make listeners laugh while learning
 
-Remember: This should feel like two best friends explaining something cool they just learned, not a lecture!"""
+REQUIREMENTS:
+1. Start with a HILARIOUS cold open that hooks listeners
+2. Make the introduction feel like friends discovering something cool
+3. Turn boring facts into EXCITING revelations with "Did you know?!" moments
+4. Include at least 3 funny analogies or comparisons
+5. Add a "Fun Facts Lightning Round" segment
+6. Create at least 2 running jokes that callback throughout
+7. Include moments of genuine surprise and "mind-blown" reactions
+8. End with a memorable sign-off and teaser for next episode
+9. Make listeners LAUGH while they LEARN
+10. If the topic seems dry, make it RIDICULOUSLY entertaining!
+11. Keep the total dialogue close to the word count given in the episode settings, and each segment close to its segment length
+
+Remember: This should feel like two best friends explaining something cool they just learned, not a lecture! Every minute should have at least one laugh or "wow" moment!"""
     
     def _build_user_prompt(
         self, 
         content: str, 
         metadata: Dict[str, Any],
         structure: Dict[str, Any],
+        tone: str,
+        audience: str,
         duration_minutes: int,
-        custom_instructions: Optional[str]
+        custom_instructions: Optional[str],
+        focus: Optional[str] = None
     ) -> str:
-        """Build the user prompt with document content."""
+        """
+        Build the user prompt with document content.
+        
+        The document comes first and the per-variant settings (tone, audience,
+        duration, custom instructions) last, so variants of one document share
+        a prefix.
+        """
+        tone_guides = {
+            "fun": "playful, energetic, with jokes and wordplay",
+            "comedy": "hilarious, full of puns and comedic timing",
+            "educational": "informative but entertaining, like edutainment",
+            "casual": "relaxed, like friends chatting over coffee"
+        }
+        
+        audience_guides = {
+            "general": "accessible to anyone, explain complex topics simply",
+            "beginner": "extra simple, lots of analogies and examples",
+            "expert": "can use technical terms but keep it entertaining",
+            "young": "high energy, pop culture references, memes"
+        }
+        
+        tone_guide = tone_guides.get(tone, tone_guides["fun"])
+        audience_guide = audience_guides.get(audience, audience_guides["general"])
+        
         # For large documents, create a summary first
         word_count = metadata.get('word_count', 0)
+        word_budget = source_word_budget(duration_minutes)
+        
+        # When the user asks for a focus, send the most relevant sections
+        focused_content = None
+        query = focus or custom_instructions
+        if query and word_count > word_budget:
+            focused_content = select_relevant_content(
+                content, structure, query, word_budget
+            )
         
+        if focused_content:
+            content = focused_content
         # If document is very large, truncate intelligently
-        if word_count > 3000:
+        elif word_count > 3000:
             lines = content.split('\n')
             total_lines = len(lines)
             
@@ -190,32 +338,24 @@ Remember: This should feel like two best friends explaining something cool they
             content = f"{first_section}\n\n[... content truncated ...]\n\n{middle_section}\n\n[... content truncated ...]\n\n{last_section}"
             
         # Calculate target word count based on duration (150 words per minute average)
-        target_words = duration_minutes * 150
+        target_words = duration_minutes * WORDS_PER_MINUTE
+        segment_budgets = allocate_budgets(target_words, DIALOGUE_SEGMENT_SHARES)
         
-        prompt = f"""Transform this document into a FUN, ENGAGING dialogue podcast script between Alex and Sam.
-
-Document Title: {metadata.get('title', 'Untitled')}
+        prompt = f"""Document Title: {metadata.get('title', 'Untitled')}
 Word Count: {metadata.get('word_count', 0)}
-Target Duration: {duration_minutes} minutes ({target_words} words of dialogue)
 
 Document Content:
 ---
 {content}
 ---
 
-Requirements:
-1. Start with a HILARIOUS cold open that hooks listeners
-2. Make the introduction feel like friends discovering something cool
-3. Turn boring facts into EXCITING revelations with "Did you know?!" moments
-4. Include at least 3 funny analogies or comparisons
-5. Add a "Fun Facts Lightning Round" segment
-6. Create at least 2 running jokes that callback throughout
-7. Include moments of genuine surprise and "mind-blown" reactions
-8. End with a memorable sign-off and teaser for next episode
-9. Make listeners LAUGH while they LEARN
-10. If the topic seems dry, make it RIDICULOUSLY entertaining!
+Transform the document above into a FUN, ENGAGING dialogue podcast script between Alex and Sam.
 
-Remember: Every minute should have at least one laugh or "wow" moment!"""
+Episode Settings:
+- Tone: write in a {tone_guide} style
+- Target audience: {audience_guide}
+- Target duration: {duration_minutes} minutes ({target_words} words of dialogue)
+- Segment lengths: {format_budgets(segment_budgets)}"""
         
         if custom_instructions:
             prompt += f"\n\nAdditional Instructions:\n{custom_instructions}"
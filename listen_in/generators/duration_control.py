@@ -0,0 +1,198 @@
+"""Per-segment word budgets that keep structured scripts close to their target length."""
+
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple, Type, TypeVar
+from agents import Agent, Runner
+from pydantic import BaseModel
+
+from .schema_repair import load_json_leniently, regenerate_fields, split_valid_fields
+from ..utils.llm_usage import combine_usage, summarize_usage
+from ..utils.resilience import call_with_retries
+from ..utils.retrieval import WORDS_PER_MINUTE
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+# Share of the spoken words that goes to each dialogue segment
+DIALOGUE_SEGMENT_SHARES = {
+    "cold_open": 0.07,
+    "introduction": 0.1,
+    "main_content": 0.58,
+    "fun_facts_segment": 0.15,
+    "conclusion": 0.1
+}
+
+# Rebalance the rest of the script when its projected length is this far off target
+DRIFT_TOLERANCE = 0.15
+
+# No segment is squeezed below this many words when rebalancing
+MIN_SEGMENT_WORDS = 25
+
+
+def count_words(value: Any) -> int:
+    """Count the spoken words in a segment (text or list of dialogue lines)."""
+    if isinstance(value, str):
+        return len(value.split())
+    if isinstance(value, list):
+        total = 0
+        for line in value:
+            text = line.get("text", "") if isinstance(line, dict) else getattr(line, "text", "")
+            total += len(text.split())
+        return total
+    return 0
+
+
+def allocate_budgets(total_words: int, shares: Dict[str, float]) -> Dict[str, int]:
+    """Split a word budget across segments in proportion to their shares."""
+    total_share = sum(shares.values()) or 1.0
+    return {
+        field: max(MIN_SEGMENT_WORDS, round(total_words * share / total_share))
+        for field, share in shares.items()
+    }
+
+
+def format_budgets(budgets: Dict[str, int]) -> str:
+    """Render segment budgets for a prompt."""
+    return ", ".join(f"{field} ~{words} words" for field, words in budgets.items())
+
+
+class DurationTracker:
+    """Tracks segment lengths against a target as a script is written."""
+
+    def __init__(self, target_words: int, shares: Dict[str, float]):
+        """Initialize with the target length and the segment shares."""
+        self.target_words = target_words
+        self.shares = shares
+        self.segments = list(shares)
+        self.budgets = allocate_budgets(target_words, shares)
+        self.rebalanced: Optional[Dict[str, int]] = None
+
+    def completed_segments(self, output_type: Type[BaseModel], text: str) -> int:
+        """
+        Count the segments whose JSON is complete in a partial output.
+
+        Structured outputs follow the schema's field order, so a segment is
+        complete once the key of the field after it has appeared.
+        """
+        fields = list(output_type.model_fields)
+        completed = 0
+        for segment in self.segments:
+            following = fields[fields.index(segment) + 1:]
+            if not following or f'"{following[0]}"' not in text:
+                break
+            completed += 1
+        return completed
+
+    def drifted(self, data: Dict[str, Any], completed: int) -> bool:
+        """Return True if the finished segments put the script off target."""
+        remaining = self.segments[completed:]
+        if not remaining:
+            return False
+
+        used = sum(count_words(data.get(segment)) for segment in self.segments[:completed])
+        projected = used + sum(self.budgets[segment] for segment in remaining)
+        return abs(projected - self.target_words) > self.target_words * DRIFT_TOLERANCE
+
+    def rebalance(self, kept: Dict[str, Any]) -> Dict[str, int]:
+        """Spread the words still available over the segments not yet written."""
+        used = sum(count_words(kept.get(segment)) for segment in self.segments if segment in kept)
+        remaining = {
+            segment: share for segment, share in self.shares.items() if segment not in kept
+        }
+        self.rebalanced = allocate_budgets(max(0, self.target_words - used), remaining)
+        return self.rebalanced
+
+    def report(self, output: BaseModel) -> Dict[str, Any]:
+        """Compare the measured length of a finished script with the target."""
+        segment_words = {segment: count_words(getattr(output, segment)) for segment in self.segments}
+        measured_words = sum(segment_words.values())
+
+        return {
+            "target_words": self.target_words,
+            "target_minutes": round(self.target_words / WORDS_PER_MINUTE, 1),
+            "measured_words": measured_words,
+            "measured_minutes": round(measured_words / WORDS_PER_MINUTE, 1),
+            "segments": {
+                segment: {
+                    "budget": (self.rebalanced or {}).get(segment, self.budgets[segment]),
+                    "words": words
+                }
+                for segment, words in segment_words.items()
+            },
+            "rebalanced": self.rebalanced is not None
+        }
+
+
+async def stream_with_duration_control(
+    agent: Agent,
+    output_type: Type[M],
+    user_prompt: str,
+    tracker: DurationTracker
+) -> Tuple[M, Dict[str, Any]]:
+    """
+    Stream a structured script and correct its length while it is written.
+
+    Each segment is measured as soon as it is complete. If the finished
+    segments push the projected length too far from the target, the stream
+    is stopped and only the remaining segments are requested, with budgets
+    rebalanced to the words still available.
+
+    Args:
+        agent: Agent writing the script
+        output_type: Pydantic model of the full output
+        user_prompt: User prompt for the script
+        tracker: Duration tracker holding the target and segment budgets
+
+    Returns:
+        Tuple of the script and usage information for the generation
+    """
+    started_at = time.perf_counter()
+
+    async def attempt() -> Tuple[Any, Optional[Dict[str, Any]], int]:
+        result = Runner.run_streamed(agent, user_prompt)
+        text = ""
+        checked = 0
+
+        async for event in result.stream_events():
+            if event.type != "raw_response_event" or event.data.type != "response.output_text.delta":
+                continue
+            text += event.data.delta
+
+            completed = tracker.completed_segments(output_type, text)
+            if completed == checked:
+                continue
+            checked = completed
+
+            partial = load_json_leniently(text) or {}
+            if tracker.drifted(partial, completed):
+                result.cancel()
+                return result, partial, completed
+
+        return result, None, checked
+
+    result, partial, completed = await call_with_retries("openai-agents", attempt)
+    usage = summarize_usage(result.context_wrapper.usage, started_at)
+
+    if partial is None:
+        return result.final_output, usage
+
+    # Keep everything written before the last finished segment
+    fields = list(output_type.model_fields)
+    last_kept = fields.index(tracker.segments[completed - 1])
+    valid, _ = split_valid_fields(output_type, partial)
+    kept = {field: value for field, value in valid.items() if fields.index(field) <= last_kept}
+    rest = [field for field in fields if field not in kept]
+
+    budgets = tracker.rebalance(kept)
+    logger.info(
+        f"Script length drifting from {tracker.target_words} words after "
+        f"{', '.join(tracker.segments[:completed])}; rebalancing to {format_budgets(budgets)}"
+    )
+
+    output, rest_usage = await regenerate_fields(
+        agent, output_type, user_prompt, kept, rest,
+        guidance=f"Keep these fields close to these lengths: {format_budgets(budgets)}."
+    )
+    return output, combine_usage(usage, rest_usage)
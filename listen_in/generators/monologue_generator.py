@@ -1,23 +1,32 @@
 """Monologue-style podcast script generator."""
 
 from typing import Dict, Any, Optional
-import openai
+import time
 from datetime import datetime
+from openai import AsyncOpenAI
+
+from ..utils.llm_usage import summarize_usage
+from ..utils.resilience import call_with_retries
+from ..utils.retrieval import select_relevant_content, source_word_budget
 
 
 class MonologueGenerator:
     """Generator for monologue-style podcast scripts."""
     
-    def __init__(self, api_key: str):
-        """Initialize with OpenAI API key."""
-        self.client = openai.OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, model: str = "o3-2025-04-16"):
+        """Initialize with OpenAI API key and the model to generate with."""
+        self.model = model
+        # Retries are handled by call_with_retries so they are counted
+        self.client = AsyncOpenAI(api_key=api_key, max_retries=0)
+        self.last_usage: Optional[Dict[str, Any]] = None
     
     async def generate(
         self,
         content: Dict[str, Any],
         tone: str = "conversational",
         audience: str = "general",
-        custom_instructions: Optional[str] = None
+        custom_instructions: Optional[str] = None,
+        duration_minutes: Optional[int] = None
     ) -> str:
         """
         Generate a monologue podcast script from parsed content.
@@ -27,6 +36,7 @@ class MonologueGenerator:
             tone: Tone of the script (conversational, educational, etc.)
             audience: Target audience level
             custom_instructions: Additional generation instructions
+            duration_minutes: Optional target duration in minutes
             
         Returns:
             Generated podcast script in markdown format
@@ -36,15 +46,18 @@ class MonologueGenerator:
         metadata = content["metadata"]
         structure = content["structure"]
         
-        # Build the system prompt
-        system_prompt = self._build_system_prompt(tone, audience)
+        # Build the system prompt (fixed instructions only)
+        system_prompt = self._build_system_prompt()
         
-        # Build the user prompt
+        # Build the user prompt (document first, variant settings last)
         user_prompt = self._build_user_prompt(
             doc_content, 
             metadata, 
             structure,
-            custom_instructions
+            tone,
+            audience,
+            custom_instructions,
+            duration_minutes
         )
         
         # Generate the script
@@ -64,30 +77,18 @@ class MonologueGenerator:
         except Exception as e:
             raise RuntimeError(f"Failed to generate podcast script: {str(e)}")
     
-    def _build_system_prompt(self, tone: str, audience: str) -> str:
-        """Build the system prompt for the LLM."""
-        tone_guides = {
-            "conversational": "friendly, engaging, and natural as if talking to a friend",
-            "educational": "clear, informative, and structured for learning",
-            "professional": "polished, authoritative, and business-appropriate",
-            "casual": "relaxed, informal, and entertaining"
-        }
-        
-        audience_guides = {
-            "general": "accessible to anyone with basic knowledge",
-            "beginner": "simple explanations, avoid jargon, define terms",
-            "expert": "technical depth is welcome, assume domain knowledge",
-            "young": "energetic, relatable examples, shorter sentences"
-        }
-        
-        tone_guide = tone_guides.get(tone, tone_guides["conversational"])
-        audience_guide = audience_guides.get(audience, audience_guides["general"])
+    def _build_system_prompt(self) -> str:
+        """
+        Build the system prompt for the LLM.
         
-        return f"""You are a professional podcast script writer. Your task is to transform written documents into engaging monologue podcast scripts.
+        The system prompt holds only fixed instructions so that it, followed by
+        the document, forms a prefix the provider can cache across variants.
+        """
+        return """You are a professional podcast script writer. Your task is to transform written documents into engaging monologue podcast scripts.
 
 Key guidelines:
-1. Write in a {tone_guide} style
-2. Target audience: {audience_guide}
+1. Write in the tone given in the episode settings
+2. Pitch explanations at the target audience given in the episode settings
 3. Create natural speech patterns with:
    - Conversational transitions
    - Rhetorical questions
@@ -101,19 +102,60 @@ Key guidelines:
 5. Keep sentences short and punchy for audio
 6. Use active voice
 7. Include time estimates for sections
-8. Make complex topics accessible through analogies and examples"""
+8. Make complex topics accessible through analogies and examples
+
+Requirements:
+1. Create a natural, flowing monologue that sounds great when read aloud
+2. Add an engaging introduction that hooks the listener
+3. Include smooth transitions between topics
+4. Add [PAUSE] markers for natural breathing points
+5. Use [EMPHASIS] for key points that need vocal emphasis
+6. End with a memorable conclusion that summarizes key takeaways
+7. Maintain accuracy to the source material while making it conversational"""
     
     def _build_user_prompt(
         self, 
         content: str, 
         metadata: Dict[str, Any],
         structure: Dict[str, Any],
-        custom_instructions: Optional[str]
+        tone: str,
+        audience: str,
+        custom_instructions: Optional[str],
+        duration_minutes: Optional[int] = None
     ) -> str:
-        """Build the user prompt with document content."""
-        prompt = f"""Transform this document into an engaging podcast monologue script.
+        """
+        Build the user prompt with document content.
+        
+        The document comes first and the per-variant settings (tone, audience,
+        custom instructions) last, so variants of one document share a prefix.
+        """
+        tone_guides = {
+            "conversational": "friendly, engaging, and natural as if talking to a friend",
+            "educational": "clear, informative, and structured for learning",
+            "professional": "polished, authoritative, and business-appropriate",
+            "casual": "relaxed, informal, and entertaining"
+        }
+        
+        audience_guides = {
+            "general": "accessible to anyone with basic knowledge",
+            "beginner": "simple explanations, avoid jargon, define terms",
+            "expert": "technical depth is welcome, assume domain knowledge",
+            "young": "energetic, relatable examples, shorter sentences"
+        }
+        
+        tone_guide = tone_guides.get(tone, tone_guides["conversational"])
+        audience_guide = audience_guides.get(audience, audience_guides["general"])
+        
+        word_count = metadata.get('word_count', 0)
+        word_budget = source_word_budget(duration_minutes)
+
+        # When the user asks for a focus, send the most relevant sections
+        if custom_instructions and word_count > word_budget:
+            content = select_relevant_content(
+                content, structure, custom_instructions, word_budget
+            ) or content
 
-Document Title: {metadata.get('title', 'Untitled')}
+        prompt = f"""Document Title: {metadata.get('title', 'Untitled')}
 Word Count: {metadata.get('word_count', 0)}
 Estimated Speaking Time: {metadata.get('word_count', 0) // 150} minutes
 
@@ -122,15 +164,14 @@ Document Content:
 {content}
 ---
 
-Requirements:
-1. Create a natural, flowing monologue that sounds great when read aloud
-2. Add an engaging introduction that hooks the listener
-3. Include smooth transitions between topics
-4. Add [PAUSE] markers for natural breathing points
-5. Use [EMPHASIS] for key points that need vocal emphasis
-6. End with a memorable conclusion that summarizes key takeaways
-7. Maintain accuracy to the source material while making it conversational
-"""
+Transform the document above into an engaging podcast monologue script.
+
+Episode Settings:
+- Tone: write in a {tone_guide} style
+- Target audience: {audience_guide}"""
+        
+        if duration_minutes:
+            prompt += f"\n- Target duration: {duration_minutes} minutes ({duration_minutes * 150} words)"
         
         if custom_instructions:
             prompt += f"\n\nAdditional Instructions:\n{custom_instructions}"
@@ -142,10 +183,16 @@ Requirements:
         # Combine system and user prompts for o3 model
         combined_prompt = f"{system_prompt}\n\n{user_prompt}"
         
-        response = self.client.responses.create(
-            model="o3-2025-04-16",
-            input=combined_prompt
+        started_at = time.perf_counter()
+        # The async client lets a hedged call be cancelled mid-request
+        response = await call_with_retries(
+            "openai-responses",
+            lambda: self.client.responses.create(
+                model=self.model,
+                input=combined_prompt
+            )
         )
+        self.last_usage = summarize_usage(response.usage, started_at)
         
         return response.output_text
     
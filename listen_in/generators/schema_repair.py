@@ -0,0 +1,247 @@
+"""Repair of structured script outputs that fail schema validation."""
+
+import json
+import logging
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+from agents import Agent, ItemHelpers, Runner
+from agents.exceptions import AgentsException
+from pydantic import BaseModel, TypeAdapter, ValidationError, create_model
+
+from ..utils.llm_usage import summarize_usage
+from ..utils.resilience import call_with_retries
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def extract_raw_output(error: AgentsException) -> Optional[str]:
+    """Return the model's last text output from a failed Agents SDK run."""
+    run_data = getattr(error, "run_data", None)
+    if run_data is None:
+        return None
+
+    for response in reversed(run_data.raw_responses):
+        for item in reversed(response.output):
+            text = ItemHelpers.extract_last_text(item)
+            if text:
+                return text
+
+    return None
+
+
+def load_json_leniently(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse a JSON object, recovering what it can from truncated output.
+
+    Code fences are stripped. If the text does not parse, it is cut back to
+    the last complete value and the open brackets are closed.
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        Parsed object, or None if nothing usable was found
+    """
+    text = re.sub(r"^\s*```(?:json)?\s*|\s*```\s*$", "", text)
+    start = text.find("{")
+    if start < 0:
+        return None
+    text = text[start:]
+
+    try:
+        data = json.loads(text)
+        return data if isinstance(data, dict) else None
+    except json.JSONDecodeError:
+        pass
+
+    # Record cut points after complete values together with the open brackets
+    stack: List[str] = []
+    cut_points: List[Tuple[int, str]] = []
+    in_string = False
+    escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+            cut_points.append((i + 1, "".join(reversed(stack))))
+        elif char == ",":
+            cut_points.append((i, "".join(reversed(stack))))
+
+    for end, closing in reversed(cut_points):
+        try:
+            data = json.loads(text[:end] + closing)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            return data
+
+    return None
+
+
+def split_valid_fields(
+    output_type: Type[M],
+    data: Dict[str, Any]
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Validate each top-level field of a schema on its own.
+
+    Args:
+        output_type: Pydantic model the output should match
+        data: Parsed (possibly partial) output
+
+    Returns:
+        Tuple of the valid field values and the names of missing or invalid fields
+    """
+    valid: Dict[str, Any] = {}
+    invalid: List[str] = []
+
+    for name, field in output_type.model_fields.items():
+        if name not in data:
+            invalid.append(name)
+            continue
+        try:
+            valid[name] = TypeAdapter(field.annotation).validate_python(data[name])
+        except ValidationError:
+            invalid.append(name)
+
+    return valid, invalid
+
+
+def _summarize_fields(values: Dict[str, Any]) -> str:
+    """Render already valid fields as JSON for the repair prompt."""
+    return json.dumps(
+        TypeAdapter(Dict[str, Any]).dump_python(values, mode="json"),
+        indent=2,
+        ensure_ascii=False
+    )
+
+
+async def regenerate_fields(
+    agent: Agent,
+    output_type: Type[M],
+    user_prompt: str,
+    valid: Dict[str, Any],
+    fields: List[str],
+    guidance: Optional[str] = None
+) -> Tuple[M, Dict[str, Any]]:
+    """
+    Re-request only some fields of a structured output and merge the result.
+
+    The repair request reuses the original instructions and user prompt, so
+    it shares their cached prompt prefix, and appends a short instruction
+    listing the fields to write.
+
+    Args:
+        agent: Agent that produced the original output
+        output_type: Pydantic model of the full output
+        user_prompt: Original user prompt
+        valid: Field values to keep
+        fields: Names of the fields to (re)write
+        guidance: Optional extra instructions for the rewritten fields
+
+    Returns:
+        Tuple of the merged output and usage information for the repair call
+    """
+    partial_type = create_model(
+        f"{output_type.__name__}Segments",
+        **{
+            name: (output_type.model_fields[name].annotation, output_type.model_fields[name])
+            for name in fields
+        }
+    )
+
+    prompt = f"""{user_prompt}
+
+Part of this script has already been written. Write ONLY these fields: {', '.join(fields)}.
+They must fit seamlessly with the existing parts below (same hosts, running jokes and facts).
+
+Existing parts:
+{_summarize_fields(valid)}"""
+
+    if guidance:
+        prompt += f"\n\n{guidance}"
+
+    started_at = time.perf_counter()
+    result = await call_with_retries(
+        "openai-agents",
+        lambda: Runner.run(agent.clone(output_type=partial_type), prompt)
+    )
+    usage = summarize_usage(result.context_wrapper.usage, started_at)
+
+    merged = {**valid, **result.final_output.model_dump()}
+    return output_type.model_validate(merged), usage
+
+
+def changed_sections_guidance(changed_sections: List[str]) -> str:
+    """Build repair guidance pointing the model at updated document sections."""
+    guidance = (
+        "The document has changed since the existing parts were written. "
+        "Make the fields you write reflect the current document above and drop "
+        "anything it no longer says."
+    )
+    if changed_sections:
+        passages = "\n---\n".join(changed_sections)
+        guidance += f"\n\nNew or amended passages:\n---\n{passages}\n---"
+    return guidance
+
+
+async def repair_structured_output(
+    error: AgentsException,
+    agent: Agent,
+    output_type: Type[M],
+    user_prompt: str
+) -> Tuple[M, Dict[str, Any]]:
+    """
+    Recover from a schema-validation failure without regenerating everything.
+
+    Valid fields from the failed output are kept and only the missing or
+    invalid ones are re-requested. The original error is re-raised when the
+    failed output holds nothing worth keeping.
+
+    Args:
+        error: ModelBehaviorError raised by Runner.run
+        agent: Agent that produced the output
+        output_type: Pydantic model the output should match
+        user_prompt: Original user prompt
+
+    Returns:
+        Tuple of the repaired output and usage information for the repair
+    """
+    started_at = time.perf_counter()
+    raw_output = extract_raw_output(error)
+    data = load_json_leniently(raw_output) if raw_output else None
+    if not data:
+        raise error
+
+    valid, invalid = split_valid_fields(output_type, data)
+    if not valid:
+        raise error
+    if not invalid:
+        # No repair call was made; report zero usage in the usual shape
+        usage = summarize_usage(None, started_at)
+        usage["repaired_fields"] = []
+        return output_type.model_validate(valid), usage
+
+    logger.warning(
+        f"{output_type.__name__} failed validation; keeping {', '.join(valid)} "
+        f"and re-requesting {', '.join(invalid)}"
+    )
+
+    repaired, usage = await regenerate_fields(agent, output_type, user_prompt, valid, invalid)
+    usage["repaired_fields"] = invalid
+    return repaired, usage
@@ -0,0 +1,390 @@
+"""Episode-series generation: split a large document into parallel dialogue episodes."""
+
+import asyncio
+import logging
+import math
+import os
+import re
+import time
+from typing import Dict, Any, List, Optional
+from agents import Agent, Runner
+from pydantic import BaseModel, Field
+
+from .dialogue_generator import DialogueGenerator
+from ..utils.llm_usage import summarize_usage
+from ..utils.resilience import call_with_retries, use_agents_client
+from ..utils.retrieval import source_word_budget
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on automatically chosen episode counts; larger documents are
+# covered only in part, which generate() reports
+MAX_EPISODES = 12
+
+# Outline headings, from the coarsest to the finest level
+_HEADING_PATTERNS = [
+    re.compile(r"^#{1,2}\s+\S"),
+    re.compile(r"^(CHAPTER|Chapter|PART|Part|TITLE|Title)\s+[0-9IVXLC]+\.?$"),
+    re.compile(r"^(SECTION|Section)\s+[0-9IVXLC]+\.?$"),
+    re.compile(r"^(ARTICLE|Article)\s+[0-9]+\.?$"),
+]
+
+
+class RecurringTerm(BaseModel):
+    """A term the hosts explain once and then reuse across episodes."""
+    term: str
+    explanation: str = Field(description="One-sentence plain-language explanation")
+
+
+class SeriesBible(BaseModel):
+    """Shared context that keeps the episodes of a series consistent."""
+    series_title: str
+    """The catchy title of the whole series."""
+
+    host_dynamics: str
+    """How Alex and Sam play off each other throughout the series."""
+
+    running_jokes: list[str]
+    """Running jokes that recur and get called back across episodes."""
+
+    recurring_terms: list[RecurringTerm]
+    """Key terms with the plain-language explanation used every time."""
+
+    episode_titles: list[str]
+    """One title per episode, in order."""
+
+
+class SeriesGenerator:
+    """Generator for multi-episode dialogue series from one large document."""
+
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: int = 3,
+        bible_model: str = "gpt-4.1-mini"
+    ):
+        """Initialize with OpenAI API key and the episode concurrency cap."""
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.bible_model = bible_model
+        self.last_usage: Optional[Dict[str, Any]] = None
+
+    async def generate(
+        self,
+        content: Dict[str, Any],
+        episodes: Optional[int] = None,
+        episode_minutes: int = 5,
+        tone: str = "fun",
+        audience: str = "general",
+        custom_instructions: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a numbered series of dialogue episodes covering a document.
+
+        Args:
+            content: Parsed document content with metadata
+            episodes: Number of episodes (chosen from the document size if omitted)
+            episode_minutes: Target duration of each episode in minutes
+            tone: Tone of the scripts
+            audience: Target audience level
+            custom_instructions: Additional instructions applied to every episode
+
+        Returns:
+            Dictionary with the series bible, the episode scripts in order and
+            how much of each part fits an episode's source budget
+        """
+        parts = self.partition(content, episodes, episode_minutes)
+        word_budget = source_word_budget(episode_minutes)
+        bible = await self._build_bible(content, parts)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def generate_episode(index: int, part: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                generator = DialogueGenerator(api_key=self.api_key)
+                script = await generator.generate(
+                    content=part,
+                    tone=tone,
+                    audience=audience,
+                    duration_minutes=episode_minutes,
+                    custom_instructions=self._episode_instructions(
+                        bible, index, len(parts), custom_instructions
+                    ),
+                    focus=self._episode_focus(bible, index, part, custom_instructions)
+                )
+                return {
+                    "script": script,
+                    "usage": generator.last_usage,
+                    "duration": generator.last_duration
+                }
+
+        results = await asyncio.gather(
+            *(generate_episode(i, part) for i, part in enumerate(parts)),
+            return_exceptions=True
+        )
+
+        episode_results = []
+        for i, (part, result) in enumerate(zip(parts, results)):
+            episode = {
+                "episode": i + 1,
+                "title": bible.episode_titles[i] if i < len(bible.episode_titles) else part["metadata"]["title"],
+                "source_word_count": part["metadata"]["word_count"],
+                "source_coverage": self._coverage(part["metadata"]["word_count"], word_budget)
+            }
+            if isinstance(result, Exception):
+                episode["error"] = str(result)
+            else:
+                episode.update(result)
+            episode_results.append(episode)
+
+        return {
+            "bible": bible,
+            "episodes": episode_results,
+            "coverage": self._series_coverage(content, parts, word_budget)
+        }
+
+    def _coverage(self, word_count: int, word_budget: int) -> float:
+        """Share of a part's source words that fit an episode's source budget."""
+        return round(min(1.0, word_budget / word_count), 2) if word_count else 1.0
+
+    def _series_coverage(
+        self,
+        content: Dict[str, Any],
+        parts: List[Dict[str, Any]],
+        word_budget: int
+    ) -> Dict[str, Any]:
+        """Report the episodes needed to cover the document and the share that is covered."""
+        total_words = max(1, len(content["content"].split()))
+        covered = sum(min(part["metadata"]["word_count"], word_budget) for part in parts)
+        return {
+            "episodes": len(parts),
+            "episodes_needed": math.ceil(total_words / word_budget),
+            "source_words": total_words,
+            "source_coverage": round(min(1.0, covered / total_words), 2)
+        }
+
+    def partition(
+        self,
+        content: Dict[str, Any],
+        episodes: Optional[int] = None,
+        episode_minutes: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Split a parsed document into contiguous, similarly sized episode parts.
+
+        Splits follow the coarsest outline level (chapters, sections, articles,
+        markdown headings) found in the text; blocks without usable headings
+        are split at paragraph breaks by word budget.
+
+        Args:
+            content: Parsed document content with metadata
+            episodes: Desired number of episodes, or None to size by budget
+            episode_minutes: Target duration of each episode in minutes
+
+        Returns:
+            List of parsed-document dictionaries, one per episode
+        """
+        lines = content["content"].split('\n')
+        total_words = max(1, len(content["content"].split()))
+
+        if not episodes:
+            episodes = math.ceil(total_words / source_word_budget(episode_minutes))
+            if episodes > MAX_EPISODES:
+                logger.warning(
+                    f"Covering {total_words} words needs {episodes} episodes; using {MAX_EPISODES}, "
+                    f"so episodes cover their parts only in part"
+                )
+                episodes = MAX_EPISODES
+        episodes = max(1, episodes)
+        target_words = total_words / episodes
+
+        # Split into outline units, then break up units that are too large
+        units = []
+        for unit in self._split_outline(lines):
+            units.extend(self._split_by_budget(unit, target_words))
+
+        # Assign each unit to the episode its midpoint falls into
+        groups: List[List[str]] = [[] for _ in range(episodes)]
+        words_before = 0
+        for unit in units:
+            words = len(unit.split())
+            index = min(episodes - 1, int((words_before + words / 2) / target_words))
+            groups[index].append(unit)
+            words_before += words
+
+        metadata = content["metadata"]
+        parts = []
+        for group in groups:
+            if not group:
+                continue
+            text = "\n\n".join(group)
+            sections = [
+                {"content": unit, "word_count": len(unit.split())}
+                for unit in group
+            ]
+            heading = next(
+                (line.strip() for line in text.split('\n') if self._heading_level(line.strip()) is not None),
+                None
+            )
+            word_count = len(text.split())
+            parts.append({
+                "content": text,
+                "metadata": {
+                    **metadata,
+                    "title": f"{metadata.get('title', 'Untitled')} ({heading})" if heading else metadata.get('title', 'Untitled'),
+                    "heading": heading,
+                    "word_count": word_count,
+                    "line_count": text.count('\n') + 1
+                },
+                "structure": {
+                    "sections": sections,
+                    "has_headings": heading is not None,
+                    "estimated_reading_time": word_count // 200
+                }
+            })
+
+        return parts
+
+    def _heading_level(self, line: str) -> Optional[int]:
+        """Return the outline level of a heading line, or None."""
+        for level, pattern in enumerate(_HEADING_PATTERNS):
+            if pattern.match(line):
+                return level
+        return None
+
+    def _split_outline(self, lines: List[str]) -> List[str]:
+        """Split lines at the coarsest heading level that occurs more than once."""
+        levels = [self._heading_level(line.strip()) for line in lines]
+
+        split_level = None
+        for level in range(len(_HEADING_PATTERNS)):
+            if levels.count(level) > 1:
+                split_level = level
+                break
+
+        if split_level is None:
+            return ['\n'.join(lines)]
+
+        units = []
+        current: List[str] = []
+        for line, level in zip(lines, levels):
+            if level == split_level and current:
+                units.append('\n'.join(current))
+                current = []
+            current.append(line)
+        if current:
+            units.append('\n'.join(current))
+
+        return [unit for unit in units if unit.strip()]
+
+    def _split_by_budget(self, text: str, max_words: float) -> List[str]:
+        """Split text at paragraph breaks into pieces of at most max_words words."""
+        if len(text.split()) <= max_words:
+            return [text]
+
+        pieces = []
+        current: List[str] = []
+        current_words = 0
+        for paragraph in re.split(r'\n\s*\n', text):
+            words = len(paragraph.split())
+            if current and current_words + words > max_words:
+                pieces.append("\n\n".join(current))
+                current, current_words = [], 0
+            current.append(paragraph)
+            current_words += words
+        if current:
+            pieces.append("\n\n".join(current))
+
+        return pieces
+
+    async def _build_bible(
+        self,
+        content: Dict[str, Any],
+        parts: List[Dict[str, Any]]
+    ) -> SeriesBible:
+        """Create the shared series bible from an outline of the episode parts."""
+        outline = []
+        for i, part in enumerate(parts):
+            preview = " ".join(part["content"].split()[:80])
+            outline.append(f"Episode {i + 1} ({part['metadata']['word_count']} source words): {preview}...")
+        outline_text = "\n\n".join(outline)
+
+        agent = Agent(
+            name="PodcastSeriesPlanner",
+            instructions="""You plan multi-episode podcast series hosted by two friends:
+- ALEX: The enthusiastic one. Curious, asks great questions, makes pop culture references.
+- SAM: The witty expert. Explains things simply, loves analogies, occasionally sarcastic but warm.
+
+Create a series bible that keeps every episode consistent: a series title, how the hosts play off each other, 2-4 running jokes that can be called back in any episode, the key recurring terms with one plain-language explanation each, and one catchy title per episode.""",
+            model=self.bible_model,
+            output_type=SeriesBible
+        )
+
+        prompt = f"""Plan a {len(parts)}-episode series covering this document.
+
+Document Title: {content['metadata'].get('title', 'Untitled')}
+
+Episode outline:
+{outline_text}"""
+
+        try:
+            # Set API key as environment variable
+            os.environ['OPENAI_API_KEY'] = self.api_key
+            use_agents_client(self.api_key)
+
+            started_at = time.perf_counter()
+            result = await call_with_retries(
+                "openai-agents",
+                lambda: Runner.run(agent, prompt)
+            )
+            self.last_usage = summarize_usage(result.context_wrapper.usage, started_at)
+
+            return result.final_output
+
+        except Exception as e:
+            raise RuntimeError(f"Failed to generate series bible: {str(e)}")
+
+    def _episode_focus(
+        self,
+        bible: SeriesBible,
+        index: int,
+        part: Dict[str, Any],
+        custom_instructions: Optional[str]
+    ) -> str:
+        """Build the query that picks an oversized part's sections: its heading or outline title."""
+        focus = part["metadata"].get("heading")
+        if not focus:
+            focus = bible.episode_titles[index] if index < len(bible.episode_titles) else part["metadata"]["title"]
+        if custom_instructions:
+            focus += f"\n{custom_instructions}"
+        return focus
+
+    def _episode_instructions(
+        self,
+        bible: SeriesBible,
+        index: int,
+        total: int,
+        custom_instructions: Optional[str]
+    ) -> str:
+        """Build the per-episode instructions that carry the series bible."""
+        title = bible.episode_titles[index] if index < len(bible.episode_titles) else f"Episode {index + 1}"
+        jokes = "\n".join(f"- {joke}" for joke in bible.running_jokes)
+        terms = "\n".join(f"- {term.term}: {term.explanation}" for term in bible.recurring_terms)
+
+        instructions = f"""This is episode {index + 1} of {total} in the series "{bible.series_title}", titled "{title}".
+Only cover the document excerpt above; other episodes cover the rest.
+{"Open by welcoming listeners to the series." if index == 0 else "Briefly refer back to the previous episode in the cold open."}
+{"Close the series with a wrap-up of everything covered." if index == total - 1 else f'Tease the next episode, "{bible.episode_titles[index + 1] if index + 1 < len(bible.episode_titles) else "the next part"}".'}
+
+Host dynamics: {bible.host_dynamics}
+
+Running jokes to call back:
+{jokes}
+
+Recurring terms (explain them exactly this way):
+{terms}"""
+
+        if custom_instructions:
+            instructions += f"\n\n{custom_instructions}"
+
+        return instructions
@@ -1,19 +1,52 @@
 """Simple audio generation using ElevenLabs text-to-speech API."""
 
+import asyncio
 import os
-import aiohttp
-from typing import Dict, Any, Optional
+import shutil
+import tempfile
+import time
+from typing import BinaryIO, Dict, Any, List, Optional
 from pathlib import Path
 from datetime import datetime
 
+from ..config import (
+    AUDIO_WORKERS,
+    ELEVENLABS_MAX_CONCURRENCY,
+    ELEVENLABS_METADATA_TTL_SECONDS,
+    ELEVENLABS_REQUESTS_PER_SECOND,
+    TTS_CHUNK_MAX_CHARS
+)
+from ..utils.audio_workers import get_audio_worker_pool
+from ..utils.elevenlabs_client import ELEVENLABS_BASE_URL, synthesize_speech
+from ..utils.mp3_concat import MP3FrameWriter, audio_result_fields
+from ..utils.pcm_mix import pcm_sample_rate
+from ..utils.rate_limit import get_limiter
+from ..utils.text_chunking import chunk_text
+from ..utils.voice_catalog import get_voice_catalog
+
+# Characters of neighbouring text sent with each chunk so intonation carries across
+CONTEXT_CHARS = 300
+
 
 class SimpleAudioGenerator:
     """Simple generator for podcast audio using ElevenLabs TTS."""
     
-    def __init__(self, api_key: str):
-        """Initialize with ElevenLabs API key."""
+    def __init__(self, api_key: str, max_chunk_chars: Optional[int] = None):
+        """
+        Initialize with ElevenLabs API key and an optional chunk size.
+        
+        Scripts longer than max_chunk_chars (TTS_CHUNK_MAX_CHARS by default)
+        are rendered as concurrent chunks under the account's shared limiter.
+        """
         self.api_key = api_key
-        self.base_url = "https://api.elevenlabs.io/v1"
+        self.base_url = ELEVENLABS_BASE_URL
+        self.max_chunk_chars = max_chunk_chars or TTS_CHUNK_MAX_CHARS
+        self.limiter = get_limiter(
+            "elevenlabs",
+            api_key,
+            ELEVENLABS_MAX_CONCURRENCY,
+            ELEVENLABS_REQUESTS_PER_SECOND
+        )
         
     async def generate_audio(
         self,
@@ -22,84 +55,183 @@ class SimpleAudioGenerator:
         voice_id: str = "21m00Tcm4TlvDq8ikWAM",  # Rachel voice
         model_id: str = "eleven_monolingual_v1",
         optimize_streaming_latency: int = 0,
-        output_format: str = "mp3_44100_128"
+        output_format: str = "mp3_44100_128",
+        stream: bool = False
     ) -> Dict[str, Any]:
         """
         Generate audio from a podcast script using ElevenLabs TTS.
         
+        The script is split at paragraph and sentence boundaries into chunks
+        that are rendered concurrently with the same voice settings and
+        joined in order.
+        
         Args:
             script_content: The podcast script text
             output_path: Path to save the audio file
             voice_id: Voice ID to use
             model_id: Model ID for generation
             optimize_streaming_latency: Streaming optimization (0-4)
-            output_format: Audio format
+            output_format: Audio format; MP3 or PCM when the script spans
+                several chunks
+            stream: Use the streaming endpoint and write audio to output_path
+                as it arrives, so playback can start before synthesis ends
             
         Returns:
             Dictionary with audio file path and metadata
         """
-        # Clean the script content (remove markdown formatting)
-        clean_content = self._clean_script_content(script_content)
+        # Split the speakable text into chunks under the per-request budget
+        chunks = chunk_text(self._script_paragraphs(script_content), self.max_chunk_chars)
+        if not chunks:
+            raise ValueError("No script text found")
+        
+        is_mp3 = output_format.startswith("mp3_")
+        if len(chunks) > 1 and not is_mp3 and not pcm_sample_rate(output_format):
+            raise ValueError(f"Scripts longer than one chunk need an MP3 or PCM output format, not {output_format}")
+        
+        url = f"{self.base_url}/text-to-speech/{voice_id}"
+        if stream:
+            url += "/stream"
+        
+        params = {
+            "optimize_streaming_latency": optimize_streaming_latency,
+            "output_format": output_format
+        }
+        
+        started_at = time.monotonic()
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
         
-        # Prepare the request payload
+        try:
+            if len(chunks) == 1:
+                first_audio_at = await self._render_chunk(chunks, 0, url, model_id, params, output_path)
+            else:
+                first_audio_at = await self._render_chunks(chunks, url, model_id, params, output_path, is_mp3)
+        except Exception as e:
+            raise RuntimeError(f"Failed to generate audio: {str(e)}")
+        
+        render_seconds = round(time.monotonic() - started_at, 2)
+        # Files without a frame count tag are scanned frame by frame, off the event loop;
+        # PCM and other non-MP3 output has no frames to scan
+        fields = {}
+        if is_mp3:
+            fields = await get_audio_worker_pool(AUDIO_WORKERS).run(output_path, audio_result_fields, output_path)
+        return {
+            "audio_path": output_path,
+            **fields,
+            "voice_id": voice_id,
+            "model_id": model_id,
+            "chunks": len(chunks),
+            "streamed": stream,
+            "time_to_first_audio_seconds": round(first_audio_at - started_at, 2) if stream else render_seconds,
+            "render_seconds": render_seconds,
+            "status": "completed",
+            "generated_at": datetime.now().isoformat()
+        }
+    
+    async def _render_chunk(
+        self,
+        chunks: List[str],
+        index: int,
+        url: str,
+        model_id: str,
+        params: Dict[str, Any],
+        output_path: str
+    ) -> float:
+        """Render one chunk to a file and return when its first audio arrived."""
         payload = {
-            "text": clean_content,
+            "text": chunks[index],
             "model_id": model_id,
+            # Identical settings for every chunk keep the voice consistent
             "voice_settings": {
                 "stability": 0.5,
                 "similarity_boost": 0.5
             }
         }
+        if index > 0:
+            payload["previous_text"] = chunks[index - 1][-CONTEXT_CHARS:]
+        if index < len(chunks) - 1:
+            payload["next_text"] = chunks[index + 1][:CONTEXT_CHARS]
         
-        # Make the API request
-        headers = {
-            "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": self.api_key
-        }
+        return await synthesize_speech(
+            self.api_key,
+            url,
+            payload,
+            params,
+            output_path,
+            [self.limiter],
+            f"chunk {index+1}/{len(chunks)}"
+        )
+    
+    async def _render_chunks(
+        self,
+        chunks: List[str],
+        url: str,
+        model_id: str,
+        params: Dict[str, Any],
+        output_path: str,
+        is_mp3: bool
+    ) -> float:
+        """
+        Render chunks concurrently and append them to the output in order.
         
-        params = {
-            "optimize_streaming_latency": optimize_streaming_latency,
-            "output_format": output_format
-        }
+        Each chunk is appended as soon as it and every earlier chunk are done,
+        so the output is playable from the first chunk on.
+        
+        Returns:
+            time.monotonic() at which the first audio was written
+        """
+        temp_files = []
+        tasks = []
+        first_audio_at = None
         
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(
-                    f"{self.base_url}/text-to-speech/{voice_id}",
-                    headers=headers,
-                    json=payload,
-                    params=params
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        raise RuntimeError(f"ElevenLabs API error: {response.status} - {error_text}")
-                    
-                    # Ensure directory exists
-                    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # Write audio data
-                    with open(output_path, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            f.write(chunk)
-                    
-                    return {
-                        "audio_path": output_path,
-                        "voice_id": voice_id,
-                        "model_id": model_id,
-                        "status": "completed",
-                        "generated_at": datetime.now().isoformat()
-                    }
-                        
-            except Exception as e:
-                raise RuntimeError(f"Failed to generate audio: {str(e)}")
+        try:
+            for i in range(len(chunks)):
+                temp_file = tempfile.NamedTemporaryFile(suffix='.mp3' if is_mp3 else '.pcm', delete=False)
+                temp_files.append(temp_file.name)
+                temp_file.close()
+                tasks.append(asyncio.ensure_future(
+                    self._render_chunk(chunks, i, url, model_id, params, temp_file.name)
+                ))
+            
+            if is_mp3:
+                writer = MP3FrameWriter(output_path)
+                try:
+                    for task, temp_file in zip(tasks, temp_files):
+                        await task
+                        # Frame parsing is CPU-bound, so keep it off the event loop
+                        await asyncio.to_thread(writer.append, temp_file)
+                        first_audio_at = first_audio_at or time.monotonic()
+                finally:
+                    writer.close()
+            else:
+                # Raw PCM chunks join by simple concatenation
+                with open(output_path, 'wb') as out:
+                    for task, temp_file in zip(tasks, temp_files):
+                        await task
+                        await asyncio.to_thread(self._copy_chunk, temp_file, out)
+                        first_audio_at = first_audio_at or time.monotonic()
+            
+            return first_audio_at
+            
+        finally:
+            for task in tasks:
+                task.cancel()
+            for temp_file in temp_files:
+                try:
+                    os.unlink(temp_file)
+                except OSError:
+                    pass
+    
+    def _copy_chunk(self, chunk_path: str, out: BinaryIO) -> None:
+        """Append a rendered PCM chunk to the output."""
+        with open(chunk_path, 'rb') as f:
+            shutil.copyfileobj(f, out)
+        out.flush()
     
-    def _clean_script_content(self, script_content: str) -> str:
-        """Clean script content for audio generation."""
-        # Extract just the script portion (after "## Script" header)
+    def _script_paragraphs(self, script_content: str) -> List[str]:
+        """Return the speakable paragraphs of a script's "## Script" section."""
         lines = script_content.split('\n')
         script_start = False
-        clean_lines = []
+        paragraphs = []
         
         for line in lines:
             if line.strip() == "## Script":
@@ -113,21 +245,10 @@ class SimpleAudioGenerator:
                     # Process special markers
                     cleaned = line.replace('[PAUSE]', '...')
                     cleaned = cleaned.replace('[EMPHASIS]', '')
-                    clean_lines.append(cleaned)
+                    paragraphs.append(cleaned)
         
-        return ' '.join(clean_lines)
+        return paragraphs
     
     async def get_voices(self) -> list[Dict[str, Any]]:
-        """Get available voices from ElevenLabs."""
-        headers = {"xi-api-key": self.api_key}
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{self.base_url}/voices",
-                headers=headers
-            ) as response:
-                if response.status != 200:
-                    raise RuntimeError("Failed to fetch voices")
-                
-                data = await response.json()
-                return data.get("voices", [])
\ No newline at end of file
+        """Get available voices from the cached voice list."""
+        return await get_voice_catalog(self.api_key, ELEVENLABS_METADATA_TTL_SECONDS, self.base_url).voices()
\ No newline at end of file
@@ -1,28 +1,55 @@
 """Simple dialogue audio generation without pydub."""
 
-import os
+import io
 import re
-import aiohttp
 import asyncio
-from typing import Dict, Any, Optional, List, Tuple
-from pathlib import Path
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Any, Optional, List
 from datetime import datetime
 
+from ..config import ELEVENLABS_MAX_CONCURRENCY, ELEVENLABS_REQUESTS_PER_SECOND
+from ..utils.elevenlabs_client import ELEVENLABS_BASE_URL, synthesize_speech
+from ..utils.mp3_concat import MP3FrameWriter
+from ..utils.rate_limit import get_limiter
+from ..utils.segment_planner import DialogueLine, PlannedSegment, plan_segments
+
+logger = logging.getLogger(__name__)
+
+# Pause between lines, and the longer pause where a new script section starts;
+# rendered silence at segment edges is trimmed so these are the whole gaps
+LINE_PAUSE_MS = 300
+SECTION_PAUSE_MS = 1000
+
 
 class SimpleDialogueAudioGenerator:
     """Simple generator for dialogue podcast audio with multiple voices."""
     
-    def __init__(self, api_key: str):
-        """Initialize with ElevenLabs API key."""
+    def __init__(self, api_key: str, max_workers: Optional[int] = None):
+        """
+        Initialize with ElevenLabs API key and an optional worker pool size.
+        
+        At most max_workers segments (twice ELEVENLABS_MAX_CONCURRENCY by
+        default) are rendered or waiting to be written at any time; the
+        account's shared limiter paces the requests themselves.
+        """
         self.api_key = api_key
-        self.base_url = "https://api.elevenlabs.io/v1"
+        self.base_url = ELEVENLABS_BASE_URL
+        self.max_workers = max_workers or 2 * ELEVENLABS_MAX_CONCURRENCY
+        self.limiter = get_limiter(
+            "elevenlabs",
+            api_key,
+            ELEVENLABS_MAX_CONCURRENCY,
+            ELEVENLABS_REQUESTS_PER_SECOND
+        )
         
         # Voice mappings for our hosts
         self.voice_mapping = {
             "Alex": "pNInz6obpgDQGcFmaJgB",  # Adam voice (enthusiastic)
             "Sam": "21m00Tcm4TlvDq8ikWAM",   # Rachel voice (witty expert)
         }
-        
+    
     async def generate_audio(
         self,
         script_content: str,
@@ -32,31 +59,90 @@ class SimpleDialogueAudioGenerator:
         """
         Generate dialogue audio from a podcast script.
         
-        Note: This simplified version concatenates all dialogue into a single request
-        per speaker to work around pydub requirements.
+        Each line is rendered with its speaker's voice, consecutive lines of
+        one host in a single request. Segments render concurrently and are
+        appended to the output in script order as soon as every earlier one
+        is written, joined frame by frame with short pauses, so the output is
+        playable while it grows.
         
         Args:
             script_content: The dialogue podcast script
             output_path: Path to save the final audio file
             model_id: Model ID for generation
-            
+        
         Returns:
             Dictionary with audio file path and metadata
         """
-        # Parse the dialogue into a single conversation
-        full_conversation = self._parse_dialogue_as_conversation(script_content)
+        lines = self._parse_dialogue_lines(script_content)
         
-        if not full_conversation:
+        if not lines:
             raise ValueError("No dialogue found in script")
         
-        print(f"Generating conversational audio...")
+        # Speakers without a voice of their own are read by the first host
+        default_speaker = next(iter(self.voice_mapping))
+        for speaker in sorted({line.speaker for line in lines} - self.voice_mapping.keys()):
+            logger.warning(f"Unknown speaker {speaker}; using {default_speaker}'s voice")
+        
+        # Consecutive lines of one host share a request
+        segments = plan_segments(lines)
+        
+        print(f"Generating audio for {len(lines)} dialogue lines in {len(segments)} segments...")
         
-        # Generate the full conversation as a single audio file
-        # We'll use Alex's voice as the primary narrator who reads both parts
-        # with slight voice modulation indicators
+        started_at = time.monotonic()
+        first_audio_seconds = None
+        pending: Deque[asyncio.Future] = deque()
+        next_segment = 0
+        
+        writer = MP3FrameWriter(output_path, pause_ms=LINE_PAUSE_MS, trim_silence=True)
+        try:
+            while pending or next_segment < len(segments):
+                # Keep the pool full without running more than max_workers ahead of the writer
+                while next_segment < len(segments) and len(pending) < self.max_workers:
+                    pending.append(asyncio.ensure_future(self._render_segment(segments, next_segment, model_id)))
+                    next_segment += 1
+                
+                index = next_segment - len(pending)
+                audio = await pending.popleft()
+                # Frame parsing and trimming are CPU-bound, so keep them off the event loop
+                await asyncio.to_thread(
+                    writer.append, audio, SECTION_PAUSE_MS if segments[index].starts_section else None
+                )
+                
+                if first_audio_seconds is None:
+                    first_audio_seconds = round(time.monotonic() - started_at, 2)
+                    print(f"▶️ {output_path} playable after {first_audio_seconds}s")
         
+        except Exception as e:
+            raise RuntimeError(f"Failed to generate dialogue audio: {str(e)}")
+        finally:
+            combined = writer.close()
+            for task in pending:
+                task.cancel()
+        
+        print("✅ Generated two-host podcast audio")
+        
+        return {
+            "audio_path": output_path,
+            "duration_seconds": combined["duration_seconds"],
+            "duration_minutes": round(combined["duration_seconds"] / 60, 1),
+            "format": "two_voice_dialogue",
+            "note": "Each line rendered with its host's voice",
+            "total_lines": len(lines),
+            "total_segments": len(segments),
+            "voices": dict(self.voice_mapping),
+            "model_id": model_id,
+            "trimmed_silence_seconds": combined["trimmed_seconds"],
+            "time_to_first_audio_seconds": first_audio_seconds,
+            "render_seconds": round(time.monotonic() - started_at, 2),
+            "status": "completed",
+            "generated_at": datetime.now().isoformat()
+        }
+    
+    async def _render_segment(self, segments: List[PlannedSegment], index: int, model_id: str) -> bytes:
+        """Render one segment and return its MP3 audio."""
+        segment = segments[index]
         payload = {
-            "text": full_conversation,
+            "text": segment.text,
             "model_id": model_id,
             "voice_settings": {
                 "stability": 0.4,
@@ -66,59 +152,31 @@ class SimpleDialogueAudioGenerator:
             }
         }
         
-        headers = {
-            "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": self.api_key
-        }
-        
-        async with aiohttp.ClientSession() as session:
-            try:
-                # Use a conversational voice
-                voice_id = "pNInz6obpgDQGcFmaJgB"  # Adam voice
-                
-                async with session.post(
-                    f"{self.base_url}/text-to-speech/{voice_id}",
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        raise RuntimeError(f"ElevenLabs API error: {response.status} - {error_text}")
-                    
-                    # Ensure directory exists
-                    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-                    
-                    # Write audio data
-                    with open(output_path, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(8192):
-                            f.write(chunk)
-                    
-                    print(f"✅ Generated conversational podcast audio")
-                    
-                    return {
-                        "audio_path": output_path,
-                        "format": "conversational_monologue",
-                        "note": "Two-host dialogue rendered as engaging monologue",
-                        "voice_id": voice_id,
-                        "model_id": model_id,
-                        "status": "completed",
-                        "generated_at": datetime.now().isoformat()
-                    }
-                        
-            except Exception as e:
-                raise RuntimeError(f"Failed to generate dialogue audio: {str(e)}")
+        buffer = io.BytesIO()
+        await synthesize_speech(
+            self.api_key,
+            f"{self.base_url}/text-to-speech/{self._voice_for(segment.speaker)}",
+            payload,
+            {"output_format": "mp3_44100_128"},
+            buffer,
+            [self.limiter],
+            f"segment {index+1}/{len(segments)}"
+        )
+        return buffer.getvalue()
+    
+    def _voice_for(self, speaker: str) -> str:
+        """Return a speaker's voice, or the first host's for unknown speakers."""
+        return self.voice_mapping.get(speaker) or next(iter(self.voice_mapping.values()))
     
-    def _parse_dialogue_as_conversation(self, script_content: str) -> str:
-        """Parse dialogue script into conversational monologue format."""
-        conversation_parts = []
+    def _parse_dialogue_lines(self, script_content: str) -> List[DialogueLine]:
+        """Parse the script section of a dialogue into spoken lines."""
+        lines = []
         
         # Find the script section
-        lines = script_content.split('\n')
         in_script = False
-        current_section = ""
+        new_section = False
         
-        for line in lines:
+        for line in script_content.split('\n'):
             line = line.strip()
             
             # Start capturing after "## Script"
@@ -130,18 +188,9 @@ class SimpleDialogueAudioGenerator:
             if in_script and line.startswith("---"):
                 break
             
-            # Track section headers
+            # Section headers become longer pauses
             if in_script and line.startswith("###"):
-                current_section = line.replace("#", "").strip()
-                # Add section transitions
-                if "COLD OPEN" in current_section:
-                    conversation_parts.append("\n[Upbeat intro music]\n")
-                elif "INTRODUCTION" in current_section:
-                    conversation_parts.append("\n[Transition sound]\n")
-                elif "FUN FACTS" in current_section:
-                    conversation_parts.append("\n[Fun sound effect]\nOkay, time for our fun facts segment!\n")
-                elif "CONCLUSION" in current_section:
-                    conversation_parts.append("\n[Wrapping up music]\n")
+                new_section = bool(lines)
                 continue
             
             # Parse dialogue lines
@@ -150,30 +199,22 @@ class SimpleDialogueAudioGenerator:
                 match = re.match(r'\*\*(\w+)\*\*:\s*(.+)', line)
                 if match:
                     speaker = match.group(1)
-                    text = match.group(2)
                     
                     # Remove tone indicators and clean up
-                    text = re.sub(r'\s*\*\[.*?\]\*\s*', ' ', text)
-                    text = text.strip()
+                    text = re.sub(r'\s*\*\[.*?\]\*\s*', ' ', match.group(2))
+                    text = self._clean_for_speech(text)
                     
                     if text:
-                        # Add conversational indicators for different speakers
-                        if speaker == "Alex":
-                            # Alex is enthusiastic
-                            conversation_parts.append(f"{text}")
-                        elif speaker == "Sam":
-                            # Sam is the expert, slightly different pacing
-                            conversation_parts.append(f"[Expert voice] {text}")
-                        else:
-                            conversation_parts.append(text)
-        
-        # Join with natural pauses
-        return " ... ".join(conversation_parts)
+                        lines.append(DialogueLine(speaker, text, new_section))
+                        new_section = False
+        
+        return lines
     
     def _clean_for_speech(self, text: str) -> str:
         """Clean text for speech synthesis."""
         # Remove markdown formatting
         text = re.sub(r'\*{1,2}([^*]+)\*{1,2}', r'\1', text)
-        # Remove brackets except for our voice indicators
-        text = re.sub(r'\[(?!Expert voice|Upbeat|Transition|Fun sound|Wrapping)[^\]]+\]', '', text)
-        return text.strip()
\ No newline at end of file
+        # Keep scripted pauses, drop other stage directions in brackets
+        text = text.replace('[PAUSE]', '...')
+        text = re.sub(r'\[[^\]]+\]', '', text)
+        return re.sub(r'\s+', ' ', text).strip()
@@ -2,7 +2,10 @@
 
 from fastmcp import FastMCP
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Set, Tuple
+from contextlib import asynccontextmanager
+import asyncio
+import logging
 import os
 from pathlib import Path
 from datetime import datetime
@@ -10,21 +13,92 @@ from datetime import datetime
 from .parsers.text_parser import TextParser
 from .parsers.pdf_parser import PDFParser
 from .generators.monologue_generator import MonologueGenerator
+from .generators.brief_generator import BriefGenerator
 from .generators.o3_generator import O3Generator
 from .generators.agent_generator import AgentGenerator
 from .generators.audio_generator import AudioGenerator
 from .generators.dialogue_generator import DialogueGenerator
-from .generators.simple_dialogue_audio import SimpleDialogueAudioGenerator
+from .generators.series_generator import SeriesGenerator
+from .generators.dialogue_audio_generator import DialogueAudioGenerator
 from .utils.file_utils import save_script
+from .utils.audio_workers import get_audio_worker_stats
+from .utils.hedging import hedge_delay, run_hedged
+from .utils.project_tracker import find_project, start_webhook_receiver
+from .utils.rate_limit import get_rate_limit_stats
+from .utils.render_jobs import get_render_job_store
+from .utils.voice_catalog import DEFAULT_PAGE_SIZE, get_voice_catalog, get_voice_catalog_stats
+from .utils.resilience import get_resilience_stats
+from .utils.section_map import (
+    MAX_CHANGED_FRACTION,
+    changed_fraction,
+    find_stale_fields,
+    load_sidecar,
+    map_segments,
+    save_sidecar,
+    section_hashes
+)
 from .config import (
     OPENAI_API_KEY, 
     ELEVENLABS_API_KEY,
     DEFAULT_OUTPUT_DIR,
     DEFAULT_TONE,
     DEFAULT_AUDIENCE,
-    PODCAST_VOICES
+    ELEVENLABS_METADATA_TTL_SECONDS,
+    HEDGE_MODEL,
+    HEDGE_PERCENTILE,
+    PODCAST_VOICES,
+    PROJECT_WEBHOOK_HOST,
+    PROJECT_WEBHOOK_PORT,
+    PROJECT_WEBHOOK_PUBLIC_URL,
+    RENDER_JOBS_DIR
 )
 
+logger = logging.getLogger(__name__)
+
+# Dialogue audio above standard quality is rendered as raw PCM, then mixed and encoded once
+DIALOGUE_PCM_FORMAT = "pcm_44100"
+
+# Background cache warm-ups and resumed renders, referenced until they finish so they are not garbage-collected
+_background_tasks: Set[asyncio.Task] = set()
+
+def _finish_background_task(task: asyncio.Task) -> None:
+    """Forget a finished background task, logging it if it failed."""
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Background task {task.get_name()} failed: {task.exception()}")
+
+def _start_background_task(coro, name: str) -> None:
+    """Run a coroutine in the background, keeping a reference until it finishes."""
+    task = asyncio.create_task(coro, name=name)
+    _background_tasks.add(task)
+    task.add_done_callback(_finish_background_task)
+
+def _warm_voice_catalog(elevenlabs_api_key: str) -> None:
+    """Load model and voice lists in the background so audio tools start from the cache."""
+    _start_background_task(
+        get_voice_catalog(elevenlabs_api_key, ELEVENLABS_METADATA_TTL_SECONDS).warm(),
+        "voice catalog warm-up"
+    )
+
+def _resume_interrupted_renders(elevenlabs_api_key: str) -> None:
+    """Resume in the background the dialogue renders a restart interrupted."""
+    for job in get_render_job_store(RENDER_JOBS_DIR).unfinished_jobs():
+        # Failed renders wait for resume_audio_render, so a lasting error is not retried on every start
+        if job["state"] == "running":
+            logger.info(f"Resuming interrupted render {job['job_id']} of {job['output_path']}")
+            _start_background_task(
+                DialogueAudioGenerator(elevenlabs_api_key).resume_job(job["job_id"]),
+                f"render {job['job_id']}"
+            )
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP):
+    """Warm caches and resume interrupted renders for the configuration auto_configure() found, once the server's loop runs."""
+    if config and config.elevenlabs_api_key:
+        _warm_voice_catalog(config.elevenlabs_api_key)
+        _resume_interrupted_renders(config.elevenlabs_api_key)
+    yield {}
+
 # Create the FastMCP server instance
 mcp = FastMCP(
     name="listen-in",
@@ -36,7 +110,8 @@ mcp = FastMCP(
     - Monologue-style scripts
     
     Use the generate_podcast_script tool to process documents.
-    """
+    """,
+    lifespan=_lifespan
 )
 
 # Configuration model
@@ -48,6 +123,16 @@ class PodcastConfig(BaseModel):
     default_tone: str = Field(default="conversational", description="Default tone for scripts")
     default_audience: str = Field(default="general", description="Default target audience")
 
+class ScriptVariant(BaseModel):
+    """One script to produce in a multi-variant generation."""
+    style: str = Field(default="monologue", description="Script style ('monologue' or 'dialogue')")
+    tone: Optional[str] = Field(default=None, description="Tone of the script (defaults to configured tone)")
+    audience: Optional[str] = Field(default=None, description="Target audience (defaults to configured audience)")
+    duration_minutes: Optional[int] = Field(default=None, description="Target duration in minutes")
+    custom_instructions: Optional[str] = Field(default=None, description="Additional instructions for this variant")
+    model: str = Field(default="o3", description="Model to use for monologues ('o3' or 'gpt-3.5-turbo')")
+    name: Optional[str] = Field(default=None, description="Label used in the output filename, e.g. 'teaser'")
+
 # Store configuration
 config: Optional[PodcastConfig] = None
 
@@ -69,6 +154,73 @@ def auto_configure():
 # Try auto-configuration on import
 auto_configure()
 
+def _parse_document(file_path: str) -> Tuple[Path, Dict[str, Any]]:
+    """Validate a document path and parse it with the matching parser."""
+    # Validate file exists
+    input_path = Path(file_path)
+    if not input_path.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+    
+    # Select parser based on file extension
+    file_extension = input_path.suffix.lower()
+    if file_extension == '.txt':
+        parser = TextParser()
+    elif file_extension == '.pdf':
+        parser = PDFParser()
+    else:
+        raise ValueError(f"Unsupported file type: {file_extension}. Supported: .txt, .pdf")
+    
+    # Parse the document
+    return input_path, parser.parse(file_path)
+
+def _create_generator(style: str, model: str, llm_model: Optional[str] = None):
+    """Create the script generator for a style and model."""
+    # Only override the generator's default LLM when one is given
+    options = {"model": llm_model} if llm_model else {}
+    if style == "dialogue":
+        return DialogueGenerator(api_key=config.openai_api_key, **options)
+    elif model == "o3":
+        return AgentGenerator(api_key=config.openai_api_key, **options)
+    else:
+        return MonologueGenerator(api_key=config.openai_api_key, **options)
+
+def _save_generated_script(script: str, input_path: Path, suffix: Optional[str] = None) -> Path:
+    """Save a generated script to the output directory and return its path."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_filename = f"{input_path.stem}_podcast_{timestamp}"
+    if suffix:
+        output_filename += f"_{suffix}"
+    output_path = Path(config.output_dir) / f"{output_filename}.md"
+    
+    save_script(script, str(output_path))
+    return output_path
+
+def _save_section_map(
+    output_path: Path,
+    input_path: Path,
+    content: Dict[str, Any],
+    generator,
+    style: str,
+    model: str,
+    settings: Dict[str, Any]
+) -> Optional[Path]:
+    """Store which document sections each script segment came from."""
+    # Only structured generators can rewrite single segments later
+    output = getattr(generator, "last_output", None)
+    if output is None:
+        return None
+    
+    return save_sidecar(str(output_path), {
+        "source_file": str(input_path.resolve()),
+        "style": style,
+        "model": model,
+        "llm_model": generator.model,
+        "settings": settings,
+        "sections": section_hashes(content["structure"]),
+        "output": output.model_dump(),
+        "segment_sections": map_segments(output.model_dump(), content["structure"])
+    })
+
 @mcp.tool
 async def configure(
     openai_api_key: Optional[str] = None,
@@ -99,6 +251,9 @@ async def configure(
     # Create output directory if it doesn't exist
     Path(final_output_dir).mkdir(parents=True, exist_ok=True)
     
+    if final_elevenlabs_key:
+        _warm_voice_catalog(final_elevenlabs_key)
+    
     audio_status = "enabled" if final_elevenlabs_key else "disabled"
     return f"Listen-in configured successfully. Output directory: {final_output_dir}. Audio generation: {audio_status}"
 
@@ -109,7 +264,9 @@ async def generate_podcast_script(
     tone: Optional[str] = None,
     audience: Optional[str] = None,
     custom_instructions: Optional[str] = None,
-    model: str = "o3"
+    model: str = "o3",
+    latency_budget_seconds: Optional[float] = None,
+    hedge_percentile: float = HEDGE_PERCENTILE
 ) -> dict:
     """
     Generate a podcast script from a local document.
@@ -121,56 +278,322 @@ async def generate_podcast_script(
         audience: Target audience (defaults to configured audience)
         custom_instructions: Additional instructions for script generation
         model: Model to use ("o3" for gpt-4.1-mini via Agents SDK or "gpt-3.5-turbo")
+        latency_budget_seconds: Optional deadline for the generation. When set,
+            a hedged request goes to a faster model if the primary model is
+            slower than its usual latency at hedge_percentile
+        hedge_percentile: Primary latency percentile after which to hedge
         
     Returns:
-        Dictionary with script_path and metadata
+        Dictionary with script_path, metadata, token usage (including
+        prompt-cache hits), measured vs target duration for dialogues and,
+        when hedging, which request won
     """
     if not config:
         raise ValueError("Server not configured. Please run configure() first.")
     
-    # Validate file exists
-    input_path = Path(file_path)
-    if not input_path.exists():
-        raise FileNotFoundError(f"File not found: {file_path}")
+    input_path, content = _parse_document(file_path)
     
-    # Select parser based on file extension
-    file_extension = input_path.suffix.lower()
-    if file_extension == '.txt':
-        parser = TextParser()
-    elif file_extension == '.pdf':
-        parser = PDFParser()
+    # Generate the script with the selected model and style
+    generator = _create_generator(style, model)
+    generate_options = {
+        "content": content,
+        "tone": tone or config.default_tone,
+        "audience": audience or config.default_audience,
+        "custom_instructions": custom_instructions
+    }
+    
+    hedge_info = None
+    if latency_budget_seconds:
+        # Race the primary model against a faster one if it runs long
+        hedge_generator = _create_generator(style, model, llm_model=HEDGE_MODEL)
+        primary_key = f"{type(generator).__name__}:{generator.model}"
+        hedge_key = f"{type(hedge_generator).__name__}:{hedge_generator.model}"
+        
+        try:
+            script, hedge_info = await run_hedged(
+                lambda: generator.generate(**generate_options),
+                lambda: hedge_generator.generate(**generate_options),
+                primary_key=primary_key,
+                hedge_key=hedge_key,
+                hedge_after=hedge_delay(
+                    primary_key, hedge_key, latency_budget_seconds, hedge_percentile
+                ),
+                deadline=latency_budget_seconds
+            )
+        except asyncio.TimeoutError as e:
+            raise RuntimeError(f"Script generation exceeded its latency budget: {str(e)}")
+        
+        if hedge_info["winner"] == "hedge":
+            generator = hedge_generator
     else:
-        raise ValueError(f"Unsupported file type: {file_extension}. Supported: .txt, .pdf")
+        script = await generator.generate(**generate_options)
     
-    # Parse the document
-    content = parser.parse(file_path)
+    # Save the script and its section map for later incremental updates
+    output_path = _save_generated_script(script, input_path)
+    settings = {key: value for key, value in generate_options.items() if key != "content"}
+    _save_section_map(output_path, input_path, content, generator, style, model, settings)
     
-    # Generate the script with the selected model and style
-    if style == "dialogue":
-        generator = DialogueGenerator(api_key=config.openai_api_key)
-    elif model == "o3":
-        generator = AgentGenerator(api_key=config.openai_api_key)
+    return {
+        "script_path": str(output_path),
+        "source_file": file_path,
+        "style": style,
+        "tone": tone or config.default_tone,
+        "audience": audience or config.default_audience,
+        "model": generator.model,
+        "usage": generator.last_usage,
+        "duration": getattr(generator, "last_duration", None),
+        "hedge": hedge_info,
+        "generated_at": datetime.now().isoformat()
+    }
+
+@mcp.tool
+async def update_podcast_script(
+    script_path: str,
+    file_path: Optional[str] = None
+) -> dict:
+    """
+    Bring a generated script up to date after its source document changed.
+    
+    The document is re-parsed and diffed against the stored section map by
+    section hash. Only the script segments tied to changed sections are
+    regenerated; all other segments are reused verbatim. When more than
+    half of the document changed, or every segment is stale, the script is
+    regenerated in full instead.
+    
+    Args:
+        script_path: Path to a script created by generate_podcast_script
+        file_path: Path to the updated document (defaults to the original source)
+        
+    Returns:
+        Dictionary with the updated script_path, the update mode
+        ("unchanged", "incremental" or "full") and which segments were
+        regenerated or reused
+    """
+    if not config:
+        raise ValueError("Server not configured. Please run configure() first.")
+    
+    sidecar = load_sidecar(script_path)
+    if sidecar is None:
+        raise ValueError(
+            f"No section map found for {script_path}. Only monologue (o3) and dialogue "
+            "scripts from generate_podcast_script can be updated incrementally."
+        )
+    
+    input_path, content = _parse_document(file_path or sidecar["source_file"])
+    generator = _create_generator(sidecar["style"], sidecar["model"], llm_model=sidecar["llm_model"])
+    
+    fields, changed_sections = find_stale_fields(sidecar, content["structure"])
+    reused = [field for field in sidecar["segment_sections"] if field not in fields]
+    
+    if not fields:
+        # Nothing the script says depends on the changes; keep it as is
+        sidecar["sections"] = section_hashes(content["structure"])
+        sidecar["source_file"] = str(input_path.resolve())
+        save_sidecar(script_path, sidecar)
+        return {
+            "script_path": script_path,
+            "source_file": str(input_path),
+            "mode": "unchanged",
+            "changed_sections": len(changed_sections),
+            "regenerated_fields": [],
+            "reused_fields": reused,
+            "usage": None,
+            "updated_at": datetime.now().isoformat()
+        }
+    
+    # Large rewrites would put most of the document into the repair guidance
+    if not reused or changed_fraction(changed_sections, content["structure"]) > MAX_CHANGED_FRACTION:
+        mode = "full"
+        fields = list(sidecar["segment_sections"])
+        reused = []
+        script = await generator.generate(content=content, **sidecar["settings"])
     else:
-        generator = MonologueGenerator(api_key=config.openai_api_key)
+        mode = "incremental"
+        script = await generator.regenerate_segments(
+            content=content,
+            previous=sidecar["output"],
+            fields=fields,
+            changed_sections=changed_sections,
+            **sidecar["settings"]
+        )
+    
+    output_path = _save_generated_script(script, input_path)
+    _save_section_map(
+        output_path, input_path, content, generator,
+        sidecar["style"], sidecar["model"], sidecar["settings"]
+    )
     
-    script = await generator.generate(
+    return {
+        "script_path": str(output_path),
+        "previous_script_path": script_path,
+        "source_file": str(input_path),
+        "mode": mode,
+        "changed_sections": len(changed_sections),
+        "regenerated_fields": fields,
+        "reused_fields": reused,
+        "usage": generator.last_usage,
+        "duration": getattr(generator, "last_duration", None),
+        "updated_at": datetime.now().isoformat()
+    }
+
+@mcp.tool
+async def generate_podcast_variants(
+    file_path: str,
+    variants: List[ScriptVariant],
+    focus: Optional[str] = None
+) -> dict:
+    """
+    Generate several podcast scripts from one document in a single call.
+    
+    The document is parsed once and condensed once into a shared brief; the
+    variants are then generated concurrently from that brief.
+    
+    Args:
+        file_path: Path to the input document (.txt or .pdf)
+        variants: Style/tone/audience/duration combinations to generate
+        focus: Optional topic the shared brief should concentrate on
+        
+    Returns:
+        Dictionary with one entry per variant (script path or error)
+    """
+    if not config:
+        raise ValueError("Server not configured. Please run configure() first.")
+    
+    if not variants:
+        raise ValueError("At least one variant is required")
+    
+    input_path, content = _parse_document(file_path)
+    
+    # Condense once for every variant
+    durations = [variant.duration_minutes for variant in variants if variant.duration_minutes]
+    brief_generator = BriefGenerator(api_key=config.openai_api_key)
+    brief = await brief_generator.generate(
+        content,
+        focus=focus,
+        max_duration_minutes=max(durations) if durations else None
+    )
+    
+    def variant_label(index: int, variant: ScriptVariant) -> str:
+        return variant.name or f"{index + 1}_{variant.style}"
+    
+    async def run_variant(index: int, variant: ScriptVariant) -> dict:
+        generator = _create_generator(variant.style, variant.model)
+        tone = variant.tone or config.default_tone
+        audience = variant.audience or config.default_audience
+        
+        options = {}
+        if variant.duration_minutes:
+            options["duration_minutes"] = variant.duration_minutes
+        
+        script = await generator.generate(
+            content=brief,
+            tone=tone,
+            audience=audience,
+            custom_instructions=variant.custom_instructions,
+            **options
+        )
+        
+        label = variant_label(index, variant)
+        output_path = _save_generated_script(script, input_path, suffix=label)
+        
+        return {
+            "name": label,
+            "script_path": str(output_path),
+            "style": variant.style,
+            "tone": tone,
+            "audience": audience,
+            "duration_minutes": variant.duration_minutes,
+            "usage": generator.last_usage,
+            "duration": getattr(generator, "last_duration", None)
+        }
+    
+    results = await asyncio.gather(
+        *(run_variant(i, variant) for i, variant in enumerate(variants)),
+        return_exceptions=True
+    )
+    
+    scripts = []
+    for index, (variant, result) in enumerate(zip(variants, results)):
+        if isinstance(result, Exception):
+            scripts.append({"name": variant_label(index, variant), "style": variant.style, "error": str(result)})
+        else:
+            scripts.append(result)
+    
+    return {
+        "source_file": file_path,
+        "brief_word_count": brief["metadata"]["word_count"],
+        "brief_usage": brief_generator.last_usage,
+        "scripts": scripts,
+        "generated_at": datetime.now().isoformat()
+    }
+
+@mcp.tool
+async def generate_podcast_series(
+    file_path: str,
+    episodes: Optional[int] = None,
+    episode_minutes: int = 5,
+    tone: Optional[str] = None,
+    audience: Optional[str] = None,
+    custom_instructions: Optional[str] = None,
+    max_concurrency: int = 3
+) -> dict:
+    """
+    Generate a numbered series of dialogue episodes covering a large document.
+    
+    The document is split by its outline (or by word budget) into episodes,
+    a shared series bible of hosts, running jokes and recurring terms is
+    created, and the episodes are generated concurrently.
+    
+    Args:
+        file_path: Path to the input document (.txt or .pdf)
+        episodes: Number of episodes (sized from the document if omitted,
+            up to 12; pass a number to cover larger documents in full)
+        episode_minutes: Target duration of each episode in minutes
+        tone: Tone of the scripts (defaults to configured tone)
+        audience: Target audience (defaults to configured audience)
+        custom_instructions: Additional instructions applied to every episode
+        max_concurrency: Maximum number of episodes generated at once
+        
+    Returns:
+        Dictionary with the series bible, the numbered episode script paths
+        and the share of the document the episodes cover
+    """
+    if not config:
+        raise ValueError("Server not configured. Please run configure() first.")
+    
+    input_path, content = _parse_document(file_path)
+    
+    generator = SeriesGenerator(
+        api_key=config.openai_api_key,
+        max_concurrency=max(1, max_concurrency)
+    )
+    series = await generator.generate(
         content=content,
+        episodes=episodes,
+        episode_minutes=episode_minutes,
         tone=tone or config.default_tone,
         audience=audience or config.default_audience,
         custom_instructions=custom_instructions
     )
     
-    # Save the script
+    # Save the episodes as a numbered set sharing one timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_filename = f"{input_path.stem}_podcast_{timestamp}.md"
-    output_path = Path(config.output_dir) / output_filename
-    
-    save_script(script, str(output_path))
+    episode_results = []
+    for episode in series["episodes"]:
+        script = episode.pop("script", None)
+        if script is not None:
+            output_path = Path(config.output_dir) / (
+                f"{input_path.stem}_podcast_{timestamp}_ep{episode['episode']:02d}.md"
+            )
+            save_script(script, str(output_path))
+            episode["script_path"] = str(output_path)
+        episode_results.append(episode)
     
     return {
-        "script_path": str(output_path),
         "source_file": file_path,
-        "style": style,
+        "series": series["bible"].model_dump(),
+        "episodes": episode_results,
+        "coverage": series["coverage"],
         "tone": tone or config.default_tone,
         "audience": audience or config.default_audience,
         "generated_at": datetime.now().isoformat()
@@ -220,7 +643,11 @@ async def generate_podcast_audio(
         callback_url: Optional webhook URL for async processing
         
     Returns:
-        Dictionary with audio file information
+        Dictionary with audio file information. Monologue audio is rendered
+        as an ElevenLabs project in the background: the result is a handle
+        with status "processing" to pass to get_audio_project_status.
+        Dialogue audio is rendered as a resumable job; standard quality is
+        streamed into the file as MP3, higher qualities are mixed from PCM.
     """
     if not config:
         raise ValueError("Server not configured. Please run configure() first.")
@@ -259,12 +686,26 @@ async def generate_podcast_audio(
     
     # Generate audio with appropriate generator
     if is_dialogue:
-        generator = SimpleDialogueAudioGenerator(api_key=config.elevenlabs_api_key)
-        result = await generator.generate_audio(
-            script_content=script_content,
-            output_path=str(audio_path)
-        )
+        generator = DialogueAudioGenerator(api_key=config.elevenlabs_api_key)
+        if quality == "standard":
+            # Segments are appended as they finish, so playback can start early
+            result = await generator.generate_audio(
+                script_content=script_content,
+                output_path=str(audio_path),
+                stream=True
+            )
+        else:
+            result = await generator.generate_audio(
+                script_content=script_content,
+                output_path=str(audio_path),
+                output_format=DIALOGUE_PCM_FORMAT
+            )
     else:
+        # Callbacks reach the local receiver through its public address
+        if PROJECT_WEBHOOK_PORT:
+            await start_webhook_receiver(PROJECT_WEBHOOK_HOST, PROJECT_WEBHOOK_PORT)
+            callback_url = callback_url or PROJECT_WEBHOOK_PUBLIC_URL or None
+        
         generator = AudioGenerator(api_key=config.elevenlabs_api_key)
         result = await generator.generate_audio(
             script_content=script_content,
@@ -273,15 +714,98 @@ async def generate_podcast_audio(
             quality=quality,
             duration_scale=duration_scale,
             voice_id=final_voice_id,
-            callback_url=callback_url
+            callback_url=callback_url,
+            wait=False
         )
     
     result["script_path"] = script_path
     return result
 
 @mcp.tool
-async def list_available_voices() -> Dict[str, Any]:
-    """List available voices for podcast generation."""
+async def get_audio_project_status(project_id: str) -> Dict[str, Any]:
+    """
+    Check on audio started by generate_podcast_audio.
+    
+    Args:
+        project_id: project_id from the generate_podcast_audio result
+        
+    Returns:
+        The project's status ("processing", "completed", "failed" or
+        "timed_out"); completed projects include the downloaded audio's
+        path, duration and bitrate
+    """
+    project = find_project(project_id)
+    if project is None:
+        raise ValueError(f"Unknown project: {project_id}. Projects are tracked until the server restarts.")
+    return project
+
+@mcp.tool
+async def list_audio_renders() -> Dict[str, Any]:
+    """
+    List dialogue audio renders that have not finished.
+    
+    Renders interrupted by a restart are resumed automatically when the
+    server starts; failed renders are resumed with resume_audio_render.
+    
+    Returns:
+        Dictionary with the unfinished renders: job ID, output path, state
+        ("running" or "failed"), error, and rendered and total segments
+    """
+    jobs = get_render_job_store(RENDER_JOBS_DIR).unfinished_jobs()
+    return {
+        "renders": [
+            {
+                "job_id": job["job_id"],
+                "audio_path": job["output_path"],
+                "state": job["state"],
+                "error": job["error"],
+                "completed_segments": job["completed_segments"],
+                "total_segments": len(job["plan"]),
+                "updated_at": job["updated_at"]
+            }
+            for job in jobs
+        ]
+    }
+
+@mcp.tool
+async def resume_audio_render(job_id: str) -> Dict[str, Any]:
+    """
+    Finish a dialogue audio render that failed or was interrupted.
+    
+    Only the segments missing from the earlier attempt are rendered, and
+    the file is identical to an uninterrupted render.
+    
+    Args:
+        job_id: job_id from list_audio_renders or a generate_podcast_audio result
+        
+    Returns:
+        The same dictionary generate_podcast_audio returns for dialogue audio
+    """
+    if not config or not config.elevenlabs_api_key:
+        raise ValueError("ElevenLabs API key not configured. Audio generation is disabled.")
+    
+    return await DialogueAudioGenerator(api_key=config.elevenlabs_api_key).resume_job(job_id)
+
+@mcp.tool
+async def list_available_voices(
+    search: Optional[str] = None,
+    category: Optional[str] = None,
+    page: int = 1,
+    page_size: int = DEFAULT_PAGE_SIZE
+) -> Dict[str, Any]:
+    """
+    List available voices for podcast generation.
+    
+    Args:
+        search: Only ElevenLabs voices whose name, description or labels contain this text
+        category: Only ElevenLabs voices of this category, e.g. "premade" or "cloned"
+        page: Page of ElevenLabs voices to return, starting at 1
+        page_size: ElevenLabs voices per page
+        
+    Returns:
+        Preset voices, and a page of the account's ElevenLabs voices with
+        the total number of matches
+    """
     # First show preset voices
     preset_voices = {
         "preset_voices": {
@@ -296,8 +820,8 @@ async def list_available_voices() -> Dict[str, Any]:
     # If ElevenLabs is configured, also fetch available voices
     if config and config.elevenlabs_api_key:
         try:
-            generator = AudioGenerator(api_key=config.elevenlabs_api_key)
-            api_voices = await generator.get_voices()
+            catalog = get_voice_catalog(config.elevenlabs_api_key, ELEVENLABS_METADATA_TTL_SECONDS)
+            result = await catalog.find_voices(search, category, page, page_size)
             
             preset_voices["elevenlabs_voices"] = [
                 {
@@ -306,8 +830,13 @@ async def list_available_voices() -> Dict[str, Any]:
                     "category": voice.get("category", "unknown"),
                     "preview_url": voice.get("preview_url", "")
                 }
-                for voice in api_voices[:10]  # Limit to first 10
+                for voice in result["voices"]
             ]
+            preset_voices["elevenlabs_voices_total"] = result["total"]
+            preset_voices["page"] = result["page"]
+            preset_voices["pages"] = result["pages"]
+        except ValueError:
+            raise
         except Exception as e:
             preset_voices["elevenlabs_voices"] = f"Error fetching voices: {str(e)}"
     else:
@@ -315,6 +844,24 @@ async def list_available_voices() -> Dict[str, Any]:
     
     return preset_voices
 
+@mcp.tool
+async def get_server_stats() -> Dict[str, Any]:
+    """
+    Report runtime counters for the server's external API calls.
+    
+    Returns:
+        Dictionary with per-backend call, retry, backoff and circuit-breaker
+        stats, the current limits of the text-to-speech rate limiters and
+        hit/miss counts of the cached ElevenLabs model and voice lists, and
+        the queue depth of the audio worker pool (None until first used)
+    """
+    return {
+        "llm": get_resilience_stats(),
+        "tts": get_rate_limit_stats(),
+        "voice_catalog": get_voice_catalog_stats(),
+        "audio_workers": get_audio_worker_stats()
+    }
+
 if __name__ == "__main__":
     # Run the server
     mcp.run()
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""Bounded process pool for CPU-bound audio assembly, encoding and analysis."""
+
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class AudioWorkerPool:
+    """
+    Runs blocking audio work in worker processes so the event loop stays free.
+
+    At most max_workers calls run at once; later calls wait in the pool's
+    queue. Calls are grouped by job, and cancel_job() drops every queued
+    call of a job. A call that is already running cannot be interrupted,
+    but its result is discarded, and calls made with run_to_file never
+    write their output. Cancelling the awaiting task cancels its call in
+    the same way.
+    """
+
+    def __init__(self, max_workers: int):
+        """Initialize the pool; worker processes start on first use."""
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[str, Set[Future]] = {}
+        self.stats = {"completed": 0, "failed": 0, "cancelled": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return the executor, starting a new one if there is none or it broke."""
+        if self._executor is None:
+            # Spawned workers do not inherit the server's event loop, sockets or threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def run(self, job_id: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run fn(*args) in a worker process and return its result.
+
+        fn and its arguments must be picklable: module-level functions
+        taking paths and plain values, not open files or memory maps.
+
+        Args:
+            job_id: Job the call belongs to, for cancel_job
+            fn: Function to run
+            *args: Arguments for fn
+
+        Raises:
+            asyncio.CancelledError: If the call or its job was cancelled
+            RuntimeError: If a worker process died
+        """
+        return await self._run(job_id, None, fn, *args)
+
+    async def run_to_file(self, job_id: str, fn: Callable[..., Any], output_path: str, *args: Any) -> Any:
+        """
+        Run fn(*args, output_path=...) in a worker process and return its result.
+
+        The worker writes to a temporary file next to output_path, which is
+        moved into place only once the call succeeds. A call that was
+        already running when it was cancelled therefore never touches
+        output_path; its temporary file is removed when it ends.
+
+        Raises:
+            asyncio.CancelledError: If the call or its job was cancelled
+            RuntimeError: If a worker process died
+        """
+        output = Path(output_path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=output.parent, prefix=f".{output.name}.", suffix=".part")
+        os.close(fd)
+        result = await self._run(job_id, temp_path, fn, *args, output_path=temp_path)
+        os.replace(temp_path, output_path)
+        return result
+
+    async def _run(
+        self,
+        job_id: str,
+        temp_path: Optional[str],
+        fn: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any
+    ) -> Any:
+        """Submit a call under job_id and await it, removing temp_path unless it succeeds."""
+        future = self._get_executor().submit(fn, *args, **kwargs)
+        calls = self._jobs.setdefault(job_id, set())
+        calls.add(future)
+        succeeded = abandoned = False
+        try:
+            result = await asyncio.wrap_future(future)
+            succeeded = True
+        except asyncio.CancelledError:
+            if not future.cancel() and not future.done():
+                # A running call stays listed until it ends, then its output is dropped
+                abandoned = True
+                loop = asyncio.get_running_loop()
+                future.add_done_callback(lambda _: self._forget_soon(loop, job_id, future, temp_path))
+            self.stats["cancelled"] += 1
+            raise
+        except BrokenProcessPool as e:
+            # The next call starts a fresh pool
+            self._executor = None
+            self.stats["failed"] += 1
+            raise RuntimeError(f"Audio worker process died: {e}")
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        finally:
+            if not abandoned:
+                self._forget(job_id, future, None if succeeded else temp_path)
+
+        self.stats["completed"] += 1
+        return result
+
+    def _forget_soon(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        job_id: str,
+        future: Future,
+        temp_path: Optional[str]
+    ) -> None:
+        """Forget a call from the executor's thread, on the loop that ran it if it is still open."""
+        try:
+            loop.call_soon_threadsafe(self._forget, job_id, future, temp_path)
+        except RuntimeError:
+            # The loop has closed, so nothing else touches the pool
+            self._forget(job_id, future, temp_path)
+
+    def _forget(self, job_id: str, future: Future, temp_path: Optional[str]) -> None:
+        """Stop tracking a finished call and remove its temporary output."""
+        calls = self._jobs.get(job_id)
+        if calls is not None:
+            calls.discard(future)
+            if not calls:
+                self._jobs.pop(job_id, None)
+        if temp_path is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temp_path)
+
+    def cancel_job(self, job_id: str) -> Dict[str, int]:
+        """
+        Cancel a job's queued calls.
+
+        The executor hands a call to its workers' queue slightly before a
+        worker picks it up, so such a call counts as running.
+
+        Returns:
+            Number of calls cancelled before they started, and number of
+            calls still running that could not be stopped
+        """
+        futures = list(self._jobs.get(job_id, ()))
+        cancelled = sum(1 for future in futures if future.cancel())
+        running = sum(1 for future in futures if not future.done())
+        return {"cancelled": cancelled, "running": running}
+
+    def queue_stats(self) -> Dict[str, Any]:
+        """Return the pool's size, queue depth, running calls and counters."""
+        futures = [future for calls in self._jobs.values() for future in calls]
+        running = sum(1 for future in futures if future.running())
+        return {
+            "max_workers": self.max_workers,
+            "queued": sum(1 for future in futures if not future.running() and not future.done()),
+            "running": running,
+            "jobs": len(self._jobs),
+            **self.stats
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, cancelling queued calls."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_pool: Optional[AudioWorkerPool] = None
+
+
+def get_audio_worker_pool(max_workers: int) -> AudioWorkerPool:
+    """Return the shared pool, creating it with max_workers on first use."""
+    global _pool
+    if _pool is None:
+        _pool = AudioWorkerPool(max_workers)
+    return _pool
+
+
+def get_audio_worker_stats() -> Optional[Dict[str, Any]]:
+    """Return the shared pool's queue stats, or None before it is used."""
+    return _pool.queue_stats() if _pool is not None else None
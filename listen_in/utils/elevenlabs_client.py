@@ -0,0 +1,149 @@
+"""Shared, long-lived HTTP session for the ElevenLabs API."""
+
+import asyncio
+import time
+from contextlib import AsyncExitStack, nullcontext
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+import aiohttp
+
+from .rate_limit import AdaptiveLimiter
+from .resilience import DEFAULT_RETRY_POLICY, retry_after_seconds
+
+ELEVENLABS_BASE_URL = "https://api.elevenlabs.io/v1"
+
+# Total and per-host connection limits of the shared pool
+CONNECTION_LIMIT = 32
+CONNECTION_LIMIT_PER_HOST = 16
+
+# Keep idle connections open this long so consecutive segments reuse them
+KEEPALIVE_TIMEOUT_SECONDS = 60
+
+# Cache DNS lookups for this long
+DNS_CACHE_TTL_SECONDS = 300
+
+# Text-to-speech for long scripts can take minutes; connecting should not
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=600, sock_connect=10)
+
+# Attempts per text-to-speech request before a 429 or 5xx response fails it
+MAX_TTS_ATTEMPTS = 5
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Return the shared ElevenLabs session, creating it on first use.
+
+    The session keeps a pool of keep-alive connections, so requests after the
+    first skip DNS resolution and the TCP/TLS handshake. Sessions are bound to
+    an event loop, so a new one is created when called from a different loop.
+
+    Returns:
+        Shared aiohttp session; callers must not close it
+    """
+    global _session, _session_loop
+
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTION_LIMIT,
+            limit_per_host=CONNECTION_LIMIT_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT_SECONDS,
+            ttl_dns_cache=DNS_CACHE_TTL_SECONDS
+        )
+        _session = aiohttp.ClientSession(connector=connector, timeout=REQUEST_TIMEOUT)
+        _session_loop = loop
+
+    return _session
+
+
+async def close_session() -> None:
+    """Close the shared session and its pooled connections."""
+    global _session, _session_loop
+
+    if _session is not None and not _session.closed and _session_loop is asyncio.get_running_loop():
+        await _session.close()
+    _session = None
+    _session_loop = None
+
+
+async def synthesize_speech(
+    api_key: str,
+    url: str,
+    payload: Dict[str, Any],
+    params: Dict[str, Any],
+    output: Union[str, BinaryIO],
+    limiters: List[AdaptiveLimiter],
+    label: str
+) -> float:
+    """
+    Render text to speech through the rate limiters and write the audio to a file.
+
+    429 responses pause every request sharing the limiters; those and 5xx
+    responses are retried. Chunks are flushed as they arrive so a player
+    reading the file sees audio from a streaming endpoint immediately.
+
+    Args:
+        api_key: ElevenLabs API key
+        url: Text-to-speech endpoint, streaming or not
+        payload: Request body
+        params: Query parameters, including the output format
+        output: Path to write the audio to, or a writable binary buffer such
+            as io.BytesIO to keep it in memory
+        limiters: Limiters the request must pass, acquired in order
+        label: Name of the request in error messages, e.g. "segment 3"
+
+    Returns:
+        time.monotonic() at which the first audio chunk was written
+
+    Raises:
+        RuntimeError: If the request fails or retries are exhausted
+    """
+    headers = {
+        "Accept": "audio/mpeg",
+        "Content-Type": "application/json",
+        "xi-api-key": api_key
+    }
+    session = get_session()
+
+    for attempt in range(1, MAX_TTS_ATTEMPTS + 1):
+        async with AsyncExitStack() as stack:
+            # Take the narrowest slot first so waiting for it never blocks a wider one
+            for limiter in limiters:
+                await stack.enter_async_context(limiter.slot())
+
+            async with session.post(
+                url,
+                headers=headers,
+                json=payload,
+                params=params
+            ) as response:
+                if response.status == 200:
+                    first_chunk_at = None
+                    with open(output, 'wb') if isinstance(output, str) else nullcontext(output) as f:
+                        async for chunk in response.content.iter_chunked(8192):
+                            f.write(chunk)
+                            f.flush()
+                            if first_chunk_at is None:
+                                first_chunk_at = time.monotonic()
+
+                    for limiter in limiters:
+                        limiter.record_success(response.headers)
+                    return first_chunk_at if first_chunk_at is not None else time.monotonic()
+
+                error_text = await response.text()
+                retryable = response.status == 429 or response.status >= 500
+                if not retryable or attempt == MAX_TTS_ATTEMPTS:
+                    raise RuntimeError(f"ElevenLabs API error for {label}: {response.status} - {error_text}")
+
+                if response.status == 429:
+                    for limiter in limiters:
+                        limiter.record_rate_limited(response.headers, retry_after_seconds(response))
+                    delay = 0.0
+                else:
+                    delay = DEFAULT_RETRY_POLICY.backoff(attempt)
+
+        await asyncio.sleep(delay)
+
+    raise RuntimeError(f"ElevenLabs API error for {label}: retries exhausted")
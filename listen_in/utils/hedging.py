@@ -0,0 +1,199 @@
+"""Hedged requests: race a slow primary call against a faster fallback."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Hedge after this fraction of the budget when there is no latency history
+DEFAULT_HEDGE_FRACTION = 0.5
+
+# Number of recent latencies kept per model
+LATENCY_WINDOW = 50
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per key."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        """Initialize an empty tracker."""
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, key: str, seconds: float) -> None:
+        """Record the latency of a successful call."""
+        if key not in self._samples:
+            self._samples[key] = deque(maxlen=self.window)
+        self._samples[key].append(seconds)
+
+    def percentile(self, key: str, fraction: float) -> Optional[float]:
+        """
+        Return a latency percentile for a key.
+
+        Args:
+            key: Tracked key, e.g. "DialogueGenerator:o3-2025-04-16"
+            fraction: Percentile as a fraction, e.g. 0.9 for p90
+
+        Returns:
+            Latency in seconds, or None without history
+        """
+        samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, round(fraction * (len(samples) - 1))))
+        return samples[index]
+
+
+latency_tracker = LatencyTracker()
+
+
+def hedge_delay(
+    primary_key: str,
+    hedge_key: str,
+    budget_seconds: float,
+    percentile: float
+) -> float:
+    """
+    Decide how long to wait for the primary before sending the hedge.
+
+    Waits until the primary's observed latency percentile, but never so long
+    that the hedge's own typical latency would overrun the budget.
+
+    Args:
+        primary_key: Latency key of the primary call
+        hedge_key: Latency key of the hedge call
+        budget_seconds: Total latency budget for the request
+        percentile: Primary latency percentile to hedge at, e.g. 0.9
+
+    Returns:
+        Delay in seconds before the hedge is sent
+    """
+    delay = latency_tracker.percentile(primary_key, percentile)
+    if delay is None:
+        delay = budget_seconds * DEFAULT_HEDGE_FRACTION
+
+    hedge_latency = latency_tracker.percentile(hedge_key, percentile) or 0.0
+    return max(0.0, min(delay, budget_seconds - hedge_latency))
+
+
+async def run_hedged(
+    primary: Callable[[], Awaitable[T]],
+    hedge: Callable[[], Awaitable[T]],
+    primary_key: str,
+    hedge_key: str,
+    hedge_after: float,
+    deadline: Optional[float] = None
+) -> Tuple[T, Dict[str, Any]]:
+    """
+    Run the primary call, adding a hedged call if it is slow.
+
+    The first call to return successfully wins and the other is cancelled.
+    If the primary fails before the hedge delay, the hedge starts at once.
+
+    Args:
+        primary: Zero-argument callable starting the primary call
+        hedge: Zero-argument callable starting the faster fallback call
+        primary_key: Latency key of the primary call
+        hedge_key: Latency key of the hedge call
+        hedge_after: Seconds to wait for the primary before hedging
+        deadline: Optional overall limit in seconds
+
+    Returns:
+        Tuple of the winning result and a dictionary describing the race
+    """
+    started_at = time.perf_counter()
+    tasks = {asyncio.ensure_future(primary()): "primary"}
+    hedge_started_at: Optional[float] = None
+    errors: Dict[str, BaseException] = {}
+
+    def remaining() -> Optional[float]:
+        if deadline is None:
+            return None
+        return max(0.0, deadline - (time.perf_counter() - started_at))
+
+    try:
+        while tasks:
+            # Until the hedge is sent, wake up at the hedge delay
+            timeout = remaining()
+            if hedge_started_at is None:
+                until_hedge = max(0.0, hedge_after - (time.perf_counter() - started_at))
+                timeout = until_hedge if timeout is None else min(timeout, until_hedge)
+
+            done, _ = await asyncio.wait(
+                tasks.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            for task in done:
+                name = tasks.pop(task)
+                if task.exception() is None:
+                    elapsed = time.perf_counter() - started_at
+                    info = _race_info(name, elapsed, hedge_started_at, primary_key, "primary" in errors)
+                    if name == "primary":
+                        latency_tracker.record(primary_key, elapsed)
+                    else:
+                        # A cancelled primary's latency is unknown, so it is not recorded;
+                        # a lower bound would drag hedge_delay down
+                        latency_tracker.record(hedge_key, elapsed - hedge_started_at)
+                    return task.result(), info
+                errors[name] = task.exception()
+                logger.warning(f"Hedged request: {name} failed: {task.exception()}")
+
+            if deadline is not None and remaining() == 0.0:
+                raise asyncio.TimeoutError(
+                    f"No result within the latency budget of {deadline:g}s"
+                )
+
+            # Send the hedge once the delay passes or the primary has failed
+            if hedge_started_at is None:
+                hedge_started_at = time.perf_counter() - started_at
+                logger.info(
+                    f"Hedged request: primary ({primary_key}) "
+                    f"{'failed' if 'primary' in errors else 'still running'} after "
+                    f"{hedge_started_at:.1f}s, sending hedge ({hedge_key})"
+                )
+                tasks[asyncio.ensure_future(hedge())] = "hedge"
+
+        # Both calls failed; surface the primary's error
+        raise errors.get("primary") or errors["hedge"]
+
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _race_info(
+    winner: str,
+    elapsed: float,
+    hedge_started_at: Optional[float],
+    primary_key: str,
+    primary_failed: bool = False
+) -> Dict[str, Any]:
+    """Describe the outcome of a hedged request and log it."""
+    info: Dict[str, Any] = {
+        "winner": winner,
+        "elapsed_seconds": round(elapsed, 2),
+        "hedged": hedge_started_at is not None,
+        "hedge_sent_after_seconds": round(hedge_started_at, 2) if hedge_started_at is not None else None,
+        "latency_saved_seconds": 0.0
+    }
+
+    if winner == "hedge" and primary_failed:
+        # The hedge only replaced a failed primary; nothing was cancelled
+        info["primary_failed"] = True
+    elif winner == "hedge":
+        # The primary was cancelled, so estimate its latency from history
+        info["primary_cancelled_after_seconds"] = round(elapsed, 2)
+        expected = latency_tracker.percentile(primary_key, 0.5)
+        if expected is not None:
+            info["latency_saved_seconds"] = round(max(0.0, expected - elapsed), 2)
+
+    logger.info(
+        f"Hedged request won by {winner} in {info['elapsed_seconds']}s "
+        f"(estimated latency saved: {info['latency_saved_seconds']}s)"
+    )
+    return info
@@ -0,0 +1,67 @@
+"""Token usage reporting for LLM calls."""
+
+import logging
+import time
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+def summarize_usage(usage: Any, started_at: float) -> Dict[str, Any]:
+    """
+    Summarize token usage, including prompt-cache hits, for one generation.
+
+    Works with both the Responses API usage object and the Agents SDK
+    ``Usage`` aggregate, which expose the same field names.
+
+    Args:
+        usage: Usage object returned with the LLM response (may be None)
+        started_at: ``time.perf_counter()`` value taken before the call
+
+    Returns:
+        Dictionary with token counts, cache hit ratio and latency
+    """
+    input_tokens = getattr(usage, "input_tokens", 0) or 0
+    output_tokens = getattr(usage, "output_tokens", 0) or 0
+    details = getattr(usage, "input_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", 0) or 0
+
+    summary = {
+        "input_tokens": input_tokens,
+        "cached_tokens": cached_tokens,
+        "output_tokens": output_tokens,
+        "cache_hit_ratio": round(cached_tokens / input_tokens, 3) if input_tokens else 0.0,
+        "latency_seconds": round(time.perf_counter() - started_at, 2)
+    }
+
+    logger.info(
+        f"LLM usage - input: {input_tokens} (cached: {cached_tokens}), "
+        f"output: {output_tokens}, latency: {summary['latency_seconds']}s"
+    )
+
+    return summary
+
+
+def combine_usage(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add up the usage summaries of two calls made for one generation.
+
+    Args:
+        first: Summary of the first call
+        second: Summary of the follow-up call
+
+    Returns:
+        Combined summary; keys other than the token counts and latency are
+        taken from the second summary
+    """
+    combined = {**first, **second}
+    for key in ("input_tokens", "cached_tokens", "output_tokens"):
+        combined[key] = first.get(key, 0) + second.get(key, 0)
+    combined["latency_seconds"] = round(
+        first.get("latency_seconds", 0.0) + second.get("latency_seconds", 0.0), 2
+    )
+    combined["cache_hit_ratio"] = (
+        round(combined["cached_tokens"] / combined["input_tokens"], 3)
+        if combined["input_tokens"] else 0.0
+    )
+    return combined
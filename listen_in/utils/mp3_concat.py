@@ -0,0 +1,461 @@
+"""MP3 frame parsing: concatenation and duration without decoding or re-encoding."""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bitrates in kbps by [MPEG-1?][bitrate index] for Layer III
+_BITRATES = {
+    True: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    False: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]
+}
+
+# A frame counts as silent when it carries less spectral data than this share
+# of the segment's median frame
+SILENT_FRAME_RATIO = 0.05
+
+# Silent frames kept at each edge of a trimmed segment so onsets stay soft
+TRIM_MARGIN_FRAMES = 1
+
+# Sample rates by version bits and sample-rate index
+_SAMPLE_RATES = {
+    0b11: [44100, 48000, 32000],  # MPEG-1
+    0b10: [22050, 24000, 16000],  # MPEG-2
+    0b00: [11025, 12000, 8000]    # MPEG-2.5
+}
+
+
+class FrameHeader(NamedTuple):
+    """Decoded fields of an MPEG audio Layer III frame header."""
+    version_bits: int
+    bitrate_index: int
+    sample_rate: int
+    padding: int
+    channel_mode: int
+    raw: bytes
+
+    @property
+    def is_mpeg1(self) -> bool:
+        """Whether the frame is MPEG-1 (as opposed to MPEG-2 or 2.5)."""
+        return self.version_bits == 0b11
+
+    @property
+    def samples(self) -> int:
+        """Samples per channel in the frame."""
+        return 1152 if self.is_mpeg1 else 576
+
+    @property
+    def length(self) -> int:
+        """Frame length in bytes, including the header."""
+        bitrate = _BITRATES[self.is_mpeg1][self.bitrate_index] * 1000
+        return (144 if self.is_mpeg1 else 72) * bitrate // self.sample_rate + self.padding
+
+    @property
+    def side_info_length(self) -> int:
+        """Length of the Layer III side information following the header."""
+        mono = self.channel_mode == 0b11
+        if self.is_mpeg1:
+            return 17 if mono else 32
+        return 9 if mono else 17
+
+    @property
+    def has_crc(self) -> bool:
+        """Whether a 16-bit CRC follows the header."""
+        return not self.raw[1] & 0x01
+
+    @property
+    def stream_format(self) -> Tuple[int, int, bool]:
+        """Properties every frame of a concatenated stream must share."""
+        return (self.version_bits, self.sample_rate, self.channel_mode == 0b11)
+
+
+def parse_header(data: bytes, offset: int) -> Optional[FrameHeader]:
+    """Decode the Layer III frame header at an offset, or return None."""
+    if offset + 4 > len(data):
+        return None
+    b0, b1, b2, b3 = data[offset:offset + 4]
+
+    # Frame sync, Layer III and a valid version, bitrate and sample rate
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0 or (b1 >> 1) & 0b11 != 0b01:
+        return None
+    version_bits = (b1 >> 3) & 0b11
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0b11
+    if version_bits == 0b01 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    return FrameHeader(
+        version_bits=version_bits,
+        bitrate_index=bitrate_index,
+        sample_rate=_SAMPLE_RATES[version_bits][sample_rate_index],
+        padding=(b2 >> 1) & 1,
+        channel_mode=b3 >> 6,
+        raw=bytes(data[offset:offset + 4])
+    )
+
+
+def _id3v2_length(data: bytes) -> int:
+    """Return the size of a leading ID3v2 tag, or 0."""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _id3v1_length(data: bytes) -> int:
+    """Return the size of a trailing ID3v1 tag, or 0."""
+    return 128 if data[-128:-125] == b"TAG" else 0
+
+
+def _next_sync(data: Union[bytes, memoryview], start: int, end: int) -> int:
+    """Return the offset of the next 0xFF byte in data[start:end], or -1."""
+    if isinstance(data, memoryview):
+        # Memoryviews cannot search; only junk between frames gets here
+        found = bytes(data[start:end]).find(b"\xff")
+        return start + found if found >= 0 else -1
+    return data.find(b"\xff", start, end)
+
+
+def _is_info_frame(data: bytes, offset: int, header: FrameHeader) -> bool:
+    """Whether a frame is a Xing/Info/VBRI metadata frame rather than audio."""
+    start = offset + 4 + header.side_info_length
+    return data[start:start + 4] in (b"Xing", b"Info") or data[offset + 36:offset + 40] == b"VBRI"
+
+
+def _tagged_frame_count(data: bytes, offset: int, header: FrameHeader) -> Optional[Tuple[str, int]]:
+    """Return the tag type and audio frame count a Xing/Info/VBRI frame declares, if any."""
+    start = offset + 4 + header.side_info_length
+    tag = data[start:start + 4]
+    if tag in (b"Xing", b"Info"):
+        flags = int.from_bytes(data[start + 4:start + 8], "big")
+        if flags & 0x1 and len(data) >= start + 12:
+            return tag.decode("ascii").lower(), int.from_bytes(data[start + 8:start + 12], "big")
+    elif data[offset + 36:offset + 40] == b"VBRI" and len(data) >= offset + 54:
+        return "vbri", int.from_bytes(data[offset + 50:offset + 54], "big")
+    return None
+
+
+def iter_frames(data: Union[bytes, memoryview]) -> Iterator[Tuple[FrameHeader, bytes]]:
+    """
+    Yield the audio frames of an MP3 file's contents.
+
+    ID3 tags and Xing/Info metadata frames are skipped. Frames of a
+    memoryview are yielded as views into it, without copying.
+
+    Raises:
+        ValueError: If the data contains no MP3 frames
+    """
+    offset = _id3v2_length(data)
+    end = len(data) - _id3v1_length(data)
+    found = False
+
+    while offset < end:
+        header = parse_header(data, offset)
+        if header is None or offset + header.length > end:
+            # Resynchronize on the next frame sync
+            next_sync = _next_sync(data, offset + 1, end)
+            if next_sync < 0:
+                break
+            offset = next_sync
+            continue
+
+        # Only the first frame can be a metadata frame
+        if found or not _is_info_frame(data, offset, header):
+            yield header, data[offset:offset + header.length]
+        found = True
+        offset += header.length
+
+    if not found:
+        raise ValueError("No MP3 frames found")
+
+
+def silence_frame(header: FrameHeader) -> bytes:
+    """
+    Build a frame that decodes to silence in the given stream format.
+
+    All-zero side information means no main data and no spectral values,
+    which every decoder renders as silence. The frame keeps the bitrate of
+    the given header so constant-bitrate streams stay constant-bitrate.
+    """
+    b1 = header.raw[1] | 0x01  # no CRC
+    b2 = header.raw[2] & 0xFC  # no padding
+    frame_header = parse_header(bytes([0xFF, b1, b2, header.raw[3]]), 0)
+    return frame_header.raw + bytes(frame_header.length - 4)
+
+
+def _frame_data_bits(header: FrameHeader, frame: bytes) -> Tuple[int, int]:
+    """
+    Read a frame's bit reservoir offset and amount of spectral data.
+
+    Returns:
+        Tuple of main_data_begin (bytes of earlier frames the frame's data
+        starts in) and the total part2_3_length over its granules and channels
+    """
+    start = 6 if header.has_crc else 4
+    size = header.side_info_length * 8
+    bits = int.from_bytes(frame[start:start + header.side_info_length], "big")
+
+    def read(position: int, width: int) -> int:
+        return (bits >> (size - position - width)) & ((1 << width) - 1)
+
+    mono = header.channel_mode == 0b11
+    channels = 1 if mono else 2
+    if header.is_mpeg1:
+        main_data_begin = read(0, 9)
+        position = 9 + (5 if mono else 3) + 4 * channels
+        granules, granule_bits = 2, 59
+    else:
+        main_data_begin = read(0, 8)
+        position = 8 + (1 if mono else 2)
+        granules, granule_bits = 1, 63
+
+    data_bits = 0
+    for _ in range(granules * channels):
+        data_bits += read(position, 12)
+        position += granule_bits
+    return main_data_begin, data_bits
+
+
+def trim_silent_frames(frames: List[Tuple[FrameHeader, bytes]]) -> List[Tuple[FrameHeader, bytes]]:
+    """
+    Drop the silent frames at the start and end of a segment.
+
+    A frame's amount of Huffman-coded spectral data serves as its energy:
+    silence codes to almost nothing. Leading frames whose bytes the first
+    kept frame still reads through the bit reservoir are kept.
+
+    Args:
+        frames: A segment's frames from iter_frames
+
+    Returns:
+        The frames from the first to the last audible one
+    """
+    if not frames:
+        return frames
+
+    reservoir = np.empty(len(frames), dtype=np.int64)
+    data_bits = np.empty(len(frames), dtype=np.int64)
+    for i, (header, frame) in enumerate(frames):
+        reservoir[i], data_bits[i] = _frame_data_bits(header, frame)
+
+    coded = data_bits[data_bits > 0]
+    if not coded.size:
+        return frames
+    audible = np.flatnonzero(data_bits > SILENT_FRAME_RATIO * np.median(coded))
+    if not audible.size:
+        return frames
+
+    first = int(audible[0])
+    last = min(int(audible[-1]) + TRIM_MARGIN_FRAMES, len(frames) - 1)
+
+    # Keep earlier frames until they hold the reservoir bytes the first audible frame needs
+    needed = int(reservoir[first])
+    while needed > 0 and first > 0:
+        first -= 1
+        header, frame = frames[first]
+        needed -= len(frame) - (6 if header.has_crc else 4) - header.side_info_length
+
+    first = max(min(first, int(audible[0]) - TRIM_MARGIN_FRAMES), 0)
+    return frames[first:last + 1]
+
+
+def _first_frame(data: bytes) -> Tuple[int, FrameHeader]:
+    """Return the offset and header of the first frame, including metadata frames."""
+    offset = _id3v2_length(data)
+    while offset < len(data):
+        header = parse_header(data, offset)
+        if header is not None:
+            return offset, header
+        offset = data.find(b"\xff", offset + 1)
+        if offset < 0:
+            break
+    raise ValueError("No MP3 frames found")
+
+
+def mp3_info(path: str) -> Dict[str, Any]:
+    """
+    Return an MP3 file's duration, average bitrate and frame count.
+
+    The frame count comes from a Xing/Info or VBRI tag when the file has
+    one; otherwise every frame header is scanned. No audio is decoded.
+
+    Raises:
+        ValueError: If the file contains no MP3 frames
+    """
+    data = Path(path).read_bytes()
+    offset, header = _first_frame(data)
+
+    tagged = _tagged_frame_count(data, offset, header)
+    if tagged:
+        source, frames = tagged
+        audio_bytes = len(data) - _id3v1_length(data) - offset - header.length
+        samples = frames * header.samples
+    else:
+        source = "frames"
+        frames = samples = audio_bytes = 0
+        for frame_header, frame in iter_frames(data):
+            frames += 1
+            samples += frame_header.samples
+            audio_bytes += len(frame)
+
+    duration = samples / header.sample_rate
+    return {
+        "duration_seconds": round(duration, 3),
+        "bitrate_kbps": round(audio_bytes * 8 / duration / 1000) if duration else 0,
+        "frames": frames,
+        "sample_rate": header.sample_rate,
+        "source": source
+    }
+
+
+class MP3FrameWriter:
+    """
+    Appends MP3 files to an output by copying their frames.
+
+    The output is flushed after every file and is a playable MP3 at each
+    point, so it can be played while it is still being written. With
+    trim_silence, silence at the edges of each file is dropped so the pauses
+    between files are exactly pause_ms long.
+    """
+
+    def __init__(self, output_path: str, pause_ms: int = 0, trim_silence: bool = False):
+        """Create or truncate the output file."""
+        self.output_path = output_path
+        self.pause_ms = pause_ms
+        self.trim_silence = trim_silence
+        self.trimmed_frames = 0
+        self.stream_format: Optional[Tuple[int, int, bool]] = None
+        self.sample_rate = 0
+        self.frames = 0
+        self.samples = 0
+        self.segment_durations: List[float] = []
+        self._silence = b""
+        self._samples_per_frame = 0
+
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        self._out = open(output_path, 'wb')
+
+    def append(self, source: Union[str, bytes, memoryview], pause_ms: Optional[int] = None) -> float:
+        """
+        Append a file's frames, after a pause if it is not the first.
+
+        Args:
+            source: MP3 file to append, or its contents
+            pause_ms: Pause before this file, overriding the writer's default
+
+        Returns:
+            Duration of the appended file in seconds
+
+        Raises:
+            ValueError: If the file has no frames or its format differs;
+                nothing is written in that case
+        """
+        name = source if isinstance(source, str) else "segment"
+        frames = list(iter_frames(Path(source).read_bytes() if isinstance(source, str) else source))
+        if self.trim_silence:
+            trimmed = trim_silent_frames(frames)
+            self.trimmed_frames += len(frames) - len(trimmed)
+            frames = trimmed
+
+        for header, _ in frames:
+            if self.stream_format is None:
+                self.stream_format = header.stream_format
+                self.sample_rate = header.sample_rate
+                self._samples_per_frame = header.samples
+                self._silence = silence_frame(header)
+            elif header.stream_format != self.stream_format:
+                raise ValueError(f"{name} has a different MP3 format than the first segment")
+
+        pause_ms = self.pause_ms if pause_ms is None else pause_ms
+        silence_count = round(pause_ms * self.sample_rate / 1000 / self._samples_per_frame)
+        if self.segment_durations and silence_count:
+            self._out.write(self._silence * silence_count)
+            self.frames += silence_count
+            self.samples += silence_count * self._samples_per_frame
+
+        segment_samples = 0
+        for header, frame in frames:
+            self._out.write(frame)
+            segment_samples += header.samples
+        self._out.flush()
+
+        self.frames += len(frames)
+        self.samples += segment_samples
+        duration = round(segment_samples / self.sample_rate, 3)
+        self.segment_durations.append(duration)
+        return duration
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Close the output.
+
+        Returns:
+            Dictionary with the frame count and duration of the output and the
+            duration of each appended file
+        """
+        self._out.close()
+        return {
+            "method": "frames",
+            "frames": self.frames,
+            "duration_seconds": round(self.samples / self.sample_rate, 3) if self.sample_rate else 0.0,
+            "segment_durations": self.segment_durations,
+            "trimmed_seconds": round(
+                self.trimmed_frames * self._samples_per_frame / self.sample_rate, 3
+            ) if self.sample_rate else 0.0
+        }
+
+
+def concatenate_mp3(
+    sources: List[Union[str, bytes, memoryview]],
+    output_path: str,
+    pause_ms: int = 0,
+    trim_silence: bool = False
+) -> Dict[str, Any]:
+    """
+    Join MP3 files by copying their frames, with silent pauses in between.
+
+    Every input must share the MPEG version, sample rate and channel count;
+    bitrates may differ. Files are read one at a time, so memory stays at
+    about one segment and time is linear in the total size.
+
+    Args:
+        sources: MP3 files or their contents, in playback order
+        output_path: Where to write the joined MP3
+        pause_ms: Silence inserted between consecutive files
+        trim_silence: Drop silence at the edges of each file first
+
+    Returns:
+        Dictionary with the frame count and duration of the output and the
+        duration of each input
+
+    Raises:
+        ValueError: If an input has no frames or its format differs
+    """
+    writer = MP3FrameWriter(output_path, pause_ms, trim_silence)
+    try:
+        for source in sources:
+            writer.append(source)
+    finally:
+        info = writer.close()
+    return info
+
+
+def audio_result_fields(path: str) -> Dict[str, Any]:
+    """Return the duration fields generators add to their results, or none for non-MP3 audio."""
+    try:
+        info = mp3_info(path)
+    except ValueError:
+        return {}
+    return {
+        "duration_seconds": info["duration_seconds"],
+        "duration_minutes": round(info["duration_seconds"] / 60, 1),
+        "bitrate_kbps": info["bitrate_kbps"],
+        "frames": info["frames"]
+    }
@@ -0,0 +1,193 @@
+"""Assembly of raw PCM dialogue segments in a single preallocated buffer."""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+from pydub import AudioSegment
+
+# ElevenLabs PCM output is signed 16-bit little-endian mono
+PCM_DTYPE = np.dtype("<i2")
+PCM_FORMAT_PREFIX = "pcm_"
+
+# Length of the fade applied at each segment edge
+DEFAULT_CROSSFADE_MS = 10
+
+# Speech level every segment is normalized to (RMS, dB relative to full scale)
+DEFAULT_TARGET_DBFS = -20.0
+
+# Quiet segments are not boosted by more than this, to avoid raising noise
+MAX_GAIN_DB = 12.0
+
+# Peak level the finished mix is scaled under to avoid clipping
+PEAK_CEILING = 0.98
+
+# Windows quieter than this (RMS, dB relative to full scale) count as silence
+SILENCE_THRESHOLD_DBFS = -50.0
+
+# Window length of the silence detector
+SILENCE_WINDOW_MS = 10
+
+# Audio kept beyond the first and last audible window so onsets stay soft
+TRIM_MARGIN_MS = 20
+
+
+def pcm_sample_rate(output_format: str) -> Optional[int]:
+    """Return the sample rate of an ElevenLabs PCM format such as "pcm_44100", or None."""
+    if not output_format.startswith(PCM_FORMAT_PREFIX):
+        return None
+    return int(output_format[len(PCM_FORMAT_PREFIX):])
+
+
+# A raw PCM file, or raw PCM audio in memory
+PCMSource = Union[str, bytes, memoryview]
+
+
+def pcm_samples(source: PCMSource) -> np.ndarray:
+    """Return the 16-bit samples of PCM audio without copying: files are memory-mapped."""
+    if isinstance(source, str):
+        if not os.path.getsize(source):
+            return np.zeros(0, PCM_DTYPE)
+        return np.memmap(source, dtype=PCM_DTYPE, mode="r")
+    return np.frombuffer(source, dtype=PCM_DTYPE, count=len(source) // PCM_DTYPE.itemsize)
+
+
+def read_pcm(source: PCMSource) -> np.ndarray:
+    """Read raw PCM audio as float32 samples in [-1, 1)."""
+    return pcm_samples(source).astype(np.float32) / 32768
+
+
+def speech_bounds(source: PCMSource, sample_rate: int) -> Tuple[int, int]:
+    """
+    Find where speech starts and ends in PCM audio.
+
+    The samples are read in place and split into short windows whose RMS
+    level is compared against SILENCE_THRESHOLD_DBFS in one vectorized pass.
+
+    Returns:
+        Start and end sample indices; the whole file if it is all silence
+    """
+    samples = pcm_samples(source)
+    window = max(1, sample_rate * SILENCE_WINDOW_MS // 1000)
+    windows = samples.size // window
+    if not windows:
+        return 0, samples.size
+
+    frames = samples[:windows * window].reshape(windows, window).astype(np.float32) / 32768
+    rms = np.sqrt(np.mean(np.square(frames), axis=1))
+    audible = np.flatnonzero(rms > 10 ** (SILENCE_THRESHOLD_DBFS / 20))
+    if not audible.size:
+        return 0, samples.size
+
+    margin = sample_rate * TRIM_MARGIN_MS // 1000
+    start = max(int(audible[0]) * window - margin, 0)
+    end = min((int(audible[-1]) + 1) * window + margin, samples.size)
+    return start, end
+
+
+def _normalize(samples: np.ndarray, target_dbfs: float) -> None:
+    """Scale samples in place so their RMS level matches target_dbfs."""
+    rms = float(np.sqrt(np.mean(np.square(samples)))) if samples.size else 0.0
+    if rms == 0.0:
+        return
+    gain_db = min(target_dbfs - 20 * np.log10(rms), MAX_GAIN_DB)
+    samples *= np.float32(10 ** (gain_db / 20))
+
+
+def mix_segments(
+    sources: List[PCMSource],
+    sample_rate: int,
+    pause_ms: int = 0,
+    crossfade_ms: int = DEFAULT_CROSSFADE_MS,
+    target_dbfs: Optional[float] = DEFAULT_TARGET_DBFS,
+    trim_silence: bool = False
+) -> np.ndarray:
+    """
+    Mix PCM segments into one buffer, in order.
+
+    The buffer is sized up front from the segment sizes and each segment is
+    written at its offset, so nothing is copied as the mix grows. Segment
+    edges are faded over crossfade_ms; without a pause, consecutive
+    segments overlap by that much so the fades form a crossfade.
+
+    Args:
+        sources: Raw PCM files or audio in playback order
+        sample_rate: Sample rate of every segment
+        pause_ms: Silence between consecutive segments
+        crossfade_ms: Fade length at segment edges
+        target_dbfs: Level to normalize each segment to, or None to keep levels
+        trim_silence: Drop silence at the edges of each segment, so the pauses
+            between segments are exactly pause_ms long
+
+    Returns:
+        Mixed float32 samples
+    """
+    if trim_silence:
+        bounds = [speech_bounds(source, sample_rate) for source in sources]
+    else:
+        bounds = [(0, pcm_samples(source).size) for source in sources]
+    lengths = [end - start for start, end in bounds]
+    pause = int(sample_rate * pause_ms / 1000)
+    fade = int(sample_rate * crossfade_ms / 1000)
+    overlap = 0 if pause else fade
+
+    starts = []
+    position = 0
+    for length in lengths:
+        starts.append(position)
+        position += max(length + pause - overlap, 0)
+    total = max((start + length for start, length in zip(starts, lengths)), default=0)
+
+    mix = np.zeros(total, dtype=np.float32)
+    ramp = np.linspace(0.0, 1.0, fade, endpoint=False, dtype=np.float32)
+
+    for start, source, (first, last) in zip(starts, sources, bounds):
+        samples = pcm_samples(source)[first:last].astype(np.float32) / 32768
+        if target_dbfs is not None:
+            _normalize(samples, target_dbfs)
+
+        edge = min(fade, samples.size // 2)
+        if edge:
+            samples[:edge] *= ramp[:edge]
+            samples[-edge:] *= ramp[:edge][::-1]
+
+        mix[start:start + samples.size] += samples
+
+    peak = max(float(mix.max()), -float(mix.min())) if mix.size else 0.0
+    if peak > PEAK_CEILING:
+        mix *= np.float32(PEAK_CEILING / peak)
+
+    return mix
+
+
+def encode_pcm(samples: np.ndarray, sample_rate: int, output_path: str, bitrate: str = "128k") -> None:
+    """Encode float32 mono samples to an MP3 file in one pass."""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(PCM_DTYPE)
+    audio = AudioSegment(data=pcm.tobytes(), sample_width=PCM_DTYPE.itemsize, frame_rate=sample_rate, channels=1)
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    audio.export(output_path, format="mp3", bitrate=bitrate)
+
+
+def assemble_pcm(
+    sources: List[PCMSource],
+    output_path: str,
+    sample_rate: int,
+    pause_ms: int = 0,
+    crossfade_ms: int = DEFAULT_CROSSFADE_MS,
+    target_dbfs: Optional[float] = DEFAULT_TARGET_DBFS,
+    trim_silence: bool = False
+) -> Dict[str, Any]:
+    """
+    Mix PCM segments and encode the result to MP3 once.
+
+    Returns:
+        Dictionary with the method used and the output duration
+    """
+    mix = mix_segments(sources, sample_rate, pause_ms, crossfade_ms, target_dbfs, trim_silence)
+    encode_pcm(mix, sample_rate, output_path)
+    return {
+        "method": "pcm",
+        "duration_seconds": round(mix.size / sample_rate, 3)
+    }
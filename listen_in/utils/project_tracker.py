@@ -0,0 +1,237 @@
+"""Background tracking of ElevenLabs Projects renders until their audio is downloaded."""
+
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from aiohttp import web
+
+from .elevenlabs_client import ELEVENLABS_BASE_URL, get_session
+from .mp3_concat import audio_result_fields
+
+logger = logging.getLogger(__name__)
+
+# Polling starts fast and backs off, since short projects finish in seconds
+POLL_INITIAL_SECONDS = 2.0
+POLL_MAX_SECONDS = 30.0
+POLL_BACKOFF = 1.5
+
+# Give up on a project after this long
+POLL_TIMEOUT_SECONDS = 3600
+
+# Consecutive failed status checks before a project is marked failed
+MAX_POLL_ERRORS = 5
+
+# Path the local receiver accepts callback_url notifications on
+WEBHOOK_PATH = "/elevenlabs/projects"
+
+
+class ProjectTracker:
+    """
+    Follows submitted projects from background tasks.
+
+    Each project is polled with jittered exponential backoff. A callback
+    notification for a project wakes its poller immediately, so webhook
+    users get their audio as soon as it is ready. Finished audio is
+    downloaded to the project's output path.
+    """
+
+    def __init__(self, api_key: str, base_url: str = ELEVENLABS_BASE_URL):
+        """Initialize with the API key the projects were submitted with."""
+        self.api_key = api_key
+        self.base_url = base_url
+        self.projects: Dict[str, Dict[str, Any]] = {}
+        self._wake: Dict[str, asyncio.Event] = {}
+        self._done: Dict[str, asyncio.Event] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def track(self, project_id: str, output_path: str, **details: Any) -> Dict[str, Any]:
+        """
+        Start following a project in the background.
+
+        Args:
+            project_id: ElevenLabs project ID
+            output_path: Where to download the finished audio
+            **details: Extra fields reported with the project's status
+
+        Returns:
+            The project's status handle
+        """
+        self.projects[project_id] = {
+            "project_id": project_id,
+            "status": "processing",
+            "audio_path": output_path,
+            **details,
+            "polls": 0,
+            "submitted_at": datetime.now().isoformat()
+        }
+        self._wake[project_id] = asyncio.Event()
+        self._done[project_id] = asyncio.Event()
+        self._tasks[project_id] = asyncio.create_task(self._follow(project_id))
+        return self.status(project_id)
+
+    def status(self, project_id: str) -> Dict[str, Any]:
+        """Return a copy of a tracked project's status, or raise KeyError."""
+        return dict(self.projects[project_id])
+
+    def notify(self, project_id: str) -> bool:
+        """Check a project right away, e.g. after a callback; return whether it is tracked."""
+        wake = self._wake.get(project_id)
+        if wake is None:
+            return False
+        wake.set()
+        return True
+
+    async def wait(self, project_id: str) -> Dict[str, Any]:
+        """Wait until a project has finished, failed or timed out and return its status."""
+        await self._done[project_id].wait()
+        return self.status(project_id)
+
+    async def _fetch(self, project_id: str) -> Dict[str, Any]:
+        """Fetch a project's current state from the API."""
+        async with get_session().get(
+            f"{self.base_url}/projects/{project_id}",
+            headers={"xi-api-key": self.api_key}
+        ) as response:
+            if response.status != 200:
+                raise RuntimeError(f"Failed to check project status: {response.status}")
+            return await response.json()
+
+    async def _download(self, audio_url: str, output_path: str) -> None:
+        """Download finished audio to output_path."""
+        # The API key only goes to the API itself, not to storage or CDN hosts
+        headers = {}
+        if urlsplit(audio_url).netloc == urlsplit(self.base_url).netloc:
+            headers["xi-api-key"] = self.api_key
+        async with get_session().get(audio_url, headers=headers) as response:
+            if response.status != 200:
+                raise RuntimeError(f"Failed to download audio: {response.status}")
+
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(output_path, 'wb') as f:
+                async for chunk in response.content.iter_chunked(8192):
+                    f.write(chunk)
+
+    async def _follow(self, project_id: str) -> None:
+        """Poll a project until it ends, then download its audio."""
+        project = self.projects[project_id]
+        wake = self._wake[project_id]
+        deadline = time.monotonic() + POLL_TIMEOUT_SECONDS
+        delay = POLL_INITIAL_SECONDS
+        errors = 0
+
+        try:
+            while time.monotonic() < deadline:
+                # Jitter keeps many tracked projects from polling in lockstep
+                try:
+                    await asyncio.wait_for(wake.wait(), delay * random.uniform(0.75, 1.25))
+                    project["notified_at"] = datetime.now().isoformat()
+                except asyncio.TimeoutError:
+                    pass
+                wake.clear()
+                delay = min(delay * POLL_BACKOFF, POLL_MAX_SECONDS)
+
+                project["polls"] += 1
+                try:
+                    state = await self._fetch(project_id)
+                except Exception as e:
+                    errors += 1
+                    logger.warning(f"Project {project_id}: status check failed ({e})")
+                    if errors >= MAX_POLL_ERRORS:
+                        raise
+                    continue
+                errors = 0
+
+                status = state.get("status")
+                if status == "completed":
+                    if not state.get("audio_url"):
+                        raise RuntimeError("Project completed without an audio URL")
+                    await self._download(state["audio_url"], project["audio_path"])
+                    # Untagged MP3s are scanned frame by frame, so keep that off the event loop
+                    project.update(await asyncio.to_thread(audio_result_fields, project["audio_path"]))
+                    project["status"] = "completed"
+                    project["completed_at"] = datetime.now().isoformat()
+                    logger.info(f"Project {project_id}: audio saved to {project['audio_path']}")
+                    return
+                if status == "failed":
+                    project["status"] = "failed"
+                    project["error"] = "Audio generation failed"
+                    return
+
+            project["status"] = "timed_out"
+            project["error"] = f"Audio generation did not finish within {POLL_TIMEOUT_SECONDS}s"
+
+        except Exception as e:
+            project["status"] = "failed"
+            project["error"] = str(e)
+        finally:
+            self._done[project_id].set()
+            self._wake.pop(project_id, None)
+            self._tasks.pop(project_id, None)
+
+
+_trackers: Dict[str, ProjectTracker] = {}
+_receiver: Optional[web.AppRunner] = None
+
+
+def get_project_tracker(api_key: str, base_url: str = ELEVENLABS_BASE_URL) -> ProjectTracker:
+    """Return the shared tracker for an API key and endpoint, creating it on first use."""
+    digest = hashlib.sha256(f"{base_url}\0{api_key}".encode("utf-8")).hexdigest()[:8]
+    if digest not in _trackers:
+        _trackers[digest] = ProjectTracker(api_key, base_url)
+    return _trackers[digest]
+
+
+def find_project(project_id: str) -> Optional[Dict[str, Any]]:
+    """Return the status of a project tracked under any API key, or None."""
+    for tracker in _trackers.values():
+        if project_id in tracker.projects:
+            return tracker.status(project_id)
+    return None
+
+
+async def _handle_callback(request: web.Request) -> web.Response:
+    """Wake the poller of the project a callback notification is about."""
+    try:
+        payload = await request.json()
+    except ValueError:
+        return web.json_response({"error": "expected a JSON body"}, status=400)
+    if not isinstance(payload, dict):
+        return web.json_response({"error": "expected a JSON object"}, status=400)
+
+    data = payload.get("data") if isinstance(payload.get("data"), dict) else payload
+    project_id = data.get("project_id")
+    if not project_id or not any(tracker.notify(project_id) for tracker in _trackers.values()):
+        return web.json_response({"error": "unknown project"}, status=404)
+    return web.json_response({"status": "accepted"})
+
+
+async def start_webhook_receiver(host: str, port: int) -> str:
+    """
+    Start the local HTTP receiver for callback_url notifications, once.
+
+    Args:
+        host: Interface to listen on
+        port: Port to listen on
+
+    Returns:
+        Local URL notifications should be forwarded to
+    """
+    global _receiver
+
+    if _receiver is None:
+        app = web.Application()
+        app.router.add_post(WEBHOOK_PATH, _handle_callback)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        _receiver = runner
+        logger.info(f"Listening for project callbacks on http://{host}:{port}{WEBHOOK_PATH}")
+
+    return f"http://{host}:{port}{WEBHOOK_PATH}"
@@ -0,0 +1,204 @@
+"""Adaptive client-side rate limiting for fan-out calls to rate-limited APIs."""
+
+import asyncio
+import hashlib
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# Response headers ElevenLabs uses to report the account's concurrency
+MAX_CONCURRENCY_HEADER = "maximum-concurrent-requests"
+CURRENT_CONCURRENCY_HEADER = "current-concurrent-requests"
+
+# Throughput is cut to this share after a 429 ...
+DECREASE_FACTOR = 0.5
+
+# ... and recovers by this share of the configured maximum per success
+INCREASE_STEP = 0.05
+
+# Never throttle below this share of the configured maximum
+MIN_SCALE = 0.1
+
+# Pause after a 429 that carries no Retry-After
+DEFAULT_PAUSE_SECONDS = 1.0
+
+
+class TokenBucket:
+    """Token bucket allowing bursts of `burst` requests at `rate` per second."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last update."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AdaptiveLimiter:
+    """
+    Request-rate and concurrency limiter that backs off on 429 responses.
+
+    Throughput follows additive-increase/multiplicative-decrease: each 429
+    halves the allowed concurrency and request rate and pauses new requests
+    for the Retry-After delay, and each success restores a little of it. A
+    concurrency maximum reported in response headers caps the configured one.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        requests_per_second: Optional[float] = None
+    ):
+        """Initialize the limiter at full configured throughput."""
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_rate = requests_per_second
+        self.scale = 1.0
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.bucket = TokenBucket(requests_per_second) if requests_per_second else None
+        self.stats = {"requests": 0, "rate_limited": 0, "wait_seconds": 0.0}
+        self._condition = asyncio.Condition()
+
+    @property
+    def concurrency(self) -> int:
+        """Number of requests currently allowed in flight."""
+        return max(1, int(self.max_concurrency * self.scale))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one request slot for the duration of a call."""
+        started_at = time.monotonic()
+        async with self._condition:
+            while True:
+                pause = self.paused_until - time.monotonic()
+                if pause > 0:
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), pause)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self.in_flight < self.concurrency:
+                    break
+                await self._condition.wait()
+            self.in_flight += 1
+
+        try:
+            if self.bucket:
+                await self.bucket.acquire()
+            self.stats["requests"] += 1
+            self.stats["wait_seconds"] += time.monotonic() - started_at
+            yield
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def _apply_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Lower the concurrency maximum to what the server reports."""
+        if not headers:
+            return
+        try:
+            reported = int(headers.get(MAX_CONCURRENCY_HEADER, 0))
+        except (TypeError, ValueError):
+            return
+        if 0 < reported < self.max_concurrency:
+            logger.info(f"{self.name}: server allows {reported} concurrent requests")
+            self.max_concurrency = reported
+
+    def _set_scale(self, scale: float) -> None:
+        """Change throughput and apply it to the token bucket."""
+        self.scale = min(1.0, max(MIN_SCALE, scale))
+        if self.bucket:
+            self.bucket.rate = self.max_rate * self.scale
+
+    def record_success(self, headers: Optional[Mapping[str, str]] = None) -> None:
+        """Recover throughput after a successful request."""
+        self._apply_headers(headers)
+        if self.scale < 1.0:
+            self._set_scale(self.scale + INCREASE_STEP)
+
+    def record_rate_limited(
+        self,
+        headers: Optional[Mapping[str, str]] = None,
+        retry_after: Optional[float] = None
+    ) -> None:
+        """Back off after a 429 response."""
+        self._apply_headers(headers)
+        self.stats["rate_limited"] += 1
+
+        # 429s from requests already in flight during a pause count as one
+        if time.monotonic() >= self.paused_until:
+            self._set_scale(self.scale * DECREASE_FACTOR)
+
+        pause = retry_after if retry_after is not None else DEFAULT_PAUSE_SECONDS
+        self.paused_until = max(self.paused_until, time.monotonic() + pause)
+        logger.warning(
+            f"{self.name}: rate limited; pausing {pause:.1f}s, "
+            f"concurrency now {self.concurrency}"
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the limiter's current limits and counters."""
+        return {
+            **self.stats,
+            "wait_seconds": round(self.stats["wait_seconds"], 2),
+            "concurrency": self.concurrency,
+            "max_concurrency": self.max_concurrency,
+            "requests_per_second": round(self.bucket.rate, 2) if self.bucket else None,
+            "in_flight": self.in_flight
+        }
+
+
+_limiters: Dict[str, AdaptiveLimiter] = {}
+
+
+def get_limiter(
+    name: str,
+    key: str,
+    max_concurrency: int,
+    requests_per_second: Optional[float] = None
+) -> AdaptiveLimiter:
+    """
+    Return the shared limiter for an account or voice, creating it on first use.
+
+    Args:
+        name: Readable limiter name used in logs and stats, e.g. "elevenlabs"
+        key: Secret or identifier the limit applies to (hashed, never stored)
+        max_concurrency: Configured maximum of concurrent requests
+        requests_per_second: Configured maximum request rate, or None for no cap
+
+    Returns:
+        AdaptiveLimiter shared by every caller with the same name and key
+    """
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:8]
+    limiter_id = f"{name}:{digest}"
+    if limiter_id not in _limiters:
+        _limiters[limiter_id] = AdaptiveLimiter(limiter_id, max_concurrency, requests_per_second)
+    return _limiters[limiter_id]
+
+
+def get_rate_limit_stats() -> Dict[str, Any]:
+    """Return the limits and counters of every limiter used so far."""
+    return {limiter_id: limiter.snapshot() for limiter_id, limiter in _limiters.items()}
@@ -0,0 +1,208 @@
+"""Durable store of audio render jobs, so interrupted renders can resume."""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Name of the SQLite database inside the store directory
+DATABASE_NAME = "jobs.sqlite3"
+
+# Name of the file holding a job's segment audio inside its directory
+SPOOL_NAME = "segments.spool"
+
+# Bumped when the tables change; older tables only hold resumable progress and are dropped
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    output_path TEXT NOT NULL,
+    params TEXT NOT NULL,
+    plan TEXT NOT NULL,
+    state TEXT NOT NULL,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    job_id TEXT NOT NULL REFERENCES jobs(job_id) ON DELETE CASCADE,
+    segment_index INTEGER NOT NULL,
+    spool_offset INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    completed_at TEXT NOT NULL,
+    PRIMARY KEY (job_id, segment_index)
+);
+"""
+
+
+def render_job_id(output_path: str, params: Dict[str, Any]) -> str:
+    """
+    Identify a render by its output and everything that determines its audio.
+
+    Rendering the same script with the same settings to the same path again
+    yields the same ID, which is what lets an interrupted render resume.
+    """
+    payload = json.dumps({"output_path": str(output_path), **params}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class RenderJobStore:
+    """
+    SQLite-backed record of render jobs and their finished segments.
+
+    Each job keeps its segment plan, its state ("running", "failed" or
+    "completed") and the location of every segment rendered so far in the
+    job's spool file (see SegmentStore). Segments only count once recorded,
+    so audio cut short by a crash is rendered again.
+    """
+
+    def __init__(self, root: Path):
+        """Initialize the store; the directory and database are created on first use."""
+        self.root = Path(root)
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database, creating its tables if needed."""
+        if self._db is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.root / DATABASE_NAME, isolation_level=None)
+            self._db.row_factory = sqlite3.Row
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA foreign_keys=ON")
+            if self._db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                self._db.executescript("DROP TABLE IF EXISTS segments; DROP TABLE IF EXISTS jobs;")
+                self._db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self._db.executescript(_SCHEMA)
+        return self._db
+
+    def job_dir(self, job_id: str) -> Path:
+        """Return the directory holding a job's spool."""
+        return self.root / job_id
+
+    def spool_path(self, job_id: str) -> str:
+        """Return the file a job's segment audio is appended to."""
+        self.job_dir(job_id).mkdir(parents=True, exist_ok=True)
+        return str(self.job_dir(job_id) / SPOOL_NAME)
+
+    def open_job(
+        self,
+        job_id: str,
+        output_path: str,
+        params: Dict[str, Any],
+        plan: List[Dict[str, Any]]
+    ) -> Dict[int, Tuple[int, int]]:
+        """
+        Start a job, or pick up an unfinished one with the same ID.
+
+        Args:
+            job_id: ID from render_job_id
+            output_path: Final audio file of the job
+            params: Everything needed to run the job again
+            plan: Segments in playback order
+
+        Returns:
+            Spool offset and size of segments already rendered intact, by
+            segment index
+        """
+        db = self._connect()
+        now = datetime.now().isoformat()
+        row = db.execute("SELECT state FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+        if row is None or row["state"] == "completed":
+            # Finished jobs no longer have their segments, so start over
+            db.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+            db.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?, 'running', NULL, ?, ?)",
+                (job_id, str(output_path), json.dumps(params), json.dumps(plan), now, now)
+            )
+            return {}
+
+        db.execute("UPDATE jobs SET state = 'running', error = NULL, updated_at = ? WHERE job_id = ?", (now, job_id))
+
+        spool = self.spool_path(job_id)
+        spool_size = os.path.getsize(spool) if os.path.exists(spool) else 0
+        completed = {}
+        for segment in db.execute(
+            "SELECT segment_index, spool_offset, size FROM segments WHERE job_id = ?", (job_id,)
+        ).fetchall():
+            if segment["spool_offset"] + segment["size"] <= spool_size:
+                completed[segment["segment_index"]] = (segment["spool_offset"], segment["size"])
+            else:
+                db.execute(
+                    "DELETE FROM segments WHERE job_id = ? AND segment_index = ?",
+                    (job_id, segment["segment_index"])
+                )
+
+        logger.info(f"Resuming render job {job_id}: {len(completed)}/{len(plan)} segments already rendered")
+        return completed
+
+    def complete_segment(self, job_id: str, index: int, offset: int, size: int) -> None:
+        """Record that a segment's audio is fully written to the job's spool."""
+        self._connect().execute(
+            "INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?)",
+            (job_id, index, offset, size, datetime.now().isoformat())
+        )
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Mark a job failed, keeping its spool for the next attempt."""
+        self._connect().execute(
+            "UPDATE jobs SET state = 'failed', error = ?, updated_at = ? WHERE job_id = ?",
+            (error, datetime.now().isoformat(), job_id)
+        )
+
+    def finish(self, job_id: str) -> None:
+        """Mark a job completed and delete its spool."""
+        db = self._connect()
+        db.execute("DELETE FROM segments WHERE job_id = ?", (job_id,))
+        db.execute(
+            "UPDATE jobs SET state = 'completed', updated_at = ? WHERE job_id = ?",
+            (datetime.now().isoformat(), job_id)
+        )
+        shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job's record with its parameters and progress, or None."""
+        db = self._connect()
+        row = db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["plan"] = json.loads(job["plan"])
+        job["completed_segments"] = db.execute(
+            "SELECT COUNT(*) FROM segments WHERE job_id = ?", (job_id,)
+        ).fetchone()[0]
+        return job
+
+    def unfinished_jobs(self) -> List[Dict[str, Any]]:
+        """Return jobs that were interrupted or failed, oldest first."""
+        rows = self._connect().execute(
+            "SELECT job_id FROM jobs WHERE state != 'completed' ORDER BY created_at"
+        ).fetchall()
+        return [self.get_job(row["job_id"]) for row in rows]
+
+    def close(self) -> None:
+        """Close the database connection; the next call opens it again."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+_stores: Dict[str, RenderJobStore] = {}
+
+
+def get_render_job_store(root: Path) -> RenderJobStore:
+    """Return the shared store for a directory, creating it on first use."""
+    key = str(Path(root).resolve())
+    if key not in _stores:
+        _stores[key] = RenderJobStore(root)
+    return _stores[key]
@@ -0,0 +1,286 @@
+"""Retries, backoff and circuit breaking for calls to external APIs."""
+
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from agents import set_default_openai_client
+from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Error classes returned by classify_error
+RATE_LIMITED = "rate_limited"
+TRANSIENT = "transient"
+FATAL = "fatal"
+
+# HTTP statuses worth retrying besides 429 and 5xx
+_RETRYABLE_STATUSES = {408, 409}
+
+# Never wait longer than this for a single Retry-After
+MAX_RETRY_AFTER_SECONDS = 60.0
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a backend's circuit breaker is open."""
+
+
+class RetryPolicy:
+    """How often and how long to retry a failing call."""
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0
+    ):
+        """Initialize the retry policy."""
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Compute the delay before the next attempt.
+
+        Uses full-jitter exponential backoff, or the server's Retry-After
+        (plus a little jitter so concurrent callers do not retry in lockstep).
+
+        Args:
+            attempt: Number of attempts made so far (1 after the first failure)
+            retry_after: Delay requested by the server, if any
+
+        Returns:
+            Delay in seconds
+        """
+        if retry_after is not None:
+            return min(retry_after, MAX_RETRY_AFTER_SECONDS) * random.uniform(1.0, 1.1)
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """Stops calling a backend after repeated failures, then probes it again."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """Initialize the breaker in the closed state."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half_open."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self, backend: str) -> None:
+        """Raise CircuitOpenError if calls to the backend are currently blocked."""
+        if self.state == "open":
+            remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError(
+                f"Circuit open for {backend} after {self.consecutive_failures} failures; "
+                f"retry in {remaining:.0f}s"
+            )
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        """Count a failure and open (or re-open) the breaker at the threshold."""
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold or self.state == "half_open":
+            self.opened_at = time.monotonic()
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """Return the HTTP status carried by an exception, if any."""
+    status = getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    return status if isinstance(status, int) else None
+
+
+def classify_error(exc: BaseException) -> str:
+    """
+    Classify an exception as rate limited, transient or fatal.
+
+    Args:
+        exc: Exception raised by the call
+
+    Returns:
+        One of RATE_LIMITED, TRANSIENT or FATAL
+    """
+    status = _status_code(exc)
+
+    if status == 429:
+        # An exhausted quota will not recover by waiting
+        code = getattr(exc, "code", None)
+        return FATAL if code == "insufficient_quota" else RATE_LIMITED
+    if status is not None:
+        return TRANSIENT if status >= 500 or status in _RETRYABLE_STATUSES else FATAL
+
+    # Connection problems and timeouts carry no status
+    name = type(exc).__name__
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)) or name in (
+        "APIConnectionError", "APITimeoutError", "ClientConnectionError",
+        "ClientConnectorError", "ServerDisconnectedError", "ClientPayloadError"
+    ):
+        return TRANSIENT
+
+    return FATAL
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Extract the server-requested delay from an exception's response headers."""
+    headers = getattr(exc, "headers", None)
+    if headers is None:
+        response = getattr(exc, "response", None)
+        headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def get_circuit_breaker(backend: str) -> CircuitBreaker:
+    """Return the shared circuit breaker for a backend."""
+    if backend not in _breakers:
+        _breakers[backend] = CircuitBreaker()
+    return _breakers[backend]
+
+
+def _backend_stats(backend: str) -> Dict[str, Any]:
+    """Return the mutable counters for a backend."""
+    if backend not in _stats:
+        _stats[backend] = {
+            "calls": 0,
+            "failures": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "circuit_rejections": 0,
+            "backoff_seconds": 0.0
+        }
+    return _stats[backend]
+
+
+async def call_with_retries(
+    backend: str,
+    operation: Callable[[], Awaitable[T]],
+    policy: RetryPolicy = DEFAULT_RETRY_POLICY
+) -> T:
+    """
+    Run an async operation with classified retries and a circuit breaker.
+
+    Args:
+        backend: Name of the backend, e.g. "openai-responses"; each backend
+            has its own circuit breaker and counters
+        operation: Zero-argument callable returning a fresh awaitable per attempt
+        policy: Retry policy to apply
+
+    Returns:
+        The operation's result
+    """
+    breaker = get_circuit_breaker(backend)
+    stats = _backend_stats(backend)
+
+    attempt = 0
+    while True:
+        try:
+            breaker.before_call(backend)
+        except CircuitOpenError:
+            stats["circuit_rejections"] += 1
+            raise
+
+        attempt += 1
+        stats["calls"] += 1
+        try:
+            result = await operation()
+        except Exception as e:
+            kind = classify_error(e)
+            if kind == FATAL:
+                raise
+
+            stats["failures"] += 1
+            if kind == RATE_LIMITED:
+                # Throttling means the backend is up; back off without tripping the breaker
+                stats["rate_limited"] += 1
+            else:
+                breaker.record_failure()
+
+            if attempt >= policy.max_attempts or breaker.state == "open":
+                raise
+
+            delay = policy.backoff(attempt, retry_after_seconds(e))
+            stats["retries"] += 1
+            stats["backoff_seconds"] += delay
+            logger.warning(
+                f"{backend} call failed ({kind}: {e}); retry {attempt}/{policy.max_attempts - 1} "
+                f"in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+            continue
+
+        breaker.record_success()
+        return result
+
+
+_agents_clients: Dict[str, AsyncOpenAI] = {}
+
+
+def use_agents_client(api_key: str) -> None:
+    """
+    Make Agents SDK runs use a shared client for an API key without built-in retries.
+
+    The OpenAI client retries on its own by default, which would stack its
+    retries and backoff under call_with_retries and hide them from its
+    counters.
+    """
+    digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:8]
+    if digest not in _agents_clients:
+        _agents_clients[digest] = AsyncOpenAI(api_key=api_key, max_retries=0)
+    set_default_openai_client(_agents_clients[digest])
+
+
+def get_resilience_stats() -> Dict[str, Any]:
+    """Return retry counters and circuit state for every backend used so far."""
+    return {
+        backend: {
+            **stats,
+            "backoff_seconds": round(stats["backoff_seconds"], 2),
+            "circuit_state": get_circuit_breaker(backend).state
+        }
+        for backend, stats in _stats.items()
+    }
@@ -0,0 +1,234 @@
+"""Local relevance ranking of document sections for focused podcast scripts."""
+
+import hashlib
+import math
+import re
+from collections import Counter, OrderedDict
+from typing import Dict, Any, List, Optional
+
+# Speaking rate used across the generators
+WORDS_PER_MINUTE = 150
+
+# Source words handed to the model per word of finished script
+SOURCE_WORDS_PER_SCRIPT_WORD = 3
+
+# Source budget for generators that have no target duration
+DEFAULT_SOURCE_WORD_BUDGET = 3000
+
+# Parser sections are merged into chunks of roughly this many words
+CHUNK_TARGET_WORDS = 250
+
+# Number of document indexes kept in memory
+INDEX_CACHE_SIZE = 16
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Common English words plus the vocabulary people use to phrase instructions
+_STOPWORDS = frozenset("""
+a about above after again all also an and any are as at be because been before
+being below between both but by can could did do does doing down during each
+few for from further had has have having he her here hers him his how i if in
+into is it its itself just me more most my no nor not now of off on once only
+or other our out over own same she should so some such than that the their
+them then there these they this those through to too under until up very was
+we were what when where which while who whom why will with would you your
+focus focusing focused emphasis emphasize highlight cover covering discuss
+explain talk please make keep include mostly mainly especially particular
+particularly specific specifically podcast episode script listeners audience
+funny fun hilarious engaging short long brief detail details
+""".split())
+
+
+def _tokenize(text: str) -> List[str]:
+    """Lowercase, split and lightly stem text for lexical matching."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if token in _STOPWORDS or len(token) < 2:
+            continue
+        # Light plural stemming so "breaches" matches "breach"
+        if len(token) > 4 and token.endswith("es") and token[-3] in "sxz":
+            token = token[:-2]
+        elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def source_word_budget(duration_minutes: Optional[int] = None) -> int:
+    """
+    Estimate how many source words a script of the given length needs.
+
+    Args:
+        duration_minutes: Target script duration, if the generator has one
+
+    Returns:
+        Number of source words to send to the model
+    """
+    if not duration_minutes:
+        return DEFAULT_SOURCE_WORD_BUDGET
+    return duration_minutes * WORDS_PER_MINUTE * SOURCE_WORDS_PER_SCRIPT_WORD
+
+
+class BM25Index:
+    """Okapi BM25 index over a list of text chunks."""
+
+    def __init__(self, chunks: List[str], k1: float = 1.5, b: float = 0.75):
+        """Build term statistics for the given chunks."""
+        self.k1 = k1
+        self.b = b
+        self.term_frequencies = [Counter(_tokenize(chunk)) for chunk in chunks]
+        self.lengths = [sum(tf.values()) for tf in self.term_frequencies]
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+        document_frequencies: Counter = Counter()
+        for tf in self.term_frequencies:
+            document_frequencies.update(tf.keys())
+
+        total = len(chunks)
+        self.idf = {
+            term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for term, df in document_frequencies.items()
+        }
+
+    def score(self, query: str) -> List[float]:
+        """Score every chunk against the query."""
+        query_terms = set(_tokenize(query))
+        scores = []
+
+        for tf, length in zip(self.term_frequencies, self.lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / (self.average_length or 1))
+            for term in query_terms:
+                frequency = tf.get(term)
+                if frequency:
+                    score += self.idf[term] * frequency * (self.k1 + 1) / (frequency + norm)
+            scores.append(score)
+
+        return scores
+
+
+class DocumentIndex:
+    """Chunked, BM25-indexed view of a parsed document."""
+
+    def __init__(self, sections: List[Dict[str, Any]], chunk_words: int = CHUNK_TARGET_WORDS):
+        """Merge parser sections into chunks and index them."""
+        self.chunks = self._build_chunks(sections, chunk_words)
+        self.index = BM25Index([chunk["content"] for chunk in self.chunks])
+
+    @staticmethod
+    def _build_chunks(sections: List[Dict[str, Any]], chunk_words: int) -> List[Dict[str, Any]]:
+        """Pack consecutive sections into chunks of roughly chunk_words words."""
+        chunks = []
+        current: List[str] = []
+        current_words = 0
+
+        for section in sections:
+            text = section.get("content", "").strip()
+            if not text:
+                continue
+            words = section.get("word_count") or len(text.split())
+
+            if current and current_words + words > chunk_words:
+                chunks.append({"content": "\n\n".join(current), "word_count": current_words})
+                current, current_words = [], 0
+
+            current.append(text)
+            current_words += words
+
+        if current:
+            chunks.append({"content": "\n\n".join(current), "word_count": current_words})
+
+        return chunks
+
+    def select(self, query: str, word_budget: int) -> Optional[str]:
+        """
+        Pick the chunks most relevant to the query within a word budget.
+
+        Args:
+            query: Free-text focus, typically the user's custom instructions
+            word_budget: Maximum number of source words to return
+
+        Returns:
+            Selected chunks in document order, or None if nothing matched
+        """
+        scores = self.index.score(query)
+        ranked = sorted(
+            (i for i, score in enumerate(scores) if score > 0),
+            key=lambda i: scores[i],
+            reverse=True
+        )
+        if not ranked:
+            return None
+
+        selected = []
+        used_words = 0
+        for i in ranked:
+            words = self.chunks[i]["word_count"]
+            if selected and used_words + words > word_budget:
+                continue
+            selected.append(i)
+            used_words += words
+            if used_words >= word_budget:
+                break
+
+        # Keep the original reading order so the model sees coherent context
+        parts = []
+        previous = None
+        for i in sorted(selected):
+            if previous is not None and i != previous + 1:
+                parts.append("[... unrelated content omitted ...]")
+            parts.append(self.chunks[i]["content"])
+            previous = i
+
+        return "\n\n".join(parts)
+
+
+_index_cache: "OrderedDict[str, DocumentIndex]" = OrderedDict()
+
+
+def get_document_index(content: str, sections: List[Dict[str, Any]]) -> DocumentIndex:
+    """
+    Return the cached index for a document, building it on first use.
+
+    Args:
+        content: Full document text, used as the cache key
+        sections: Sections produced by the document parser
+
+    Returns:
+        DocumentIndex for the document
+    """
+    key = hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    index = _index_cache.get(key)
+    if index is not None:
+        _index_cache.move_to_end(key)
+        return index
+
+    index = DocumentIndex(sections)
+    _index_cache[key] = index
+    while len(_index_cache) > INDEX_CACHE_SIZE:
+        _index_cache.popitem(last=False)
+
+    return index
+
+
+def select_relevant_content(
+    content: str,
+    structure: Dict[str, Any],
+    query: str,
+    word_budget: int
+) -> Optional[str]:
+    """
+    Select the parts of a document most relevant to a query.
+
+    Args:
+        content: Full document text
+        structure: Parser structure containing the document sections
+        query: Free-text focus, typically the user's custom instructions
+        word_budget: Maximum number of source words to return
+
+    Returns:
+        Focused document text, or None if the query matched nothing
+    """
+    sections = structure.get("sections") or [{"content": content}]
+    return get_document_index(content, sections).select(query, word_budget)
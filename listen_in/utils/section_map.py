@@ -0,0 +1,184 @@
+"""Section-to-segment mapping used to regenerate scripts incrementally."""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from .retrieval import BM25Index
+
+# Bump when the sidecar layout changes; older sidecars are ignored
+SIDECAR_VERSION = 1
+
+# Sidecar files sit next to the script they describe
+SIDECAR_SUFFIX = ".sections.json"
+
+# Fields that describe the whole script rather than part of the source
+UNMAPPED_FIELDS = ("title", "estimated_duration_minutes")
+
+# Field that receives new material no existing segment talks about
+NEW_MATERIAL_FIELD = "main_content"
+
+# A section belongs to a segment when it scores at least this share of the best match
+MATCH_FRACTION = 0.5
+
+# Past this share of new or amended source words, a full rewrite is cheaper and
+# better than passing the changes as repair guidance
+MAX_CHANGED_FRACTION = 0.5
+
+
+def section_hash(text: str) -> str:
+    """Hash a section's text, ignoring differences in whitespace."""
+    normalized = re.sub(r"\s+", " ", text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def section_hashes(structure: Dict[str, Any]) -> List[str]:
+    """Return the hashes of a parsed document's sections in order."""
+    return [
+        section_hash(section["content"])
+        for section in structure.get("sections", [])
+        if section.get("content", "").strip()
+    ]
+
+
+def segment_texts(output: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Return the spoken text of each segment of a structured script.
+
+    Args:
+        output: Dumped structured generator output (monologue or dialogue)
+
+    Returns:
+        Dictionary of field name to segment text
+    """
+    texts = {}
+    for name, value in output.items():
+        if name in UNMAPPED_FIELDS:
+            continue
+        if isinstance(value, str):
+            texts[name] = value
+        elif isinstance(value, list):
+            # Dialogue segments are lists of lines
+            texts[name] = " ".join(
+                line.get("text", "") if isinstance(line, dict) else str(line)
+                for line in value
+            )
+    return texts
+
+
+def _best_matches(scores: List[float]) -> List[int]:
+    """Return the indexes scoring close to the best positive score."""
+    best = max(scores, default=0.0)
+    if best <= 0:
+        return []
+    return [i for i, score in enumerate(scores) if score >= best * MATCH_FRACTION]
+
+
+def map_segments(output: Dict[str, Any], structure: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Map each script segment to the document sections it draws on.
+
+    Sections are matched to a segment lexically, by BM25 score of the
+    section text against the segment's spoken text.
+
+    Args:
+        output: Dumped structured generator output
+        structure: Parsed document structure the script was written from
+
+    Returns:
+        Dictionary of field name to the hashes of its source sections
+    """
+    sections = [
+        section["content"]
+        for section in structure.get("sections", [])
+        if section.get("content", "").strip()
+    ]
+    index = BM25Index(sections)
+    hashes = [section_hash(text) for text in sections]
+
+    return {
+        field: sorted({hashes[i] for i in _best_matches(index.score(text))})
+        for field, text in segment_texts(output).items()
+    }
+
+
+def find_stale_fields(
+    sidecar: Dict[str, Any],
+    structure: Dict[str, Any]
+) -> Tuple[List[str], List[str]]:
+    """
+    Diff a re-parsed document against a stored mapping by section hash.
+
+    Segments tied to removed or amended sections are stale. New or amended
+    sections are matched against the existing segments; material no segment
+    covers yet goes to the main content.
+
+    Args:
+        sidecar: Stored section map and output of the previous script
+        structure: Structure of the re-parsed document
+
+    Returns:
+        Tuple of the stale field names and the text of new or amended sections
+    """
+    old_hashes = set(sidecar["sections"])
+    new_sections = [
+        section["content"]
+        for section in structure.get("sections", [])
+        if section.get("content", "").strip()
+    ]
+    new_hashes = {section_hash(text) for text in new_sections}
+
+    removed = old_hashes - new_hashes
+    added = [text for text in new_sections if section_hash(text) not in old_hashes]
+
+    stale = {
+        field
+        for field, hashes in sidecar["segment_sections"].items()
+        if removed.intersection(hashes)
+    }
+
+    texts = segment_texts(sidecar["output"])
+    fields = list(texts)
+    index = BM25Index([texts[field] for field in fields])
+    for text in added:
+        matches = _best_matches(index.score(text))
+        if matches:
+            stale.update(fields[i] for i in matches)
+        elif NEW_MATERIAL_FIELD in texts:
+            stale.add(NEW_MATERIAL_FIELD)
+
+    # Keep the schema's field order
+    return [field for field in fields if field in stale], added
+
+
+def changed_fraction(changed_sections: List[str], structure: Dict[str, Any]) -> float:
+    """Return the share of a document's words that are in new or amended sections."""
+    total = sum(len(section.get("content", "").split()) for section in structure.get("sections", []))
+    changed = sum(len(text.split()) for text in changed_sections)
+    return min(1.0, changed / total) if total else 1.0
+
+
+def sidecar_path(script_path: str) -> Path:
+    """Return the section-map sidecar path for a script file."""
+    path = Path(script_path)
+    return path.with_name(path.stem + SIDECAR_SUFFIX)
+
+
+def save_sidecar(script_path: str, sidecar: Dict[str, Any]) -> Path:
+    """Write a script's section map next to it and return the sidecar path."""
+    path = sidecar_path(script_path)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"version": SIDECAR_VERSION, **sidecar}, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def load_sidecar(script_path: str) -> Optional[Dict[str, Any]]:
+    """Read a script's section map, or return None if there is no usable one."""
+    path = sidecar_path(script_path)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        sidecar = json.load(f)
+    return sidecar if sidecar.get("version") == SIDECAR_VERSION else None
@@ -0,0 +1,77 @@
+"""Grouping of dialogue lines into as few text-to-speech requests as possible."""
+
+from typing import List, NamedTuple
+
+# Longest text a merged segment may reach
+DEFAULT_MAX_SEGMENT_CHARS = 1000
+
+
+class DialogueLine(NamedTuple):
+    """One spoken line of a dialogue script."""
+    speaker: str
+    text: str
+    starts_section: bool = False
+
+
+class PlannedSegment(NamedTuple):
+    """Text rendered in one request: consecutive lines of one speaker."""
+    speaker: str
+    text: str
+    line_count: int
+    starts_section: bool
+
+
+# Endings after which the voice already pauses
+SENTENCE_ENDINGS = ('.', '!', '?', '…', '"', "'", '”', '’', ')')
+
+
+def join_lines(previous: str, text: str) -> str:
+    """
+    Join two lines of one speaker with plain text.
+
+    Markup such as break tags is billed like spoken text, so the lines are
+    only separated by a space, with a full stop added when the first line
+    has no sentence ending of its own.
+    """
+    if not previous.rstrip().endswith(SENTENCE_ENDINGS):
+        previous = previous.rstrip() + '.'
+    return f"{previous.rstrip()} {text}"
+
+
+def plan_segments(
+    lines: List[DialogueLine],
+    max_chars: int = DEFAULT_MAX_SEGMENT_CHARS
+) -> List[PlannedSegment]:
+    """
+    Merge runs of lines by the same speaker into single segments.
+
+    Merged lines are joined as one paragraph, so every character sent is
+    spoken text. A segment never spans a section start or grows past
+    max_chars; a single longer line stays alone.
+
+    Args:
+        lines: Dialogue lines in script order
+        max_chars: Character budget per merged segment
+
+    Returns:
+        Segments in script order
+    """
+    segments: List[PlannedSegment] = []
+
+    for line in lines:
+        previous = segments[-1] if segments else None
+        merged = join_lines(previous.text, line.text) if previous is not None else None
+        if (
+            previous is not None
+            and previous.speaker == line.speaker
+            and not line.starts_section
+            and len(merged) <= max_chars
+        ):
+            segments[-1] = previous._replace(
+                text=merged,
+                line_count=previous.line_count + 1
+            )
+        else:
+            segments.append(PlannedSegment(line.speaker, line.text, 1, line.starts_section))
+
+    return segments
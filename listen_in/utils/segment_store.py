@@ -0,0 +1,105 @@
+"""Rendered audio segments of one render, held in memory and one spool file."""
+
+import mmap
+import os
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+# Segment audio kept in memory per render; the rest is read back from the spool
+DEFAULT_MAX_MEMORY_BYTES = 64 * 1024 * 1024
+
+
+class SegmentStore:
+    """
+    Segments of a render, appended to a single spool file.
+
+    Every segment is appended to the spool as it is added, so it survives a
+    restart, and its (offset, size) is returned for the caller to record.
+    Until max_memory_bytes is used up, segments are also kept in memory;
+    the others are read back through a memory map of the spool. Reads
+    return memoryviews, so assembling the output copies no segment audio.
+    A store opened on an existing spool only for reading never writes it.
+    """
+
+    def __init__(
+        self,
+        spool_path: str,
+        existing: Optional[Dict[int, Tuple[int, int]]] = None,
+        max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES
+    ):
+        """
+        Open or create the spool.
+
+        Args:
+            spool_path: File segments are appended to
+            existing: (offset, size) of segments already in the spool, by index
+            max_memory_bytes: Budget for segments also kept in memory
+        """
+        self.spool_path = spool_path
+        self.max_memory_bytes = max_memory_bytes
+        self.locations: Dict[int, Tuple[int, int]] = dict(existing or {})
+        self.memory_bytes = 0
+        self._memory: Dict[int, bytes] = {}
+        self._spool: Optional[BinaryIO] = None
+        self._size = os.path.getsize(spool_path) if os.path.exists(spool_path) else 0
+        self._maps: List[mmap.mmap] = []
+
+    def __len__(self) -> int:
+        """Return the number of stored segments."""
+        return len(self.locations)
+
+    def add(self, index: int, audio: bytes) -> Tuple[int, int]:
+        """
+        Store a segment's audio.
+
+        Returns:
+            Offset and size of the segment in the spool
+        """
+        if self._spool is None:
+            self._spool = open(self.spool_path, 'ab')
+        offset = self._size
+        self._spool.write(audio)
+        self._spool.flush()
+        self._size += len(audio)
+        self.locations[index] = (offset, len(audio))
+
+        if self.memory_bytes + len(audio) <= self.max_memory_bytes:
+            self._memory[index] = audio
+            self.memory_bytes += len(audio)
+        return offset, len(audio)
+
+    def read(self, index: int) -> memoryview:
+        """Return a segment's audio without copying it."""
+        if index in self._memory:
+            return memoryview(self._memory[index])
+
+        offset, size = self.locations[index]
+        if not size:
+            return memoryview(b"")
+        # Segments appended after the last map need a map that covers them
+        if not self._maps or len(self._maps[-1]) < offset + size:
+            with open(self.spool_path, 'rb') as f:
+                self._maps.append(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        return memoryview(self._maps[-1])[offset:offset + size]
+
+    def close(self) -> None:
+        """Close the spool and its memory maps; the spool file is kept."""
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+        self._memory.clear()
+        for spool_map in self._maps:
+            try:
+                spool_map.close()
+            except BufferError:
+                # A caller still holds a view; the map is released with it
+                pass
+        self._maps.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many segments are held in memory and the spool's size."""
+        return {
+            "segments": len(self.locations),
+            "in_memory_segments": len(self._memory),
+            "in_memory_bytes": self.memory_bytes,
+            "spool_bytes": self._size
+        }
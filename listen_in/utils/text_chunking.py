@@ -0,0 +1,64 @@
+"""Splitting of long scripts into text-to-speech requests at natural boundaries."""
+
+import re
+from typing import List
+
+# Closing quotes and brackets after a sentence's punctuation stay with the sentence
+_CLOSERS = r'["\'”’)\]]'
+
+# Boundaries tried in order when a piece of text exceeds the budget
+_SPLITTERS = [
+    re.compile(rf'(?:(?<=[.!?…])|(?<=[.!?…]{_CLOSERS})|(?<=[.!?…]{_CLOSERS}{_CLOSERS}))\s+'),  # sentences
+    re.compile(r'(?<=[,;:—])\s+'),  # clauses
+    re.compile(r'\s+')  # words
+]
+
+
+def _pack(pieces: List[str], max_chars: int) -> List[str]:
+    """Greedily join consecutive pieces into chunks of at most max_chars."""
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split(text: str, max_chars: int, level: int = 0) -> List[str]:
+    """Split text under max_chars at the coarsest boundary that suffices."""
+    if len(text) <= max_chars:
+        return [text]
+    if level == len(_SPLITTERS):
+        return [text[i:i + max_chars] for i in range(0, len(text), max_chars)]
+
+    parts = [part for part in _SPLITTERS[level].split(text) if part]
+    if len(parts) == 1:
+        return _split(text, max_chars, level + 1)
+    return _pack([piece for part in parts for piece in _split(part, max_chars, level + 1)], max_chars)
+
+
+def chunk_text(paragraphs: List[str], max_chars: int) -> List[str]:
+    """
+    Pack paragraphs into chunks of at most max_chars characters.
+
+    Chunks end between paragraphs where possible. A paragraph that is too
+    long on its own is split between sentences, then clauses, then words.
+
+    Args:
+        paragraphs: Script text in reading order
+        max_chars: Character budget per chunk
+
+    Returns:
+        Chunks in reading order
+    """
+    pieces = []
+    for paragraph in paragraphs:
+        paragraph = paragraph.strip()
+        if paragraph:
+            pieces.extend(_split(paragraph, max_chars))
+    return _pack(pieces, max_chars)
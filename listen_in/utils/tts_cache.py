@@ -0,0 +1,148 @@
+"""Content-addressed on-disk cache of rendered text-to-speech audio."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Extension of cached audio files
+CACHE_SUFFIX = ".audio"
+
+
+def segment_cache_key(
+    text: str,
+    voice_id: str,
+    model_id: str,
+    voice_settings: Optional[Dict[str, Any]],
+    output_format: str
+) -> str:
+    """
+    Hash everything that determines a rendered segment's audio.
+
+    Args:
+        text: Exact text sent for synthesis
+        voice_id: ElevenLabs voice ID
+        model_id: ElevenLabs model ID
+        voice_settings: Voice settings sent with the request
+        output_format: Audio output format, e.g. "mp3_44100_128"
+
+    Returns:
+        Hex digest identifying the audio
+    """
+    payload = json.dumps(
+        {
+            "text": text,
+            "voice_id": voice_id,
+            "model_id": model_id,
+            "voice_settings": voice_settings or {},
+            "output_format": output_format
+        },
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Size-bounded cache of audio files, evicting the least recently used."""
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        """Initialize the cache; the directory is created on first write."""
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._total_bytes: Optional[int] = None
+
+    def _path(self, key: str) -> Path:
+        """Return the file holding a key's audio."""
+        return self.cache_dir / key[:2] / f"{key}{CACHE_SUFFIX}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Return cached audio.
+
+        Args:
+            key: Cache key from segment_cache_key
+
+        Returns:
+            The audio on a cache hit, None otherwise
+        """
+        path = self._path(key)
+        try:
+            audio = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        # The modification time doubles as the last-use time for eviction
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        """Store rendered audio under a key, then enforce the size bound."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # A replaced entry no longer counts toward the total
+        try:
+            replaced_bytes = path.stat().st_size
+        except FileNotFoundError:
+            replaced_bytes = 0
+
+        # Write to a temporary file first so readers never see partial audio
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(audio)
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        if self._total_bytes is not None:
+            self._total_bytes += len(audio) - replaced_bytes
+        self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits its bound."""
+        if self._total_bytes is not None and self._total_bytes <= self.max_bytes:
+            return
+
+        entries = []
+        for path in self.cache_dir.glob(f"*/*{CACHE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            logger.debug(f"Evicted {path.name} from the TTS cache")
+
+        self._total_bytes = total
+
+
+_caches: Dict[str, TTSCache] = {}
+
+
+def get_tts_cache(cache_dir: Path, max_bytes: int) -> TTSCache:
+    """Return the shared cache for a directory, creating it on first use."""
+    key = str(Path(cache_dir).resolve())
+    if key not in _caches:
+        _caches[key] = TTSCache(cache_dir, max_bytes)
+    return _caches[key]
@@ -0,0 +1,186 @@
+"""Cached ElevenLabs model and voice metadata, refreshed in the background."""
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+from .elevenlabs_client import ELEVENLABS_BASE_URL, get_session
+
+logger = logging.getLogger(__name__)
+
+# Metadata older than this is refreshed; the stale copy is served meanwhile
+DEFAULT_TTL_SECONDS = 3600
+
+# Voices per page of list results
+DEFAULT_PAGE_SIZE = 10
+
+
+class VoiceCatalog:
+    """
+    Local copy of an account's models and voices.
+
+    Lookups are answered from memory. The first lookup of a resource (or
+    warm()) fetches it; once it is older than ttl_seconds, lookups still
+    return the cached copy and start a single background refresh. Failed
+    refreshes keep the stale copy and are retried on a later lookup.
+    """
+
+    def __init__(self, api_key: str, ttl_seconds: float = DEFAULT_TTL_SECONDS, base_url: str = ELEVENLABS_BASE_URL):
+        """Initialize an empty catalog for an API key."""
+        self.api_key = api_key
+        self.ttl_seconds = ttl_seconds
+        self.base_url = base_url
+        self._data: Dict[str, List[Dict[str, Any]]] = {}
+        self._fetched_at: Dict[str, float] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.stats = {"hits": 0, "misses": 0, "refreshes": 0, "refresh_errors": 0}
+
+    async def _fetch(self, resource: str) -> List[Dict[str, Any]]:
+        """Fetch "models" or "voices" from the API."""
+        async with get_session().get(
+            f"{self.base_url}/{resource}",
+            headers={"xi-api-key": self.api_key}
+        ) as response:
+            if response.status != 200:
+                raise RuntimeError(f"Failed to fetch {resource}")
+            data = await response.json()
+
+        # /models returns a list, /voices wraps its list in an object
+        return data.get(resource, []) if isinstance(data, dict) else data
+
+    async def _refresh(self, resource: str) -> List[Dict[str, Any]]:
+        """Fetch a resource and store it."""
+        self.stats["refreshes"] += 1
+        self._data[resource] = await self._fetch(resource)
+        self._fetched_at[resource] = time.monotonic()
+        return self._data[resource]
+
+    async def _background_refresh(self, resource: str) -> None:
+        """Refresh a stale resource, keeping the old copy if that fails."""
+        try:
+            await self._refresh(resource)
+        except Exception as e:
+            self.stats["refresh_errors"] += 1
+            logger.warning(f"Keeping cached ElevenLabs {resource}: refresh failed ({e})")
+        finally:
+            self._refreshing.pop(resource, None)
+
+    async def _get(self, resource: str) -> List[Dict[str, Any]]:
+        """Return a resource from the cache, fetching or refreshing it as needed."""
+        if resource not in self._data:
+            self.stats["misses"] += 1
+            # Concurrent first lookups share one request
+            if resource not in self._refreshing:
+                self._refreshing[resource] = asyncio.ensure_future(self._refresh(resource))
+            task = self._refreshing[resource]
+            try:
+                return await asyncio.shield(task)
+            finally:
+                if task.done():
+                    self._refreshing.pop(resource, None)
+
+        self.stats["hits"] += 1
+        age = time.monotonic() - self._fetched_at[resource]
+        if age > self.ttl_seconds and resource not in self._refreshing:
+            self._refreshing[resource] = asyncio.create_task(self._background_refresh(resource))
+        return self._data[resource]
+
+    async def warm(self) -> None:
+        """Load models and voices, logging rather than raising on failure."""
+        results = await asyncio.gather(self._get("models"), self._get("voices"), return_exceptions=True)
+        for resource, result in zip(("models", "voices"), results):
+            if isinstance(result, Exception):
+                logger.warning(f"Could not preload ElevenLabs {resource}: {result}")
+
+    async def models(self) -> List[Dict[str, Any]]:
+        """Return the account's models."""
+        return await self._get("models")
+
+    async def voices(self) -> List[Dict[str, Any]]:
+        """Return all of the account's voices."""
+        return await self._get("voices")
+
+    async def default_model(self) -> str:
+        """Return the podcast model if there is one, else the first model."""
+        models = await self.models()
+        for model in models:
+            if "podcast" in model.get("name", "").lower():
+                return model["model_id"]
+        if models:
+            return models[0]["model_id"]
+        raise RuntimeError("No models available")
+
+    async def find_voices(
+        self,
+        search: Optional[str] = None,
+        category: Optional[str] = None,
+        page: int = 1,
+        page_size: int = DEFAULT_PAGE_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Filter and page the cached voices.
+
+        Args:
+            search: Case-insensitive text matched against names, descriptions and labels
+            category: Voice category, e.g. "premade", "cloned" or "generated"
+            page: 1-based page number
+            page_size: Voices per page
+
+        Returns:
+            Dictionary with the page's voices and the total number of matches
+        """
+        if page < 1 or page_size < 1:
+            raise ValueError("page and page_size must be at least 1")
+
+        voices = await self.voices()
+        if category:
+            voices = [voice for voice in voices if voice.get("category", "").lower() == category.lower()]
+        if search:
+            needle = search.lower()
+            voices = [
+                voice for voice in voices
+                if needle in " ".join([
+                    voice.get("name", ""),
+                    voice.get("description") or "",
+                    *map(str, (voice.get("labels") or {}).values())
+                ]).lower()
+            ]
+
+        start = (page - 1) * page_size
+        return {
+            "voices": voices[start:start + page_size],
+            "total": len(voices),
+            "page": page,
+            "pages": math.ceil(len(voices) / page_size)
+        }
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the age of each cached resource."""
+        now = time.monotonic()
+        return {
+            **self.stats,
+            "ages_seconds": {resource: round(now - fetched_at, 1) for resource, fetched_at in self._fetched_at.items()}
+        }
+
+
+_catalogs: Dict[str, VoiceCatalog] = {}
+
+
+def get_voice_catalog(
+    api_key: str,
+    ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    base_url: str = ELEVENLABS_BASE_URL
+) -> VoiceCatalog:
+    """Return the shared catalog for an API key and endpoint, creating it on first use."""
+    digest = hashlib.sha256(f"{base_url}\0{api_key}".encode("utf-8")).hexdigest()[:8]
+    if digest not in _catalogs:
+        _catalogs[digest] = VoiceCatalog(api_key, ttl_seconds, base_url)
+    return _catalogs[digest]
+
+
+def get_voice_catalog_stats() -> Dict[str, Dict[str, Any]]:
+    """Return cache stats of every catalog, keyed by hashed API key."""
+    return {digest: catalog.cache_stats() for digest, catalog in _catalogs.items()}
@@ -105,8 +105,7 @@ async def test_dialogue_pipeline():
     
     # Step 3: Generate conversational audio
     print("\n3️⃣ Generating conversational podcast audio...")
-    print("   Note: Two-host dialogue rendered as engaging monologue")
-    print("   Voice: Adam (pNInz6obpgDQGcFmaJgB)")
+    print("   Voices: Alex (Adam), Sam (Rachel)")
     try:
         audio_generator = SimpleDialogueAudioGenerator(api_key=elevenlabs_key)
         
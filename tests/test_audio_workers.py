@@ -0,0 +1,79 @@
+"""Tests for the audio worker pool's cancellation and temporary outputs."""
+
+import asyncio
+import time
+from pathlib import Path
+
+from listen_in.utils.audio_workers import AudioWorkerPool
+
+
+def write_after(delay, text, *, output_path):
+    time.sleep(delay)
+    Path(output_path).write_text(text)
+    return text
+
+
+async def wait_until_running(pool, count):
+    while pool.queue_stats()["running"] < count:
+        await asyncio.sleep(0.05)
+
+
+def test_run_to_file_moves_output_into_place(tmp_path):
+    pool = AudioWorkerPool(1)
+    output = tmp_path / "out" / "episode.mp3"
+    try:
+        assert asyncio.run(pool.run_to_file("job", write_after, str(output), 0, "audio")) == "audio"
+    finally:
+        pool.shutdown()
+
+    assert output.read_text() == "audio"
+    assert [path.name for path in output.parent.iterdir()] == ["episode.mp3"]
+
+
+def test_cancelled_running_call_never_writes_output(tmp_path):
+    pool = AudioWorkerPool(1)
+    output = tmp_path / "episode.mp3"
+
+    async def scenario():
+        # With one worker, the executor hands over one call ahead of the worker
+        calls = [
+            asyncio.ensure_future(pool.run_to_file("job", write_after, str(output), 1, f"call {i}"))
+            for i in range(3)
+        ]
+        await wait_until_running(pool, 2)
+
+        for call in calls:
+            call.cancel()
+        await asyncio.gather(*calls, return_exceptions=True)
+        assert all(call.cancelled() for call in calls)
+
+        # Calls that could not be stopped are reported until they end, then their temporary files go
+        assert pool.cancel_job("job") == {"cancelled": 0, "running": 2}
+        assert pool.queue_stats()["running"] == 2
+        while pool.queue_stats()["jobs"]:
+            await asyncio.sleep(0.05)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+    assert list(tmp_path.iterdir()) == []
+    assert pool.stats["cancelled"] == 3
+
+
+def test_cancel_job_cancels_queued_calls():
+    pool = AudioWorkerPool(1)
+
+    async def scenario():
+        calls = [asyncio.ensure_future(pool.run("job", time.sleep, 0.5)) for _ in range(3)]
+        await wait_until_running(pool, 2)
+        assert pool.cancel_job("job") == {"cancelled": 1, "running": 2}
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert results[:2] == [None, None]
+    assert isinstance(results[2], asyncio.CancelledError)
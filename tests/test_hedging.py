@@ -0,0 +1,51 @@
+"""Tests for hedged requests."""
+
+import asyncio
+
+import pytest
+
+from listen_in.utils import hedging
+from listen_in.utils.hedging import LatencyTracker, run_hedged
+
+
+@pytest.fixture(autouse=True)
+def fresh_tracker(monkeypatch):
+    monkeypatch.setattr(hedging, "latency_tracker", LatencyTracker())
+
+
+def call(result, delay=0.0, error=None):
+    async def operation():
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result
+    return operation
+
+
+def test_slow_primary_is_cancelled_and_not_recorded():
+    result, info = asyncio.run(run_hedged(call("primary", 5.0), call("hedge"), "p", "h", hedge_after=0.01))
+    assert result == "hedge"
+    assert "primary_cancelled_after_seconds" in info
+    assert "primary_failed" not in info
+    assert hedging.latency_tracker.percentile("p", 0.5) is None
+    assert hedging.latency_tracker.percentile("h", 0.5) is not None
+
+
+def test_failed_primary_is_reported_as_failed_not_cancelled():
+    result, info = asyncio.run(
+        run_hedged(call(None, error=RuntimeError("boom")), call("hedge"), "p", "h", hedge_after=5.0)
+    )
+    assert result == "hedge"
+    assert info["primary_failed"] is True
+    assert "primary_cancelled_after_seconds" not in info
+
+
+def test_fast_primary_wins_without_hedging():
+    result, info = asyncio.run(run_hedged(call("primary"), call("hedge"), "p", "h", hedge_after=5.0))
+    assert result == "primary"
+    assert not info["hedged"]
+
+
+def test_timeout_reports_sub_second_budgets():
+    with pytest.raises(asyncio.TimeoutError, match="latency budget of 0.3s"):
+        asyncio.run(run_hedged(call("p", 5.0), call("h", 5.0), "p", "h", hedge_after=0.1, deadline=0.3))
@@ -0,0 +1,150 @@
+"""Tests for MP3 frame parsing, trimming and concatenation on synthetic frames."""
+
+import pytest
+
+from listen_in.utils.mp3_concat import (
+    _frame_data_bits,
+    concatenate_mp3,
+    iter_frames,
+    mp3_info,
+    parse_header,
+    silence_frame,
+    trim_silent_frames,
+)
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, stereo, no CRC, no padding
+HEADER = bytes([0xFF, 0xFB, 0x90, 0x00])
+FRAME_LENGTH = 417
+SIDE_INFO_LENGTH = 32
+SAMPLES = 1152
+
+
+def make_frame(main_data_begin=0, data_bits=0, fill=0x55, header=HEADER):
+    """Build a stereo MPEG-1 frame whose granules each carry data_bits of spectral data."""
+    bits = main_data_begin << (SIDE_INFO_LENGTH * 8 - 9)
+    # main_data_begin, private bits and scfsi come before the four granule/channel blocks
+    position = 9 + 3 + 8
+    for _ in range(4):
+        bits |= data_bits << (SIDE_INFO_LENGTH * 8 - position - 12)
+        position += 59
+    side_info = bits.to_bytes(SIDE_INFO_LENGTH, "big")
+    length = parse_header(header, 0).length
+    return header + side_info + bytes([fill]) * (length - 4 - SIDE_INFO_LENGTH)
+
+
+def make_tag_frame(frame_count):
+    """Build a Xing metadata frame declaring a frame count."""
+    tag = b"Xing" + (1).to_bytes(4, "big") + frame_count.to_bytes(4, "big")
+    frame = HEADER + bytes(SIDE_INFO_LENGTH) + tag
+    return frame + bytes(FRAME_LENGTH - len(frame))
+
+
+def test_parse_header_round_trip():
+    header = parse_header(HEADER, 0)
+    assert header.is_mpeg1
+    assert header.sample_rate == 44100
+    assert header.samples == SAMPLES
+    assert header.length == FRAME_LENGTH
+    assert header.side_info_length == SIDE_INFO_LENGTH
+    assert not header.has_crc
+    assert header.raw == HEADER
+
+    frames = [make_frame(data_bits=bits, fill=i) for i, bits in enumerate((100, 200, 300))]
+    parsed = list(iter_frames(b"".join(frames)))
+    assert [bytes(frame) for _, frame in parsed] == frames
+    assert [_frame_data_bits(h, f) for h, f in parsed] == [(0, 400), (0, 800), (0, 1200)]
+
+
+def test_parse_header_rejects_non_frames():
+    assert parse_header(b"\xff\xfb", 0) is None
+    assert parse_header(b"ID3\x04", 0) is None
+    # Bitrate index 15 is invalid
+    assert parse_header(bytes([0xFF, 0xFB, 0xF0, 0x00]), 0) is None
+
+
+def test_iter_frames_skips_junk_and_accepts_memoryviews():
+    frames = [make_frame(data_bits=50), make_frame(data_bits=60)]
+    data = b"\x00\xff\x12" + frames[0] + b"junk" + frames[1]
+    assert [bytes(frame) for _, frame in iter_frames(memoryview(data))] == frames
+
+    with pytest.raises(ValueError):
+        list(iter_frames(b"not an mp3"))
+
+
+def test_silence_frame_is_a_valid_empty_frame():
+    # With CRC and padding, which the silence frame must drop
+    padded = parse_header(bytes([0xFF, 0xFA, 0x92, 0x00]), 0)
+    assert padded.has_crc and padded.padding
+
+    frame = silence_frame(padded)
+    header = parse_header(frame, 0)
+    assert header is not None
+    assert not header.has_crc
+    assert header.padding == 0
+    assert header.stream_format == padded.stream_format
+    assert header.bitrate_index == padded.bitrate_index
+    assert len(frame) == header.length == FRAME_LENGTH
+    assert _frame_data_bits(header, frame) == (0, 0)
+
+
+def test_trim_keeps_frames_the_bit_reservoir_reads():
+    # Each frame holds 381 bytes of main data, so a reservoir offset of
+    # 500 bytes reaches two frames back
+    frames = [make_frame(fill=i) for i in range(3)]
+    frames += [make_frame(main_data_begin=500, data_bits=400, fill=3)]
+    frames += [make_frame(data_bits=400, fill=i) for i in range(4, 6)]
+    frames += [make_frame(fill=i) for i in range(6, 9)]
+
+    trimmed = trim_silent_frames(list(iter_frames(b"".join(frames))))
+    assert [bytes(frame) for _, frame in trimmed] == frames[1:7]
+
+
+def test_concatenate_across_reservoir_boundary(tmp_path):
+    first = [make_frame(fill=0), make_frame(main_data_begin=300, data_bits=400, fill=1), make_frame(fill=2)]
+    # The second segment's audio starts in the reservoir two silent frames back
+    second = [make_frame(fill=i) for i in range(3, 6)]
+    second += [make_frame(main_data_begin=500, data_bits=400, fill=6)]
+    sources = [b"".join(first), b"".join(second)]
+    output = tmp_path / "joined.mp3"
+
+    info = concatenate_mp3(sources, str(output), pause_ms=100, trim_silence=True)
+
+    # round(100 ms * 44100 / 1152) = 4 silence frames between the segments
+    silence = silence_frame(parse_header(HEADER, 0))
+    assert output.read_bytes() == b"".join(first) + silence * 4 + b"".join(second[1:])
+    assert info["frames"] == 3 + 4 + 3
+    assert info["trimmed_seconds"] == round(SAMPLES / 44100, 3)
+    assert info["segment_durations"] == [round(3 * SAMPLES / 44100, 3)] * 2
+
+
+def test_concatenate_rejects_mismatched_formats(tmp_path):
+    mono = make_frame(header=bytes([0xFF, 0xFB, 0x90, 0xC0]))
+    with pytest.raises(ValueError):
+        concatenate_mp3([make_frame(), mono], str(tmp_path / "joined.mp3"))
+
+
+def test_mp3_info_xing_matches_scanned_duration(tmp_path):
+    frames = b"".join(make_frame(data_bits=100) for _ in range(10))
+    scanned = tmp_path / "scanned.mp3"
+    tagged = tmp_path / "tagged.mp3"
+    scanned.write_bytes(frames)
+    tagged.write_bytes(make_tag_frame(10) + frames)
+
+    scanned_info = mp3_info(str(scanned))
+    tagged_info = mp3_info(str(tagged))
+    assert scanned_info["source"] == "frames"
+    assert tagged_info["source"] == "xing"
+    assert scanned_info["frames"] == tagged_info["frames"] == 10
+    assert scanned_info["duration_seconds"] == tagged_info["duration_seconds"] == round(10 * SAMPLES / 44100, 3)
+    assert scanned_info["bitrate_kbps"] == tagged_info["bitrate_kbps"] == 128
+
+    # The metadata frame is not audio
+    assert len(list(iter_frames(tagged.read_bytes()))) == 10
+
+
+def test_mp3_info_trusts_the_xing_frame_count(tmp_path):
+    path = tmp_path / "tagged.mp3"
+    path.write_bytes(make_tag_frame(100) + make_frame(data_bits=100))
+    info = mp3_info(str(path))
+    assert info["frames"] == 100
+    assert info["duration_seconds"] == round(100 * SAMPLES / 44100, 3)
@@ -0,0 +1,171 @@
+"""Tests that a dialogue render interrupted by a server crash resumes on restart."""
+
+import asyncio
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+from aiohttp import web
+from fastmcp import Client
+from fastmcp.client.transports import PythonStdioTransport
+from mcp.types import LATEST_PROTOCOL_VERSION
+
+from listen_in.generators.dialogue_audio_generator import DialogueAudioGenerator
+from listen_in.utils.elevenlabs_client import close_session
+from listen_in.utils.render_jobs import RenderJobStore
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Runs the server against the mock ElevenLabs API
+LAUNCHER = """
+import os
+import listen_in.utils.elevenlabs_client as client
+client.ELEVENLABS_BASE_URL = os.environ["MOCK_ELEVENLABS_URL"]
+from listen_in.server import mcp
+mcp.run()
+"""
+
+SCRIPT = "# Episode\n\n## Script\n\n" + "\n".join(
+    f"**{'Alex' if i % 2 else 'Sam'}**: This is line number {i} of the show." for i in range(8)
+)
+RENDERED_BEFORE_CRASH = 3
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, stereo, 32 bytes of side information
+HEADER = bytes([0xFF, 0xFB, 0x90, 0x00])
+FRAME_LENGTH = 417
+
+
+def speech(text):
+    """Return frames with spectral data, different for every text."""
+    # Every granule carries some data, so no frame is trimmed as silence
+    bits = 0
+    for position in range(20, 20 + 4 * 59, 59):
+        bits |= 100 << (32 * 8 - position - 12)
+    side_info = bits.to_bytes(32, "big")
+    digest = hashlib.sha256(text.encode()).digest()
+    return b"".join(HEADER + side_info + bytes([digest[i]]) * (FRAME_LENGTH - 36) for i in range(6))
+
+
+class MockElevenLabs:
+    """Streaming text-to-speech endpoint that can stop answering after some requests."""
+
+    def __init__(self):
+        self.served = 0
+        self.answer_limit = None
+        self.release = asyncio.Event()
+
+    async def tts(self, request):
+        body = await request.json()
+        if self.answer_limit is not None and self.served >= self.answer_limit:
+            # Held until the test ends; the server that sent it is gone by then
+            await self.release.wait()
+            raise web.HTTPServiceUnavailable()
+        self.served += 1
+        return web.Response(body=speech(body["text"]), content_type="audio/mpeg")
+
+    async def other(self, request):
+        return web.json_response({"voices": []} if request.path.endswith("voices") else [])
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/v1/text-to-speech/{voice}/stream", self.tts)
+        app.router.add_get("/v1/{path:.*}", self.other)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, "127.0.0.1", 0).start()
+        return f"http://127.0.0.1:{self.runner.addresses[0][1]}/v1"
+
+
+def server_env(home, base_url):
+    return {
+        **os.environ,
+        "HOME": str(home),
+        "PYTHONPATH": str(ROOT),
+        "OPEN_AI_KEY": "test",
+        "ELEVENLABS_API_KEY": "test",
+        "RENDER_JOBS_DIR": str(home / "jobs"),
+        "TTS_CACHE_DIR": str(home / "tts"),
+        "MOCK_ELEVENLABS_URL": base_url,
+    }
+
+
+async def crash_during_render(launcher, env, script_path, mock):
+    """Start a render through a server process, then kill it partway through."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, str(launcher),
+        env=env,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+
+    async def send(message):
+        process.stdin.write((json.dumps({"jsonrpc": "2.0", **message}) + "\n").encode())
+        await process.stdin.drain()
+
+    await send({"id": 1, "method": "initialize", "params": {
+        "protocolVersion": LATEST_PROTOCOL_VERSION,
+        "capabilities": {},
+        "clientInfo": {"name": "test", "version": "1"}
+    }})
+    await process.stdout.readline()
+    await send({"method": "notifications/initialized"})
+    await send({"id": 2, "method": "tools/call", "params": {
+        "name": "generate_podcast_audio",
+        "arguments": {"script_path": str(script_path)}
+    }})
+
+    # Crash once the mock has answered some segments and holds the rest
+    while mock.served < RENDERED_BEFORE_CRASH:
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.5)
+    process.kill()
+    await process.wait()
+
+
+def test_server_restart_resumes_interrupted_render(tmp_path):
+    launcher = tmp_path / "launcher.py"
+    launcher.write_text(LAUNCHER)
+    script_path = tmp_path / "episode.md"
+    script_path.write_text(SCRIPT)
+    output = tmp_path / "Desktop" / "listen-in-output" / "episode.mp3"
+
+    async def scenario():
+        mock = MockElevenLabs()
+        base_url = await mock.start()
+        env = server_env(tmp_path, base_url)
+        try:
+            mock.answer_limit = RENDERED_BEFORE_CRASH
+            await crash_during_render(launcher, env, script_path, mock)
+            # Streamed output holds the segments written before the crash
+            partial = output.read_bytes()
+
+            # The restarted server resumes the render without being asked
+            mock.served = 0
+            mock.answer_limit = None
+            async with Client(PythonStdioTransport(str(launcher), env=env)) as client:
+                while True:
+                    renders = (await client.call_tool("list_audio_renders", {})).data["renders"]
+                    if not renders:
+                        break
+                    await asyncio.sleep(0.1)
+            resumed_requests = mock.served
+
+            # An uninterrupted render of the same script, for comparison
+            reference = tmp_path / "reference.mp3"
+            generator = DialogueAudioGenerator("test", use_cache=False, job_store=RenderJobStore(tmp_path / "ref-jobs"))
+            generator.base_url = base_url
+            result = await generator.generate_audio(SCRIPT, str(reference), stream=True)
+            return partial, resumed_requests, result["total_segments"], reference.read_bytes()
+        finally:
+            mock.release.set()
+            await close_session()
+            await mock.runner.cleanup()
+
+    partial, resumed_requests, total_segments, reference = asyncio.run(asyncio.wait_for(scenario(), 120))
+
+    assert 0 < len(partial) < len(reference)
+    assert resumed_requests == total_segments - RENDERED_BEFORE_CRASH
+    assert output.read_bytes() == reference
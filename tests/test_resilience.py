@@ -0,0 +1,58 @@
+"""Tests for classified retries and the circuit breaker."""
+
+import asyncio
+
+import pytest
+
+from listen_in.utils import resilience
+from listen_in.utils.resilience import RetryPolicy, call_with_retries, get_circuit_breaker
+
+FAST = RetryPolicy(max_attempts=3, base_delay=0.0)
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def failing(status_code):
+    async def operation():
+        raise StatusError(status_code)
+    return operation
+
+
+@pytest.fixture(autouse=True)
+def fresh_backends(monkeypatch):
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setattr(resilience, "_stats", {})
+
+
+def run(backend, operation):
+    with pytest.raises(Exception) as error:
+        asyncio.run(call_with_retries(backend, operation, FAST))
+    return error.value
+
+
+def test_rate_limits_back_off_without_opening_the_circuit():
+    for _ in range(4):
+        assert isinstance(run("throttled", failing(429)), StatusError)
+
+    stats = resilience.get_resilience_stats()["throttled"]
+    assert stats["calls"] == stats["rate_limited"] == 12
+    assert stats["retries"] == 8
+    assert stats["circuit_state"] == "closed"
+
+
+def test_server_errors_open_the_circuit():
+    run("broken", failing(503))
+    run("broken", failing(503))
+    assert get_circuit_breaker("broken").state == "open"
+    assert isinstance(run("broken", failing(503)), resilience.CircuitOpenError)
+
+
+def test_fatal_errors_are_not_retried():
+    run("fatal", failing(400))
+    stats = resilience.get_resilience_stats()["fatal"]
+    assert stats["calls"] == 1
+    assert stats["retries"] == 0
@@ -0,0 +1,100 @@
+"""Tests for recovering partial structured outputs."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from agents.exceptions import ModelBehaviorError
+from pydantic import BaseModel
+
+from listen_in.generators import schema_repair
+from listen_in.generators.schema_repair import (
+    load_json_leniently,
+    repair_structured_output,
+    split_valid_fields,
+)
+from listen_in.utils.llm_usage import combine_usage, summarize_usage
+
+
+class Segment(BaseModel):
+    speaker: str
+    text: str
+
+
+class Script(BaseModel):
+    title: str
+    segments: list[Segment]
+    minutes: int
+
+
+def test_load_json_leniently_parses_complete_object_in_code_fence():
+    text = '```json\n{"title": "Hi", "minutes": 3}\n```'
+    assert load_json_leniently(text) == {"title": "Hi", "minutes": 3}
+
+
+def test_load_json_leniently_closes_truncated_object():
+    text = '{"title": "Hi", "segments": [{"speaker": "Alex", "text": "Hello"}, {"speaker": "Sam"'
+    assert load_json_leniently(text) == {
+        "title": "Hi",
+        "segments": [{"speaker": "Alex", "text": "Hello"}],
+    }
+
+
+def test_load_json_leniently_drops_unterminated_string():
+    text = '{"title": "Hi", "minutes": 3, "segments": [{"speaker": "Alex", "text": "Hel'
+    assert load_json_leniently(text) == {
+        "title": "Hi",
+        "minutes": 3,
+        "segments": [{"speaker": "Alex"}],
+    }
+
+
+def test_load_json_leniently_ignores_brackets_inside_strings():
+    text = '{"title": "a {b} [c]", "minutes": 3, "segments": [{"speaker": "Sam", "te'
+    assert load_json_leniently(text) == {
+        "title": "a {b} [c]",
+        "minutes": 3,
+        "segments": [{"speaker": "Sam"}],
+    }
+
+
+@pytest.mark.parametrize("text", ["", "no json here", "[1, 2, 3]", '{"title": "unterminated'])
+def test_load_json_leniently_returns_none_without_object(text):
+    assert load_json_leniently(text) is None
+
+
+def test_split_valid_fields_reports_missing_and_invalid_fields():
+    data = {
+        "title": "Hi",
+        "segments": [{"speaker": "Alex"}],
+        "minutes": "three",
+    }
+    valid, invalid = split_valid_fields(Script, data)
+    assert valid == {"title": "Hi"}
+    assert invalid == ["segments", "minutes"]
+
+
+def test_split_valid_fields_validates_nested_models():
+    data = {"title": "Hi", "segments": [{"speaker": "Alex", "text": "Hello"}]}
+    valid, invalid = split_valid_fields(Script, data)
+    assert valid["segments"] == [Segment(speaker="Alex", text="Hello")]
+    assert invalid == ["minutes"]
+
+
+def test_repair_without_invalid_fields_reports_zero_usage(monkeypatch):
+    raw = '{"title": "Hi", "segments": [], "minutes": 3}'
+    monkeypatch.setattr(schema_repair, "extract_raw_output", lambda error: raw)
+
+    output, usage = asyncio.run(
+        repair_structured_output(ModelBehaviorError("invalid"), None, Script, "prompt")
+    )
+
+    assert output == Script(title="Hi", segments=[], minutes=3)
+    assert usage["repaired_fields"] == []
+    assert set(summarize_usage(None, 0.0)) <= set(usage)
+    assert usage["input_tokens"] == usage["cached_tokens"] == usage["output_tokens"] == 0
+
+    first = summarize_usage(SimpleNamespace(input_tokens=100, output_tokens=20), 0.0)
+    combined = combine_usage(first, usage)
+    assert combined["input_tokens"] == 100
+    assert combined["output_tokens"] == 20
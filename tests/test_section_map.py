@@ -0,0 +1,22 @@
+"""Tests for deciding how much of a script to regenerate."""
+
+from listen_in.utils.section_map import MAX_CHANGED_FRACTION, changed_fraction
+
+
+def structure(*sections):
+    return {"sections": [{"content": text} for text in sections]}
+
+
+def test_changed_fraction_counts_words_of_changed_sections():
+    doc = structure("one two three", "four five six seven eight", "nine ten")
+    assert changed_fraction(["four five six seven eight"], doc) == 0.5
+    assert changed_fraction([], doc) == 0.0
+
+
+def test_rewritten_document_exceeds_the_incremental_limit():
+    doc = structure("alpha beta", "gamma delta")
+    assert changed_fraction(["alpha beta", "gamma delta"], doc) == 1.0 > MAX_CHANGED_FRACTION
+
+
+def test_empty_document_counts_as_fully_changed():
+    assert changed_fraction([], structure()) == 1.0
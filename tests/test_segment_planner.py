@@ -0,0 +1,33 @@
+"""Tests for merging dialogue lines into text-to-speech requests."""
+
+from listen_in.utils.segment_planner import DialogueLine, plan_segments
+
+
+def test_merged_lines_are_joined_without_markup():
+    lines = [
+        DialogueLine("Alex", "Hello there."),
+        DialogueLine("Alex", "How are you"),
+        DialogueLine("Alex", "Fine?"),
+        DialogueLine("Sam", "Good."),
+    ]
+    segments = plan_segments(lines)
+
+    assert [(s.speaker, s.text, s.line_count) for s in segments] == [
+        ("Alex", "Hello there. How are you. Fine?", 3),
+        ("Sam", "Good.", 1),
+    ]
+    # Every character sent is spoken text
+    assert sum(len(s.text) for s in segments) == sum(len(line.text) for line in lines) + 3
+
+
+def test_segments_respect_sections_and_budget():
+    lines = [
+        DialogueLine("Alex", "One."),
+        DialogueLine("Alex", "Two.", starts_section=True),
+        DialogueLine("Alex", "Three."),
+        DialogueLine("Alex", "Four four."),
+    ]
+    segments = plan_segments(lines, max_chars=12)
+
+    assert [s.text for s in segments] == ["One.", "Two. Three.", "Four four."]
+    assert [s.starts_section for s in segments] == [False, True, False]
@@ -0,0 +1,68 @@
+"""Tests for splitting a document into episode parts."""
+
+import math
+from pathlib import Path
+
+from listen_in.generators.series_generator import MAX_EPISODES, SeriesGenerator
+from listen_in.parsers.text_parser import TextParser
+from listen_in.utils.retrieval import source_word_budget
+
+EXAMPLES = Path(__file__).resolve().parent.parent / "examples"
+
+
+def make_content(text):
+    return {
+        "content": text,
+        "metadata": {"title": "Doc", "word_count": len(text.split())},
+        "structure": {"sections": []},
+    }
+
+
+def chapters(count, words):
+    return "\n".join(f"# Chapter {i}\n" + " ".join([f"w{i}"] * words) for i in range(count))
+
+
+def test_partition_follows_headings_and_keeps_every_word():
+    text = chapters(4, 600)
+    parts = SeriesGenerator("key").partition(make_content(text), episodes=2)
+
+    assert [part["metadata"]["heading"] for part in parts] == ["# Chapter 0", "# Chapter 2"]
+    assert [part["metadata"]["title"] for part in parts] == ["Doc (# Chapter 0)", "Doc (# Chapter 2)"]
+    assert sum(part["metadata"]["word_count"] for part in parts) == len(text.split())
+    assert " ".join(part["content"] for part in parts).split() == text.split()
+
+
+def test_partition_splits_text_without_headings_by_paragraph():
+    text = "\n\n".join(" ".join(["word"] * 100) for _ in range(10))
+    parts = SeriesGenerator("key").partition(make_content(text), episodes=5)
+
+    assert len(parts) == 5
+    assert all(part["metadata"]["word_count"] == 200 for part in parts)
+    assert all(part["metadata"]["heading"] is None for part in parts)
+
+
+def test_partition_caps_only_automatic_counts():
+    budget = source_word_budget(5)
+    text = chapters(MAX_EPISODES * 2, budget)
+    generator = SeriesGenerator("key")
+
+    assert len(generator.partition(make_content(text))) == MAX_EPISODES
+    assert len(generator.partition(make_content(text), episodes=MAX_EPISODES * 2)) == MAX_EPISODES * 2
+
+
+def test_explicit_count_covers_large_document_within_budget():
+    content = TextParser().parse(str(EXAMPLES / "gdpr_regulation.txt"))
+    budget = source_word_budget(5)
+    needed = math.ceil(len(content["content"].split()) / budget)
+    generator = SeriesGenerator("key")
+
+    parts = generator.partition(content, episodes=needed)
+    coverage = generator._series_coverage(content, parts, budget)
+    assert len(parts) == needed
+    assert coverage["episodes_needed"] == needed
+    assert coverage["source_coverage"] > 0.9
+
+    capped = generator.partition(content)
+    capped_coverage = generator._series_coverage(content, capped, budget)
+    assert len(capped) == MAX_EPISODES < needed
+    assert capped_coverage["source_coverage"] < 0.6
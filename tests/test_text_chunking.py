@@ -0,0 +1,46 @@
+"""Tests for splitting scripts into text-to-speech chunks."""
+
+from listen_in.utils.text_chunking import chunk_text
+
+
+def test_short_paragraphs_are_packed_together():
+    assert chunk_text(["One.", "  ", "Two."], 20) == ["One. Two."]
+
+
+def test_long_paragraph_splits_between_sentences():
+    text = "First sentence here. Second sentence here! Third one?"
+    assert chunk_text([text], 25) == ["First sentence here.", "Second sentence here!", "Third one?"]
+
+
+def test_closing_quotes_and_brackets_stay_with_their_sentence():
+    text = 'Sam said "it works." (Really!) Alex asked “does it?” Then [it did.] The end.'
+    chunks = chunk_text([text], 25)
+    assert chunks == [
+        'Sam said "it works."',
+        "(Really!)",
+        "Alex asked “does it?”",
+        "Then [it did.] The end.",
+    ]
+    # No characters besides the joining spaces are lost
+    assert " ".join(chunks) == text
+
+
+def test_two_closers_stay_with_their_sentence():
+    text = 'He wrote ("done.") Next part follows.'
+    assert chunk_text([text], 20) == ['He wrote ("done.")', "Next part follows."]
+
+
+def test_falls_back_to_clauses_then_words():
+    assert chunk_text(["alpha beta, gamma delta"], 12) == ["alpha beta,", "gamma delta"]
+    assert chunk_text(["alpha beta gamma"], 11) == ["alpha beta", "gamma"]
+
+
+def test_unbreakable_text_is_cut_at_the_budget():
+    assert chunk_text(["abcdefghij"], 4) == ["abcd", "efgh", "ij"]
+
+
+def test_chunks_respect_the_budget():
+    text = " ".join(f"Sentence number {i} ends here." for i in range(50))
+    chunks = chunk_text([text, text], 120)
+    assert all(len(chunk) <= 120 for chunk in chunks)
+    assert " ".join(chunks) == f"{text} {text}"
@@ -0,0 +1,46 @@
+"""Tests for the on-disk text-to-speech cache."""
+
+import os
+
+from listen_in.utils.tts_cache import TTSCache, get_tts_cache, segment_cache_key
+
+
+def key(text):
+    return segment_cache_key(text, "voice", "model", None, "mp3_44100_128")
+
+
+def test_round_trip_and_miss(tmp_path):
+    cache = TTSCache(tmp_path, 1000)
+    cache.put(key("hello"), b"audio")
+    assert cache.get(key("hello")) == b"audio"
+    assert cache.get(key("other")) is None
+
+
+def test_replacing_an_entry_does_not_inflate_the_total(tmp_path):
+    cache = TTSCache(tmp_path, 1000)
+    cache.put(key("a"), b"x" * 400)
+    cache.put(key("b"), b"x" * 400)
+    for _ in range(5):
+        cache.put(key("a"), b"y" * 400)
+
+    assert cache._total_bytes == 800
+    assert cache.get(key("b")) == b"x" * 400
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = TTSCache(tmp_path, 1000)
+    cache.put(key("old"), b"x" * 400)
+    cache.put(key("new"), b"x" * 400)
+    # Make the last-use order unambiguous on coarse file system clocks
+    os.utime(cache._path(key("old")), (1, 1))
+    os.utime(cache._path(key("new")), (2, 2))
+    cache.put(key("newest"), b"x" * 400)
+
+    assert cache.get(key("old")) is None
+    assert cache.get(key("newest")) is not None
+    assert cache._total_bytes <= 1000
+
+
+def test_caches_are_shared_per_directory(tmp_path):
+    assert get_tts_cache(tmp_path, 1000) is get_tts_cache(tmp_path / ".", 1000)
+    assert get_tts_cache(tmp_path / "other", 1000) is not get_tts_cache(tmp_path, 1000)